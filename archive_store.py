@@ -0,0 +1,413 @@
+# archive_store.py
+# Archive compacte des résumés (source de vérité) ; les fpl_summaries/<date>.md en sont une vue.
+# Fichier = en-tête + blocs compressés (zstd si le module `zstandard` est installé, sinon zlib),
+# chaque bloc contenant des enregistrements JSONL :
+#   vidéo   : {"k": clé de contenu, "c": chaîne, "p": publication, "t": titre, "u": url, "s": résumé}
+#   section : {"day": "YYYY-MM-DD", "channel": "UC...", "items": [clé, ...]}
+# - append : un bloc par appel (process_channel), O(nouvelles vidéos),
+# - compact : dédoublonne les vidéos (une vidéo citée 16 jours de suite n'est stockée qu'une fois)
+#   et réécrit l'archive en gros blocs,
+# - lecture par mmap, bloc par bloc ; un bloc tronqué (arrêt brutal) est ignoré puis écrasé,
+# - index annexe <archive>.idx (nb de blocs, totaux, blocs de chaque jour) : rendre un jour ne
+#   décode que ses blocs, stats() ne relit rien ; reconstruit s'il ne correspond plus à l'archive,
+# - une section par (jour, chaîne) au rendu : les passages suivants ajoutent leurs vidéos,
+#   --reprocess remplace la même vidéo (url) au lieu de répéter la section.
+# Usage :
+#   python archive_store.py compact --from-markdown    # import initial de fpl_summaries/
+#   python archive_store.py render 2025-09-07 [--write]
+#   python archive_store.py stats
+
+import os
+import sys
+import json
+import mmap
+import zlib
+import struct
+import argparse
+
+from disk_cache import content_key
+
+try:
+    import zstandard
+except ImportError:   # optionnel : zlib sinon
+    zstandard = None
+
+ARCHIVE_PATH = os.getenv("ARCHIVE_PATH", os.path.join("data", "archive.fplarc"))
+SUMMARIES_DIR = "fpl_summaries"
+ARCHIVE_CODEC = os.getenv("ARCHIVE_CODEC", "zstd" if zstandard else "zlib")
+BLOCK_RECORDS = 2048          # enregistrements par bloc après compaction
+INDEX_VERSION = 1
+
+FILE_MAGIC = b"FPLARC\x00\x01"
+BLOCK_MAGIC = b"BLK1"
+# magic, codec, (pad), nb d'enregistrements, taille brute, taille compressée, crc32 du compressé
+BLOCK = struct.Struct("<4sBxHIII")
+CODECS = {"none": 0, "zlib": 1, "zstd": 2}
+
+def encode(codec: str, raw: bytes) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Codec zstd demandé mais le module 'zstandard' est absent (pip install zstandard)")
+        return zstandard.ZstdCompressor(level=10).compress(raw)
+    if codec == "zlib":
+        return zlib.compress(raw, 9)
+    return raw
+
+def decode(codec_id: int, payload: bytes, raw_len: int) -> bytes:
+    if codec_id == CODECS["zstd"]:
+        if zstandard is None:
+            raise RuntimeError("Archive compressée en zstd : installe le module 'zstandard'")
+        return zstandard.ZstdDecompressor().decompress(payload, max_output_size=raw_len)
+    if codec_id == CODECS["zlib"]:
+        return zlib.decompress(payload)
+    return bytes(payload)
+
+def video_record(channel: str | None, published: str, title: str, url: str | None, summary: str) -> dict:
+    # Clé de contenu : la même vidéo avec le même résumé n'est stockée qu'une fois
+    return {"k": content_key(channel, published, title, url, summary)[:20],
+            "c": channel, "p": published, "t": title, "u": url, "s": summary}
+
+def merge_sections(sections: list, videos: dict) -> list:
+    """
+    Une section par (jour, chaîne), à la place de la première : les vidéos des sections
+    suivantes s'ajoutent (nouveaux passages) ou remplacent la même vidéo (--reprocess).
+    """
+    merged = {}
+    for section in sections:
+        items = merged.setdefault((section["day"], section["channel"]), {})
+        for k in section["items"]:
+            v = videos.get(k)
+            # Réaffecter une vidéo déjà présente garde sa position
+            items[(v.get("u") or v.get("t")) if v else k] = k
+    return [{"day": day, "channel": channel, "items": list(items.values())}
+            for (day, channel), items in merged.items()]
+
+def render_entry(rec: dict) -> str:
+    # Même mise en forme que l'écriture historique de process_channel
+    return f"## {rec['p']} — {rec['t']}\n🔗 {rec['u']}\n\nRésumé :\n{rec['s']}\n\n---\n\n"
+
+class ArchiveStore:
+    def __init__(self, path: str = ARCHIVE_PATH, codec: str = ARCHIVE_CODEC):
+        if codec not in CODECS:
+            raise ValueError(f"Codec inconnu : {codec} (choix : {', '.join(CODECS)})")
+        if codec == "zstd" and zstandard is None:
+            codec = "zlib"
+        self.path = path
+        self.codec = codec
+        self.index_path = path + ".idx"
+        self._index = None
+
+    # --------- Lecture ---------
+
+    @staticmethod
+    def _unpack(mm, pos: int):
+        # (codec, nb, taille brute, payload) du bloc à `pos`, None s'il est incomplet ou corrompu
+        if pos + BLOCK.size > len(mm):
+            return None
+        magic, codec_id, count, raw_len, comp_len, crc = BLOCK.unpack_from(mm, pos)
+        start = pos + BLOCK.size
+        payload = mm[start:start + comp_len]
+        if magic != BLOCK_MAGIC or len(payload) != comp_len or zlib.crc32(payload) != crc:
+            return None
+        return codec_id, count, raw_len, payload
+
+    def _open(self):
+        f = open(self.path, "rb")
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        f.close()   # le mapping reste valide
+        if mm[:len(FILE_MAGIC)] != FILE_MAGIC:
+            mm.close()
+            raise ValueError(f"{self.path} n'est pas une archive FPL Radar")
+        return mm
+
+    def _blocks(self):
+        """
+        (position, codec, nb, taille brute, payload) de chaque bloc valide, lus par mmap.
+        S'arrête au premier bloc incomplet ou corrompu.
+        """
+        if not os.path.isfile(self.path) or os.path.getsize(self.path) <= len(FILE_MAGIC):
+            return
+        with self._open() as mm:
+            pos = len(FILE_MAGIC)
+            while (block := self._unpack(mm, pos)) is not None:
+                yield (pos, *block)
+                pos += BLOCK.size + len(block[3])
+
+    def valid_end(self) -> int:
+        end = len(FILE_MAGIC) if os.path.isfile(self.path) else 0
+        for pos, _, _, _, payload in self._blocks():
+            end = pos + BLOCK.size + len(payload)
+        return end
+
+    # --------- Index annexe (.idx) ---------
+
+    def index(self) -> dict:
+        """
+        {size, end, blocks, records, raw, compressed, days: {jour: [positions de blocs]}}.
+        Les blocs d'un jour contiennent ses sections et les vidéos qu'elles citent.
+        Reconstruit en un parcours si la taille de l'archive ne correspond plus
+        (arrêt brutal, archive copiée ou remplacée, index absent).
+        """
+        size = os.path.getsize(self.path) if os.path.isfile(self.path) else 0
+        if self._index is not None and self._index["size"] == size:
+            return self._index
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                idx = json.load(f)
+        except (OSError, ValueError):
+            idx = None
+        if not idx or idx.get("version") != INDEX_VERSION or idx.get("size") != size:
+            idx = self._rebuild_index()
+            self._save_index(idx)
+        self._index = idx
+        return idx
+
+    def _rebuild_index(self) -> dict:
+        idx = {"version": INDEX_VERSION, "end": len(FILE_MAGIC) if os.path.isfile(self.path) else 0,
+               "blocks": 0, "records": 0, "raw": 0, "compressed": 0, "days": {}}
+        where = {}   # clé vidéo -> bloc
+        for pos, codec_id, count, raw_len, payload in self._blocks():
+            self._count_block(idx, pos, count, raw_len, len(payload))
+            for line in decode(codec_id, payload, raw_len).splitlines():
+                if not line:
+                    continue
+                rec = json.loads(line)
+                if "day" in rec:
+                    self._add_day(idx, rec["day"], {pos, *(where[k] for k in rec["items"] if k in where)})
+                else:
+                    where[rec["k"]] = pos
+        idx["size"] = os.path.getsize(self.path) if os.path.isfile(self.path) else 0
+        return idx
+
+    @staticmethod
+    def _count_block(idx: dict, pos: int, count: int, raw_len: int, comp_len: int):
+        idx["blocks"] += 1
+        idx["records"] += count
+        idx["raw"] += raw_len
+        idx["compressed"] += comp_len
+        idx["end"] = pos + BLOCK.size + comp_len
+
+    @staticmethod
+    def _add_day(idx: dict, day: str, positions: set):
+        idx["days"][day] = sorted(set(idx["days"].get(day, ())) | positions)
+
+    def _save_index(self, idx: dict):
+        if not os.path.isfile(self.path):
+            return
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(idx, f, separators=(",", ":"))
+        os.replace(tmp, self.index_path)
+
+    def records(self):
+        # Enregistrements dans l'ordre d'écriture (un bloc décompressé à la fois)
+        for _, codec_id, _, raw_len, payload in self._blocks():
+            for line in decode(codec_id, payload, raw_len).splitlines():
+                if line:
+                    yield json.loads(line)
+
+    def load(self) -> tuple[dict, list]:
+        """
+        (vidéos par clé, sections dans l'ordre d'écriture).
+        """
+        videos, sections = {}, []
+        for rec in self.records():
+            if "day" in rec:
+                sections.append(rec)
+            else:
+                videos[rec["k"]] = rec
+        return videos, sections
+
+    def days(self) -> list[str]:
+        return sorted(self.index()["days"])
+
+    def load_day(self, day: str) -> tuple[dict, list]:
+        """
+        Comme load(), limité aux blocs du jour (index) : le coût ne dépend pas de l'historique.
+        """
+        positions = self.index()["days"].get(day)
+        videos, sections = {}, []
+        if not positions:
+            return videos, sections
+        with self._open() as mm:
+            for pos in positions:
+                block = self._unpack(mm, pos)
+                if block is None:
+                    continue
+                codec_id, _, raw_len, payload = block
+                for line in decode(codec_id, payload, raw_len).splitlines():
+                    if not line:
+                        continue
+                    rec = json.loads(line)
+                    if "day" not in rec:
+                        videos[rec["k"]] = rec
+                    elif rec["day"] == day:
+                        sections.append(rec)
+        return videos, sections
+
+    def render_day(self, day: str) -> str | None:
+        """
+        Markdown du jour (même format que fpl_summaries/<date>.md), None si le jour est absent.
+        """
+        videos, sections = self.load_day(day)
+        if not sections:
+            return None
+        sections = merge_sections(sections, videos)
+        out = []
+        for section in sections:
+            if section["channel"]:
+                out.append(f"# Chaîne {section['channel']}\n\n")
+            out.extend(render_entry(videos[k]) for k in section["items"] if k in videos)
+        return "".join(out)
+
+    def write_day(self, day: str, output_dir: str = SUMMARIES_DIR) -> str | None:
+        text = self.render_day(day)
+        if text is None:
+            return None
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, f"{day}.md")
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+        return path
+
+    # --------- Écriture ---------
+
+    def _block_bytes(self, records: list[dict]) -> bytes:
+        raw = "".join(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in records).encode("utf-8")
+        payload = encode(self.codec, raw)
+        return BLOCK.pack(BLOCK_MAGIC, CODECS[self.codec], len(records), len(raw), len(payload),
+                          zlib.crc32(payload)) + payload
+
+    def append(self, records: list[dict]):
+        """
+        Ajoute un bloc en fin d'archive (écrase un éventuel bloc tronqué laissé par un arrêt brutal).
+        """
+        if not records:
+            return
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        idx = self.index()
+        end = idx["end"]
+        block = self._block_bytes(records)
+        with open(self.path, "r+b" if end else "wb") as f:
+            if not end:
+                f.write(FILE_MAGIC)
+                end = len(FILE_MAGIC)
+            f.seek(end)
+            f.truncate()
+            f.write(block)
+            f.flush()
+            os.fsync(f.fileno())
+        # Les vidéos d'une section sont dans le même bloc qu'elle (append_section)
+        raw_len, comp_len = BLOCK.unpack_from(block)[3:5]
+        self._count_block(idx, end, len(records), raw_len, comp_len)
+        for day in {r["day"] for r in records if "day" in r}:
+            self._add_day(idx, day, {end})
+        idx["size"] = idx["end"]
+        self._save_index(idx)
+
+    def append_section(self, day: str, channel: str | None, entries: list[dict]):
+        """
+        entries : dict(published, title, url, summary). Vidéos + section dans un seul bloc.
+        """
+        videos = [video_record(channel, e["published"], e["title"], e["url"], e["summary"]) for e in entries]
+        self.append(videos + [{"day": day, "channel": channel, "items": [v["k"] for v in videos]}])
+
+    def compact(self, extra_sections: list | None = None) -> dict:
+        """
+        Réécrit l'archive : vidéos dédoublonnées, sections triées par jour (ordre conservé
+        dans un même jour), blocs de BLOCK_RECORDS enregistrements. extra_sections :
+        (jour, chaîne, entrées) à fusionner (import Markdown) pour les jours absents de l'archive.
+        """
+        before = os.path.getsize(self.path) if os.path.isfile(self.path) else 0
+        videos, sections = self.load()
+        known_days = {s["day"] for s in sections}
+        for day, channel, entries in extra_sections or []:
+            if day in known_days:
+                continue
+            recs = [video_record(channel, e["published"], e["title"], e["url"], e["summary"]) for e in entries]
+            for r in recs:
+                videos.setdefault(r["k"], r)
+            sections.append({"day": day, "channel": channel, "items": [r["k"] for r in recs]})
+        sections = merge_sections(sections, videos)
+        sections.sort(key=lambda s: s["day"])   # tri stable
+        used = dict.fromkeys(k for s in sections for k in s["items"])
+        records = [videos[k] for k in used if k in videos] + sections
+
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(FILE_MAGIC)
+            for i in range(0, len(records), BLOCK_RECORDS):
+                f.write(self._block_bytes(records[i:i + BLOCK_RECORDS]))
+        os.replace(tmp, self.path)
+        self._index = self._rebuild_index()
+        self._save_index(self._index)
+        return {"videos": len(used), "sections": len(sections), "days": len({s["day"] for s in sections}),
+                "refs": sum(len(s["items"]) for s in sections),
+                "before": before, "after": os.path.getsize(self.path)}
+
+    def stats(self) -> dict:
+        idx = self.index()
+        return {"blocks": idx["blocks"], "records": idx["records"], "raw": idx["raw"],
+                "compressed": idx["compressed"], "file": idx["size"]}
+
+# --------- Import Markdown ---------
+
+def markdown_sections(directory: str = SUMMARIES_DIR) -> list:
+    """
+    (jour, chaîne, entrées) pour chaque suite de vidéos d'une même chaîne dans les .md du dossier.
+    """
+    from search_index import day_files, iter_entries
+    sections = []
+    for path in day_files(directory):
+        day = os.path.basename(path)[:-len(".md")]
+        for e in iter_entries(path):
+            if not sections or sections[-1][0] != day or sections[-1][1] != e["channel"]:
+                sections.append((day, e["channel"], []))
+            sections[-1][2].append(e)
+    return sections
+
+def main():
+    p = argparse.ArgumentParser(description="Archive compacte des résumés FPL (source des .md quotidiens).")
+    p.add_argument("--archive", default=ARCHIVE_PATH, help="Fichier d'archive")
+    p.add_argument("--codec", choices=sorted(CODECS), default=ARCHIVE_CODEC, help="Compression des blocs")
+    sub = p.add_subparsers(dest="command", required=True)
+    c = sub.add_parser("compact", help="Dédoublonner et réécrire l'archive en gros blocs")
+    c.add_argument("--from-markdown", action="store_true",
+                   help=f"Importer les jours de {SUMMARIES_DIR}/ absents de l'archive")
+    r = sub.add_parser("render", help="Markdown d'un jour depuis l'archive")
+    r.add_argument("day", help="YYYY-MM-DD")
+    r.add_argument("--write", action="store_true", help=f"Écrire {SUMMARIES_DIR}/<jour>.md au lieu d'afficher")
+    sub.add_parser("stats", help="Taille et contenu de l'archive")
+    args = p.parse_args()
+
+    store = ArchiveStore(args.archive, args.codec)
+    if args.command == "compact":
+        st = store.compact(markdown_sections() if args.from_markdown else None)
+        print(f"🗜️ Archive compactée : {st['videos']} vidéo(s) unique(s) pour {st['refs']} mention(s), "
+              f"{st['days']} jour(s) — {st['before'] / 1024:.1f} Ko → {st['after'] / 1024:.1f} Ko ({store.codec})")
+    elif args.command == "render":
+        if args.write:
+            path = store.write_day(args.day)
+            if not path:
+                print(f"❌ Jour absent de l'archive : {args.day}")
+                sys.exit(1)
+            print(f"✅ {path}")
+        else:
+            text = store.render_day(args.day)
+            if text is None:
+                print(f"❌ Jour absent de l'archive : {args.day}")
+                sys.exit(1)
+            sys.stdout.write(text)
+    else:
+        st = store.stats()
+        ratio = st["raw"] / st["compressed"] if st["compressed"] else 0
+        print(f"📦 {args.archive} : {st['blocks']} bloc(s), {st['records']} enregistrement(s), "
+              f"{st['file'] / 1024:.1f} Ko (brut {st['raw'] / 1024:.1f} Ko, x{ratio:.1f})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+# audio_cache.py
+# Cache des voix off WAV générées localement (pyttsx3), partagé par tts_pyttsx3.py
+# et youtube_fpl_agent.py --voiceover.
+# Clé = hash(texte nettoyé, voix demandée, débit, volume, mode gentle) : un script
+# identique à la veille réutilise le WAV sans relancer le moteur.
+# Les deux scripts passent par tts_pyttsx3.generate_tts (même choix de voix, même clé).
+
+import os
+
+from disk_cache import FileCache, content_key
+
+AUDIO_CACHE_MAX_BYTES = int(os.getenv("AUDIO_CACHE_MAX_BYTES", 300 * 1024 * 1024))
+
+class AudioCache(FileCache):
+    def __init__(self, directory: str | None = None, max_bytes: int = AUDIO_CACHE_MAX_BYTES):
+        super().__init__("audio", ".wav", max_bytes, directory)
+
+    AUTO_VOICE = "auto"   # sans sélecteur : voix UK / David choisie par tts_pyttsx3.init_engine
+
+    @staticmethod
+    def key(text: str, voice: str | None, rate: int, volume: float, gentle: bool) -> str:
+        # voix = sélecteur demandé (ou AUTO_VOICE) : la résoudre exigerait d'initialiser le moteur
+        return content_key("pyttsx3", text, voice or AudioCache.AUTO_VOICE, int(rate), float(volume), bool(gentle))
+
+    def stats_line(self) -> str:
+        return f"🗄️ Cache audio : {self.hits} hit(s), {self.misses} synthèse(s)"
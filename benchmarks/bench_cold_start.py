@@ -0,0 +1,43 @@
+# benchmarks/bench_cold_start.py
+# Démarrage à froid (nouvel interpréteur à chaque fois) : scripts lancés directement
+# vs point d'entrée radar.py, et modules importés par chaque commande.
+# Usage : python benchmarks/bench_cold_start.py [répétitions]
+
+import os, sys, time, statistics, subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = [
+    ("radar --help", ["radar.py", "--help"]),
+    ("radar fetch --help", ["radar.py", "fetch", "--help"]),
+    ("youtube_fpl_agent.py --help", ["youtube_fpl_agent.py", "--help"]),
+    ("radar render --help", ["radar.py", "render", "--help"]),
+    ("radar report --help", ["radar.py", "report", "--help"]),
+    ("radar tts (usage)", ["radar.py", "tts"]),
+]
+HEAVY = ["feedparser", "PIL", "requests", "pyttsx3", "sqlite3"]
+
+def cold_run(args) -> float:
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, *args], cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - t0
+
+def imported(args) -> list[str]:
+    # Modules lourds effectivement chargés par la commande (-X importtime)
+    r = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=ROOT,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    names = {line.rsplit("|", 1)[-1].strip() for line in r.stderr.splitlines() if "|" in line}
+    return [m for m in HEAVY if m in names]
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    base = statistics.median(cold_run(["-c", "pass"]) for _ in range(repeat))
+    print(f"🐍 Interpréteur seul : {base * 1000:.0f} ms (médiane de {repeat})\n")
+    for label, args in CASES:
+        runs = [cold_run(args) for _ in range(repeat)]
+        med = statistics.median(runs)
+        print(f"{label:<30} {med * 1000:7.0f} ms  (+{(med - base) * 1000:5.0f} ms)  "
+              f"importe : {', '.join(imported(args)) or '-'}")
+
+if __name__ == "__main__":
+    main()
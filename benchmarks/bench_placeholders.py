@@ -0,0 +1,48 @@
+# benchmarks/bench_placeholders.py
+# Compare l'ancien gradient pixel par pixel (putpixel) au gradient mis en cache.
+# Usage : python benchmarks/bench_placeholders.py [N] [taille]
+
+import os, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+import render_placeholders as rp
+
+def legacy_background(idx, w, h):
+    # Implémentation d'origine, conservée uniquement pour la comparaison
+    a, b = rp.PALETTES[idx % len(rp.PALETTES)]
+    img = Image.new("RGB", (w, h), a)
+    for y in range(h):
+        ratio = y / (h - 1)
+        r = int(a[0] * (1 - ratio) + b[0] * ratio)
+        g = int(a[1] * (1 - ratio) + b[1] * ratio)
+        bl = int(a[2] * (1 - ratio) + b[2] * ratio)
+        for x in range(w):
+            img.putpixel((x, y), (r, g, bl))
+    return img
+
+def bench(fn, n, size):
+    t0 = time.perf_counter()
+    for i in range(1, n + 1):
+        fn(i, size, size)
+    return time.perf_counter() - t0
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else rp.W
+
+    for i in range(len(rp.PALETTES)):
+        assert legacy_background(i, 64, 64).tobytes() == rp.background(i, 64, 64).tobytes(), "gradient différent"
+
+    rp.gradient_image.cache_clear()
+    rp.gradient_column.cache_clear()
+    before = bench(legacy_background, n, size)
+    after = bench(rp.background, n, size)
+    print(f"🧪 {n} images {size}x{size}")
+    print(f"   avant (putpixel) : {before:8.3f} s  ({before / n * 1000:8.1f} ms/image)")
+    print(f"   après (cache)    : {after:8.3f} s  ({after / n * 1000:8.1f} ms/image)")
+    print(f"   gain             : x{before / max(after, 1e-9):.0f}")
+
+if __name__ == "__main__":
+    main()
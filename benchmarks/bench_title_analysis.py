@@ -0,0 +1,66 @@
+# benchmarks/bench_title_analysis.py
+# Analyse de tous les titres de l'archive fpl_summaries/ : ancienne boucle mot à mot
+# (summarize_from_title d'origine) vs automate d'Aho-Corasick, et chemin de production
+# (fpl_tags.extract_tags / extract_players).
+# Vérifie aussi que les étiquettes d'origine sont conservées (ou fusionnées : Free + Hit -> Free Hit).
+# Usage : python benchmarks/bench_title_analysis.py [répétitions]
+
+import os, re, sys, time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import fpl_tags
+import title_analysis
+from search_index import day_files, iter_entries
+
+def legacy_tags(title):
+    # Implémentation d'origine, conservée uniquement pour la comparaison
+    t = title.strip()
+    t = re.sub(r"\s+", " ", t)
+    words = [w for w in re.split(r"[^\w']+", t) if w]
+    tags = []
+    for w in words:
+        if w.upper().startswith("GW"):
+            tags.append(w.upper())
+        elif w.lower() in {"wildcard","free","hit","draft","watchlist","team","selection","tips","picks"}:
+            tags.append(w.capitalize())
+    return list(dict.fromkeys(tags))
+
+def archive_titles():
+    return [e["title"] for path in day_files(os.path.join(ROOT, "fpl_summaries")) for e in iter_entries(path)]
+
+def bench(label, fn, n_titles):
+    t0 = time.perf_counter()
+    result = fn()
+    dt = time.perf_counter() - t0
+    print(f"{label:<28} {dt * 1000:8.1f} ms  ({n_titles / dt:,.0f} titres/s)")
+    return result
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    titles = archive_titles() * repeat
+    if not titles:
+        print("❌ Aucun titre dans fpl_summaries/")
+        sys.exit(1)
+
+    t0 = time.perf_counter()
+    analyzer = title_analysis.TitleAnalyzer.from_file()
+    print(f"📖 Dictionnaire : {analyzer.size} alias, automate de {len(analyzer.automaton.goto)} nœuds "
+          f"construit en {(time.perf_counter() - t0) * 1000:.1f} ms")
+    print(f"📝 {len(titles)} titres ({len(titles) // repeat} dans l'archive × {repeat})\n")
+
+    legacy = bench("ancienne boucle (mots)", lambda: [legacy_tags(t) for t in titles], len(titles))
+    results = bench("automate", lambda: [analyzer.analyze(t) for t in titles], len(titles))
+    bench("fpl_tags.extract_tags", lambda: [fpl_tags.extract_tags(t) for t in titles], len(titles))
+    bench("fpl_tags.extract_players", lambda: [fpl_tags.extract_players(t) for t in titles], len(titles))
+
+    lost = [(t, old, r["tags"]) for t, old, r in zip(titles, legacy, results)
+            if not set(old) <= {w for tag in r["tags"] for w in tag.split()}]
+    assert not lost, f"étiquettes perdues : {lost[:5]}"
+    multi = sum(1 for r in results if any(" " in x for x in r["tags"] + r["players"] + r["clubs"]))
+    print(f"\n✅ Aucune étiquette d'origine perdue ; "
+          f"{multi} titre(s) avec un terme en plusieurs mots (Free Hit, Bruno Fernandes...)")
+
+if __name__ == "__main__":
+    main()
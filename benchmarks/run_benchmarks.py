@@ -0,0 +1,262 @@
+# benchmarks/run_benchmarks.py
+# Banc d'essai de chaque étape du pipeline, hors ligne, sur des données synthétiques :
+#   collect_videos / process_channel  : flux Atom de N vidéos (fixture de stub_server.py)
+#   render_placeholders               : K prompts .txt
+#   export_ideas_today                : Markdown social de taille "archive" + PNG
+#   report_build_and_send             : ideas.json de M idées (lot et --stream)
+# Temps (meilleur de R passes) et pic mémoire Python (tracemalloc : les buffers internes
+# de Pillow ne sont pas comptés) par étape, comparés à benchmarks/baseline.json.
+# Usage :
+#   python benchmarks/run_benchmarks.py                  # mesure + comparaison
+#   python benchmarks/run_benchmarks.py --save-baseline  # enregistre la référence
+#   python benchmarks/run_benchmarks.py --only report --ideas 20000 --check
+
+import os, sys, json, time, shutil, argparse, tempfile, tracemalloc, contextlib
+import pathlib, platform
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DATE = "2025-09-07"
+UCID = "UCbenchmark000000000000"
+# PNG 1×1 valide : les visuels de l'export n'ont pas besoin d'être réalistes
+TINY_PNG = bytes.fromhex("89504e470d0a1a0a0000000d4948445200000001000000010802000000907753de"
+                         "0000000c49444154789c63f8cfc0000003010100c9fe92ef0000000049454e44ae426082")
+
+@contextlib.contextmanager
+def quiet():
+    # Les étapes affichent leur progression : on la jette pour ne mesurer que le travail
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+# --------- Fixtures ---------
+
+def make_feed(entries: int) -> str:
+    from stub_server import atom_feed
+    return atom_feed(UCID, entries)
+
+def make_prompts(directory: str, count: int):
+    os.makedirs(directory, exist_ok=True)
+    for i in range(count):
+        with open(os.path.join(directory, f"prompt_{i:03d}.txt"), "w", encoding="utf-8") as f:
+            f.write(f"Idée {i} : Free Hit GW{i % 38 + 1}, Salah ou Haaland ? "
+                    "Les différentiels à surveiller avant la deadline de samedi.")
+
+def make_export_inputs(base: pathlib.Path, images: int, titles: int):
+    img_dir = base / "social_images_out" / DATE
+    img_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(images):
+        (img_dir / f"{i:04d}_idee_{i}.png").write_bytes(TINY_PNG)
+    md = base / "fpl_summaries" / f"social_{DATE}.md"
+    md.parent.mkdir(parents=True, exist_ok=True)
+    with open(md, "w", encoding="utf-8") as f:
+        f.write(f"# Script social — {DATE}\n\n")
+        for i in range(titles):
+            f.write(f"## FPL GW{i % 38 + 1}: idée {i} | Wood, Cunha & Cucurella\n\n"
+                    "Résumé : texte de remplissage pour une archive de taille réaliste.\n\n---\n\n")
+
+def make_ideas(path: pathlib.Path, count: int, image: str):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[\n")
+        for i in range(count):
+            idea = {"title": f"Idée {i} <GW{i % 38 + 1}>", "description": f"Visuel social n°{i}",
+                    "metrics": {"views": (i * 37) % 1000, "score": (i * 13) % 100 / 3},
+                    "image_path": image}
+            f.write(("," if i else "") + json.dumps(idea, ensure_ascii=False) + "\n")
+        f.write("]\n")
+
+# --------- Étapes ---------
+# Chaque étape : (préparation, fonction mesurée). La préparation n'est pas chronométrée.
+
+def stage_collect_videos(work, args):
+    import feedparser
+    from youtube_fpl_agent import collect_videos
+    xml = make_feed(args.feed_entries)
+    return None, lambda: collect_videos(feedparser.parse(xml))
+
+def stage_process_channel(work, args):
+    import feedparser
+    import youtube_fpl_agent as agent
+    from archive_store import ArchiveStore
+    from trends import TrendStore
+    from video_index import VideoIndex
+    videos = agent.collect_videos(feedparser.parse(make_feed(args.feed_entries)))
+    run_dir = os.path.join(work, "agent")
+
+    def setup():
+        shutil.rmtree(run_dir, ignore_errors=True)
+        os.makedirs(run_dir)
+
+    def run():
+        index = VideoIndex(os.path.join(run_dir, "video_index.sqlite"))
+        archive = ArchiveStore(os.path.join(run_dir, "archive.fplarc"))
+        trends = TrendStore(os.path.join(run_dir, "trends.json"))
+        agent.process_channel(UCID, len(videos), DATE, run_dir, [], videos=list(videos), pause=0,
+                              index=index, archive=archive, trends=trends)
+        archive.write_day(DATE, run_dir)
+        trends.save()
+        index.close()
+    return setup, run
+
+def stage_render_placeholders(work, args):
+    import render_placeholders as rp
+    rp.IN_ROOT = os.path.join(work, "social_images")
+    rp.OUT_ROOT = os.path.join(work, "social_images_out_rp")
+    make_prompts(os.path.join(rp.IN_ROOT, DATE), args.prompts)
+
+    def setup():
+        shutil.rmtree(rp.OUT_ROOT, ignore_errors=True)
+        os.makedirs(os.path.join(rp.OUT_ROOT, DATE))
+
+    return setup, lambda: list(rp.render_jobs(rp.list_jobs(DATE), 1))
+
+def stage_export_ideas(work, args):
+    import export_ideas_today as ex
+    base = pathlib.Path(work) / "export"
+    make_export_inputs(base, args.export_images, args.md_titles)
+    ex.BASE = base
+    ex.IMAGES_ROOT = base / "social_images_out"
+    ex.OUT_DIR = base / "data"
+    ex.OUT_FILE = ex.OUT_DIR / "ideas.json"
+    return None, ex.export
+
+def _report_inputs(work, args):
+    import report_build_and_send as rb
+    data = pathlib.Path(work) / "ideas.json"
+    if not data.exists():
+        image = pathlib.Path(work) / "idea.png"
+        image.write_bytes(TINY_PNG)
+        make_ideas(data, args.ideas, image.as_posix())
+    rb.OUT_DIR = pathlib.Path(work) / "out"
+    return rb, data, rb.OUT_DIR / "report.html"
+
+def stage_report(work, args):
+    from thumbnails import ReportImages
+    rb, data, out = _report_inputs(work, args)
+
+    def run():
+        ideas = rb.load_data(data)
+        html = rb.render_html(rb.build_summary(ideas), ideas, ReportImages("full", out.parent))
+        rb.save_html(html, out)
+    return None, run
+
+def stage_report_stream(work, args):
+    from thumbnails import ReportImages
+    rb, data, out = _report_inputs(work, args)
+    return None, lambda: rb.build_report_stream(data, out, ReportImages("full", out.parent))
+
+STAGES = {
+    "collect_videos": stage_collect_videos,
+    "process_channel": stage_process_channel,
+    "render_placeholders": stage_render_placeholders,
+    "export_ideas": stage_export_ideas,
+    "report": stage_report,
+    "report_stream": stage_report_stream,
+}
+
+# --------- Mesure ---------
+
+def measure(setup, fn, repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        with quiet():
+            t0 = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t0)
+    # Passe séparée pour la mémoire : tracemalloc ralentit et fausserait les temps
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        with quiet():
+            fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"time_ms": round(min(times) * 1000, 2), "peak_kb": round(peak / 1024, 1)}
+
+def params(args) -> dict:
+    return {"feed_entries": args.feed_entries, "prompts": args.prompts, "export_images": args.export_images,
+            "md_titles": args.md_titles, "ideas": args.ideas}
+
+def load_baseline(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def delta(new: float, old: float | None) -> str:
+    if not old:
+        return "      -"
+    return f"{(new - old) / old * 100:+6.0f}%"
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Banc d'essai hors ligne des étapes FPL Radar.")
+    p.add_argument("--only", nargs="+", choices=sorted(STAGES), help="Étapes à mesurer (défaut : toutes)")
+    p.add_argument("--repeat", "-r", type=int, default=3, help="Passes par étape (meilleur temps retenu)")
+    p.add_argument("--feed-entries", type=int, default=500, help="Vidéos du flux Atom (N)")
+    p.add_argument("--prompts", type=int, default=12, help="Prompts à rendre (K)")
+    p.add_argument("--export-images", type=int, default=500, help="PNG du dossier exporté")
+    p.add_argument("--md-titles", type=int, default=20000, help="Titres du Markdown social exporté")
+    p.add_argument("--ideas", type=int, default=5000, help="Idées de ideas.json (M)")
+    p.add_argument("--baseline", default=BASELINE_PATH, help="Fichier de référence")
+    p.add_argument("--save-baseline", action="store_true", help="Enregistrer ces mesures comme référence")
+    p.add_argument("--tolerance", type=float, default=0.5,
+                   help="Écart toléré avant de signaler une régression (0.5 = +50 %%)")
+    p.add_argument("--check", action="store_true", help="Code de sortie 1 en cas de régression")
+    return p.parse_args()
+
+def main():
+    args = parse_args()
+    names = args.only or list(STAGES)
+    baseline = load_baseline(args.baseline)
+    if baseline and baseline.get("params") != params(args):
+        print(f"⚠️ Paramètres différents de la référence ({baseline.get('params')}) : comparaison indicative.")
+    ref = baseline.get("stages", {})
+
+    results = {}
+    regressions = []
+    print(f"{'étape':<22}{'temps':>11}{'Δ':>8}{'pic mémoire':>15}{'Δ':>8}")
+    with tempfile.TemporaryDirectory(prefix="radar_bench_") as work:
+        cwd = os.getcwd()
+        os.chdir(work)   # caches (.cache/...) et sorties relatives restent dans le dossier jetable
+        try:
+            for name in names:
+                with quiet():
+                    setup, fn = STAGES[name](work, args)
+                r = results[name] = measure(setup, fn, args.repeat)
+                old = ref.get(name, {})
+                flag = ""
+                for key in ("time_ms", "peak_kb"):
+                    if old.get(key) and r[key] > old[key] * (1 + args.tolerance):
+                        regressions.append(f"{name}.{key}")
+                        flag = "  ⚠️"
+                print(f"{name:<22}{r['time_ms']:>8.1f} ms{delta(r['time_ms'], old.get('time_ms'))}"
+                      f"{r['peak_kb'] / 1024:>12.2f} Mo{delta(r['peak_kb'], old.get('peak_kb'))}{flag}")
+        finally:
+            os.chdir(cwd)
+
+    if args.save_baseline:
+        merged = dict(ref) if baseline.get("params") == params(args) else {}
+        merged.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"params": params(args), "python": platform.python_version(),
+                       "stages": merged}, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"💾 Référence enregistrée dans {args.baseline}")
+    elif not baseline:
+        print("ℹ️ Pas de référence : relancer avec --save-baseline pour en créer une.")
+    if regressions:
+        print(f"⚠️ Régression(s) au-delà de {args.tolerance:.0%} : {', '.join(regressions)}")
+        if args.check:
+            sys.exit(1)
+    else:
+        print("✅ Aucune régression." if ref else "✅ Terminé.")
+
+if __name__ == "__main__":
+    main()
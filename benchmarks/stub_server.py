@@ -0,0 +1,192 @@
+# benchmarks/stub_server.py
+# Serveur HTTP local qui imite les flux Atom YouTube (fixtures synthétiques)
+# et les API Images / Speech d'OpenAI (latence, limites de débit 429 + Retry-After, erreurs 5xx).
+# Usage :
+#   python benchmarks/stub_server.py --port 8765 --entries 15 --latency 0.3
+#   YOUTUBE_FEED_URL="http://127.0.0.1:8765/feeds/videos.xml?channel_id={ucid}" \
+#       python youtube_fpl_agent.py --multi --workers 8
+#   python benchmarks/stub_server.py --latency 0.5 --rate-limit 2 --fail-rate 0.1
+#   OPENAI_BASE_URL="http://127.0.0.1:8765/v1" OPENAI_API_KEY=stub python render_images.py 2025-09-07
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import struct
+import zlib
+import threading
+import time
+from datetime import datetime, timedelta, UTC
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from xml.sax.saxutils import escape
+
+TITLES = [
+    "FPL GW{gw}: THE WATCHLIST | Sarr Haunts Villa Again | Fantasy Premier League Tips",
+    "FPL GW{gw}: FREE HIT DRAFT | Wood, Cunha & Cucurella | TIPS' PICKS",
+    "FPL GW{gw}: TEAM SELECTION | Haaland or No Haaland? | Fantasy Premier League",
+    "FPL GW{gw} WILDCARD DRAFT | Best Differentials | Fantasy Premier League",
+]
+
+def atom_feed(ucid: str, entries: int = 15, start: datetime | None = None) -> str:
+    """
+    Construit un flux Atom au format YouTube avec `entries` vidéos (une par jour).
+    """
+    start = start or datetime(2025, 9, 1, 12, 0, tzinfo=UTC)
+    items = []
+    for i in range(entries):
+        published = (start - timedelta(days=i)).strftime("%Y-%m-%dT%H:%M:%S+00:00")
+        vid = f"{ucid[-6:]}{i:05d}"
+        title = TITLES[i % len(TITLES)].format(gw=max(1, 38 - i % 38))
+        link = f"https://www.youtube.com/shorts/{vid}" if i % 7 == 6 else f"https://www.youtube.com/watch?v={vid}"
+        items.append(f"""
+ <entry>
+  <id>yt:video:{vid}</id>
+  <yt:videoId>{vid}</yt:videoId>
+  <yt:channelId>{escape(ucid)}</yt:channelId>
+  <title>{escape(title)}</title>
+  <link rel="alternate" href="{link}"/>
+  <published>{published}</published>
+  <updated>{published}</updated>
+ </entry>""")
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns:yt="http://www.youtube.com/xml/schemas/2015" xmlns="http://www.w3.org/2005/Atom">
+ <title>Stub {escape(ucid)}</title>
+ <yt:channelId>{escape(ucid)}</yt:channelId>{"".join(items)}
+</feed>
+"""
+
+def tiny_png(rgb=(40, 90, 160), size=8) -> bytes:
+    """
+    PNG uni minimal, construit sans dépendance (remplace les images de l'API).
+    """
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+    raw = b"".join(b"\x00" + bytes(rgb) * size for _ in range(size))
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw))
+            + chunk(b"IEND", b""))
+
+class StubHandler(BaseHTTPRequestHandler):
+    entries = 15
+    latency = 0.0
+    rate_limit = 0          # requêtes API acceptées par seconde (0 = illimité)
+    fail_rate = 0.0         # probabilité d'une erreur 500
+    hits = 0
+    api_calls = []          # horodatages des requêtes API acceptées
+    lock = threading.Lock()
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _throttled(self) -> bool:
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        with StubHandler.lock:
+            StubHandler.api_calls = [t for t in StubHandler.api_calls if now - t < 1.0]
+            if len(StubHandler.api_calls) >= self.rate_limit:
+                return True
+            StubHandler.api_calls.append(now)
+        return False
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        with StubHandler.lock:
+            StubHandler.hits += 1
+        if self._throttled():
+            self._send_json(429, {"error": {"message": "Rate limit reached"}}, {"Retry-After": "1"})
+            return
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail_rate and random.random() < self.fail_rate:
+            self._send_json(500, {"error": {"message": "stub failure"}})
+            return
+        if url.path.endswith("/audio/speech"):
+            # Faux MP3 : octets déterministes proportionnels à la longueur du texte
+            text = str(payload.get("input", "")).encode("utf-8")
+            body = b"ID3" + hashlib.sha256(text).digest() * max(1, len(text) // 8)
+            self.send_response(200)
+            self.send_header("Content-Type", "audio/mpeg")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if url.path.endswith("/images/generations"):
+            seed = zlib.crc32(str(payload.get("prompt", "")).encode("utf-8"))
+            png = tiny_png(((seed >> 16) & 255, (seed >> 8) & 255, seed & 255))
+            self._send_json(200, {"data": [{"b64_json": base64.b64encode(png).decode("ascii")}]})
+            return
+        self.send_error(404)
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        with StubHandler.lock:
+            StubHandler.hits += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if url.path == "/feeds/videos.xml":
+            ucid = (parse_qs(url.query).get("channel_id") or ["UCstub"])[0]
+            body = atom_feed(ucid, self.entries).encode("utf-8")
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", "Mon, 01 Sep 2025 12:00:00 GMT")
+            self.send_header("Content-Type", "application/atom+xml; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        self.send_error(404)
+
+def serve(port: int = 0, entries: int = 15, latency: float = 0.0,
+          rate_limit: int = 0, fail_rate: float = 0.0) -> ThreadingHTTPServer:
+    """
+    Démarre le serveur dans un thread daemon et le renvoie (server.server_port = port réel).
+    """
+    StubHandler.entries = entries
+    StubHandler.latency = latency
+    StubHandler.rate_limit = rate_limit
+    StubHandler.fail_rate = fail_rate
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    p = argparse.ArgumentParser(description="Serveur local de fixtures (flux Atom YouTube, API OpenAI).")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--entries", type=int, default=15, help="Vidéos par flux")
+    p.add_argument("--latency", type=float, default=0.0, help="Latence simulée par requête (s)")
+    p.add_argument("--rate-limit", type=int, default=0, help="Requêtes API acceptées par seconde (0 = illimité)")
+    p.add_argument("--fail-rate", type=float, default=0.0, help="Probabilité d'une erreur 500 sur l'API")
+    args = p.parse_args()
+    server = serve(args.port, args.entries, args.latency, args.rate_limit, args.fail_rate)
+    print(f"🧪 Stub prêt : http://127.0.0.1:{server.server_port}/feeds/videos.xml?channel_id={{ucid}}")
+    print(f"🧪 API OpenAI : OPENAI_BASE_URL=http://127.0.0.1:{server.server_port}/v1")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+# build_concat_list.py
+# Génère list.txt (UTF-8 sans BOM) pour le concat demuxer de ffmpeg
+# à partir de social_images_out/<DATE>/*.png (équivalent Python du bloc PowerShell).
+# Usage : python build_concat_list.py <DATE> [duration] [list.txt]
+
+import os, sys, glob
+
+ROOT = os.getcwd()
+OUT_ROOT = os.path.join(ROOT, "social_images_out")
+DEFAULT_DURATION = 5.6
+
+def build_lines(date_str: str, duration: float = DEFAULT_DURATION) -> list[str]:
+    files = sorted(glob.glob(os.path.join(OUT_ROOT, date_str, "*.png")), key=os.path.basename)
+    lines = []
+    for i, path in enumerate(files):
+        lines.append(f"file '{os.path.abspath(path).replace(os.sep, '/')}'")
+        if i < len(files) - 1:
+            lines.append(f"duration {duration}")
+    return lines
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python build_concat_list.py <DATE> [duration] [list.txt]")
+        sys.exit(1)
+    date_str = sys.argv[1]
+    duration = float(sys.argv[2]) if len(sys.argv) >= 3 else DEFAULT_DURATION
+    out_path = sys.argv[3] if len(sys.argv) >= 4 else "list.txt"
+
+    lines = build_lines(date_str, duration)
+    if not lines:
+        print(f"❌ Aucune image .png dans {os.path.join(OUT_ROOT, date_str)}")
+        sys.exit(1)
+    with open(out_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    print(f"✅ {out_path} : {(len(lines) + 1) // 2} image(s)")
+
+if __name__ == "__main__":
+    main()
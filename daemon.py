@@ -0,0 +1,481 @@
+# daemon.py
+# Mode démon de FPL Radar : un seul process reste lancé et garde au chaud ce que chaque
+# exécution quotidienne repaie (interpréteur et imports, moteur pyttsx3, polices, dégradés
+# des palettes, session HTTP des flux, index SQLite, caches) ; les chaînes de channels.txt
+# sont interrogées à intervalle régulier (requêtes conditionnelles ETag / Last-Modified).
+# Les sorties du jour (résumés, script social, prompts, placeholders, voix off, ideas.json,
+# rapport) ne sont régénérées que si au moins une nouvelle vidéo est arrivée ; une régénération
+# ratée reste due (champ "pending" du fichier d'état) et est retentée à chaque passage.
+# La vidéo ffmpeg reste l'affaire de "radar pipeline" (process externe, rien à garder chaud).
+# Arrêt propre : Ctrl+C, SIGTERM ou "daemon.py stop" (fichier d'arrêt, marche aussi sous Windows) ;
+# le cycle en cours se termine avant la sortie.
+# Santé : .cache/daemon_status.json, lu par "daemon.py status" (code 0 = actif et en bonne santé).
+# Usage :
+#   python daemon.py run --interval 900 -w 8
+#   python daemon.py run --once              # un seul cycle (planificateur externe)
+#   python daemon.py status [--json]
+#   python daemon.py stop --wait 60
+#   python radar.py daemon run --profile
+
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import threading
+import traceback
+from datetime import datetime, UTC
+
+import tracing
+import youtube_fpl_agent as agent
+from disk_cache import CACHE_ROOT
+
+# --------- Paramètres ---------
+INTERVAL_S = int(os.getenv("RADAR_DAEMON_INTERVAL", 900))   # délai entre deux passages
+STUCK_S = int(os.getenv("RADAR_DAEMON_STUCK", 1800))        # cycle plus long = démon bloqué
+HEARTBEAT_S = 30                                            # mise à jour de l'état pendant l'attente
+STATUS_FILE = os.path.join(CACHE_ROOT, "daemon_status.json")
+STOP_FILE = os.path.join(CACHE_ROOT, "daemon.stop")
+OUTPUT_DIR = "fpl_summaries"
+DEFAULT_LIMIT = 2          # comme l'étape fetch du pipeline
+# Voix off : mêmes réglages que l'étape tts du pipeline
+TTS_VOICE, TTS_RATE, TTS_VOLUME, TTS_GENTLE = "Hazel", 140, 1.0, True
+
+# --------- Fichier d'état ---------
+
+def now_iso() -> str:
+    return datetime.now(UTC).isoformat(timespec="seconds")
+
+def read_status(path: str = STATUS_FILE) -> dict | None:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_status(status: dict, path: str = STATUS_FILE):
+    # Remplacement atomique : "status" ne lit jamais un fichier à moitié écrit
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(status, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+def pid_alive(pid: int | None) -> bool | None:
+    """
+    True / False sous POSIX ; None si inconnu (Windows : os.kill(pid, 0) y tuerait le process).
+    """
+    if not pid or os.name == "nt":
+        return None
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def age_s(iso: str | None) -> float | None:
+    if not iso:
+        return None
+    return (datetime.now(UTC) - datetime.fromisoformat(iso)).total_seconds()
+
+def health(status: dict | None) -> tuple[int, str]:
+    """
+    (code, message) : 0 = actif et sain, 1 = arrêté / jamais lancé, 2 = en difficulté.
+    """
+    if not status:
+        return 1, "⚪ Démon jamais lancé"
+    state = status.get("state")
+    if state == "stopped":
+        return 1, f"⚪ Démon arrêté proprement le {status.get('stopped', '?')}"
+    if pid_alive(status.get("pid")) is False:
+        return 2, f"🔴 Démon (pid {status.get('pid')}) disparu sans arrêt propre (état : {state})"
+    since = age_s(status.get("state_since")) or 0
+    beat = age_s(status.get("heartbeat"))
+    if state in ("polling", "regenerating") and since > STUCK_S:
+        return 2, f"🔴 Démon bloqué : « {state} » depuis {since / 60:.0f} min"
+    if state == "idle" and beat is not None and beat > 3 * HEARTBEAT_S:
+        return 2, f"🔴 Démon sans signe de vie depuis {beat / 60:.1f} min"
+    if status.get("last_error"):
+        return 2, f"🟠 Démon actif, dernier cycle en erreur : {status['last_error']}"
+    return 0, f"🟢 Démon actif (pid {status.get('pid')}), état : {state}"
+
+def running(status: dict | None) -> bool:
+    if not status or status.get("state") == "stopped":
+        return False
+    alive = pid_alive(status.get("pid"))
+    if alive is not None:
+        return alive
+    beat = age_s(status.get("heartbeat"))   # Windows : seul le battement fait foi
+    return beat is not None and beat <= 3 * HEARTBEAT_S
+
+# --------- Démon ---------
+
+class Daemon:
+    """
+    Ressources résidentes + boucle de passages. Une seule instance par dossier (.cache/).
+    """
+    def __init__(self, args):
+        self.args = args
+        self.stop_event = threading.Event()
+        self.engine = None
+        # Jours dont les vidéos sont déjà indexées mais les sorties pas encore régénérées :
+        # repris du démon précédent (le VideoIndex ne les signalera plus comme nouvelles)
+        pending = (read_status() or {}).get("pending") or []
+        self.status = {
+            "pid": os.getpid(), "started": now_iso(), "state": "starting", "state_since": now_iso(),
+            "heartbeat": now_iso(), "interval": args.interval, "cycles": 0, "regenerations": 0,
+            "new_videos": 0, "errors": 0, "last_error": None, "last_poll": None, "last_new": 0,
+            "last_regeneration": None, "last_cycle_s": None, "next_poll": None, "warm": {},
+            "pending": pending,
+        }
+
+    # --- État ---
+
+    def save_status(self, **fields):
+        self.status.update(fields, heartbeat=now_iso())
+        write_status(self.status)
+
+    def set_state(self, state: str):
+        self.save_status(state=state, state_since=now_iso())
+
+    def mark_pending(self, date_str: str):
+        # Écrit avant toute régénération : un échec (ou un arrêt brutal) ne perd pas le jour
+        if date_str not in self.status["pending"]:
+            self.save_status(pending=sorted(self.status["pending"] + [date_str]))
+
+    def clear_pending(self, date_str: str):
+        self.save_status(pending=[d for d in self.status["pending"] if d != date_str])
+
+    def request_stop(self, signum=None, frame=None):
+        if not self.stop_event.is_set():
+            print("🛑 Arrêt demandé : fin du cycle en cours puis sortie.")
+        self.stop_event.set()
+
+    def stopping(self) -> bool:
+        if not self.stop_event.is_set() and os.path.exists(STOP_FILE):
+            self.request_stop()
+        return self.stop_event.is_set()
+
+    # --- Ressources gardées chaudes ---
+
+    def open(self):
+        import render_placeholders
+        from archive_store import ArchiveStore, markdown_sections
+        from audio_cache import AudioCache
+        from feed_cache import FeedCache
+        from thumbnails import ThumbnailStore
+        from transcripts import TranscriptStore
+        from trends import TrendStore
+        from video_index import VideoIndex
+
+        args = self.args
+        with tracing.span("daemon.warm"):
+            os.makedirs(OUTPUT_DIR, exist_ok=True)
+            self.feed_cache = FeedCache()
+            self.session = feed_session(max(args.workers, args.per_host))
+            self.index = VideoIndex()
+            self.archive = ArchiveStore()
+            if not os.path.isfile(self.archive.path):
+                self.archive.compact(markdown_sections(OUTPUT_DIR))
+            self.trends = TrendStore()
+            if not self.trends.exists():
+                self.trends.rebuild_from_archive(self.archive)
+            self.transcripts = TranscriptStore() if args.transcripts else None
+            self.thumbs = ThumbnailStore() if args.report and (args.images != "full" or args.email) else None
+            self.audio_cache = AudioCache()
+
+            # Polices + dégradé de chaque palette : la première régénération ne les paie pas
+            with tracing.span("daemon.warm_render"):
+                render_placeholders.init_worker()
+                for idx in range(len(render_placeholders.PALETTES)):
+                    render_placeholders.background(idx)
+            warm = {"fonts": True, "palettes": len(render_placeholders.PALETTES), "tts_engine": False}
+
+            if args.tts:
+                import tts_pyttsx3
+                try:
+                    self.engine = tts_pyttsx3.init_engine(TTS_VOICE, TTS_RATE, TTS_VOLUME)
+                    warm["tts_engine"] = True
+                except Exception as e:   # pyttsx3 absent ou sans pilote audio : voix off désactivée
+                    print(f"⚠️ Moteur TTS indisponible ({type(e).__name__}: {e}) ; voix off ignorée.")
+        self.save_status(warm=warm)
+        print(f"🔥 Ressources chargées : polices, {warm['palettes']} palette(s), "
+              f"moteur TTS {'prêt' if warm['tts_engine'] else 'absent'}, session HTTP.")
+
+    def close(self):
+        self.index.close()
+        self.session.close()
+        self.feed_cache.evict()
+        if self.thumbs is not None:
+            self.thumbs.save()
+        if os.path.exists(STOP_FILE):
+            os.remove(STOP_FILE)
+        tracing.flush()
+        self.save_status(state="stopped", state_since=now_iso(), stopped=now_iso(), next_poll=None)
+        print("👋 Démon arrêté.")
+
+    # --- Passage ---
+
+    def poll(self, date_str: str) -> int:
+        """
+        Télécharge les flux et résume les vidéos inédites ; renvoie leur nombre.
+        """
+        args = self.args
+        # Relu à chaque passage : une chaîne ajoutée est prise en compte sans redémarrer
+        ucids = agent.read_channels(agent.CHANNELS_FILE)
+        with tracing.span("fetch_all", channels=len(ucids), workers=args.workers):
+            all_videos = agent.fetch_all_videos(ucids, workers=args.workers, per_host=args.per_host,
+                                                cache=self.feed_cache, session=self.session)
+        new = 0
+        for ucid, videos in zip(ucids, all_videos):
+            n = agent.process_channel(ucid, args.limit, date_str, OUTPUT_DIR, [],
+                                      videos=videos, pause=0, index=self.index,
+                                      archive=self.archive, trends=self.trends,
+                                      transcripts=self.transcripts)
+            if n:
+                self.mark_pending(date_str)
+            new += n
+        return new
+
+    def regenerate(self, date_str: str):
+        """
+        Sorties du jour, dans l'ordre du pipeline, avec les ressources déjà chargées.
+        """
+        import render_placeholders
+        args = self.args
+
+        with tracing.span("archive.write_day"):
+            self.archive.write_day(date_str, OUTPUT_DIR)
+        with tracing.span("trends.save"):
+            self.trends.save()
+        if self.transcripts:
+            self.transcripts.save()
+        if self.archive.stats()["blocks"] > agent.ARCHIVE_MAX_BLOCKS:
+            with tracing.span("archive.compact"):
+                self.archive.compact()
+        self.feed_cache.evict()
+
+        social_path = agent.write_social_script(date_str, OUTPUT_DIR, self.trends)
+        with tracing.span("image_prompts"):
+            agent.generate_images_from_prompts(agent.extract_prompts_from_script(social_path),
+                                               os.path.join("social_images", date_str))
+
+        jobs = render_placeholders.list_jobs(date_str)
+        os.makedirs(os.path.join(render_placeholders.OUT_ROOT, date_str), exist_ok=True)
+        with tracing.span("render", images=len(jobs), workers=1):
+            # En process : polices et dégradés résidents (pas de pool à relancer)
+            for out_path in render_placeholders.render_jobs(jobs, 1):
+                tracing.count("images.rendered")
+                tracing.count_file("bytes_written", out_path)
+        print(f"🖼️ {len(jobs)} visuel(s) dans social_images_out/{date_str}")
+
+        if self.engine is not None:
+            import tts_pyttsx3
+            voice = os.path.join("social_audio", date_str, "voice_uk_local_v2.wav")
+            with tracing.span("voiceover"):
+                tts_pyttsx3.generate_tts(social_path, voice, TTS_VOICE, TTS_RATE, TTS_VOLUME, TTS_GENTLE,
+                                         cache=self.audio_cache, engine=self.engine)
+
+        import export_ideas_today
+        with tracing.span("export"):
+            export_ideas_today.export()
+
+        if args.report:
+            import report_build_and_send as report
+            from thumbnails import ReportImages
+            images = ReportImages(args.images, report.OUT_FILE.parent, store=self.thumbs)
+            with tracing.span("build_report_stream", images=args.images):
+                summary = report.build_report_stream(report.DATA_FILE, report.OUT_FILE, images)
+            print(f"[OK] Rapport généré: {report.OUT_FILE}")
+            if args.email:
+                with tracing.span("render_mail"):
+                    body, mail_images = report.render_mail(summary, report.iter_ideas(report.DATA_FILE), images)
+                with tracing.span("send_outlook"):
+                    report.try_send_outlook(f"[FPL Radar] Rapport {summary['generated_at']}", html_body=body,
+                                            attachment_path=report.mail_attachment(images, report.OUT_FILE),
+                                            inline_images=mail_images.attachments())
+            if self.thumbs is not None:
+                self.thumbs.save()
+
+    def cycle(self):
+        t0 = time.perf_counter()
+        date_str = datetime.now(UTC).strftime("%Y-%m-%d")
+        self.set_state("polling")
+        new, regenerated, error = 0, 0, None
+        try:
+            with tracing.span("daemon.cycle", date=date_str):
+                new = self.poll(date_str)
+                if new:
+                    print(f"✨ {new} nouvelle(s) vidéo(s) : régénération des sorties du {date_str}.")
+                # Jours en attente : celui-ci, ou un précédent dont la régénération a échoué
+                for day in list(self.status["pending"]):
+                    if day != date_str or not new:
+                        print(f"🔁 Régénération en attente des sorties du {day}.")
+                    self.set_state("regenerating")
+                    self.regenerate(day)
+                    self.clear_pending(day)
+                    regenerated += 1
+        except Exception as e:
+            # Un passage raté ne tue pas le démon : erreur journalisée ; le jour reste dans
+            # "pending" et sa régénération est retentée au prochain passage
+            traceback.print_exc()
+            error = f"{type(e).__name__}: {e}"
+        elapsed = time.perf_counter() - t0
+        fields = {"cycles": self.status["cycles"] + 1, "last_poll": now_iso(), "last_new": new,
+                  "new_videos": self.status["new_videos"] + new, "last_cycle_s": round(elapsed, 3),
+                  "last_error": error}
+        if error:
+            fields["errors"] = self.status["errors"] + 1
+        if regenerated:
+            fields["regenerations"] = self.status["regenerations"] + regenerated
+            fields["last_regeneration"] = now_iso()
+        self.status.update(fields)
+        tracing.flush()
+        if not new and not regenerated and not error:
+            print(f"💤 Aucune nouvelle vidéo ({elapsed:.1f} s).")
+
+    def wait(self, seconds: float):
+        deadline = time.monotonic() + seconds
+        self.save_status(state="idle", state_since=now_iso(),
+                         next_poll=datetime.fromtimestamp(time.time() + seconds, UTC).isoformat(timespec="seconds"))
+        next_beat = time.monotonic() + HEARTBEAT_S
+        while not self.stopping():
+            left = deadline - time.monotonic()
+            if left <= 0:
+                return
+            if time.monotonic() >= next_beat:
+                self.save_status()
+                next_beat += HEARTBEAT_S
+            self.stop_event.wait(min(left, 1.0))
+
+    def run(self):
+        for name in ("SIGINT", "SIGTERM", "SIGBREAK"):   # SIGBREAK : Ctrl+Break sous Windows
+            if hasattr(signal, name):
+                signal.signal(getattr(signal, name), self.request_stop)
+        if os.path.exists(STOP_FILE):
+            os.remove(STOP_FILE)   # reste d'un "stop" sans démon actif
+        self.open()
+        try:
+            while not self.stopping():
+                self.cycle()
+                if self.args.once:
+                    break
+                self.wait(self.args.interval)
+        finally:
+            self.close()
+
+def feed_session(pool: int):
+    """
+    Session HTTP des flux, ouverte pour toute la vie du démon (keep-alive entre passages).
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool, pool_maxsize=pool)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+# --------- CLI ---------
+
+def cmd_run(args) -> int:
+    tracing.start("daemon", args.profile)
+    if not os.path.isfile(agent.CHANNELS_FILE):
+        print(f"Fichier {agent.CHANNELS_FILE} introuvable.")
+        return 1
+    status = read_status()
+    if running(status):
+        print(f"❌ Un démon tourne déjà : {health(status)[1]}")
+        return 1
+    Daemon(args).run()
+    return 0
+
+def cmd_status(args) -> int:
+    status = read_status()
+    if args.json:
+        print(json.dumps(status, ensure_ascii=False, indent=2))
+        return health(status)[0]
+    code, message = health(status)
+    print(message)
+    if status:
+        print(f"   Lancé le {status.get('started')}, {status.get('cycles', 0)} passage(s), "
+              f"{status.get('regenerations', 0)} régénération(s), {status.get('new_videos', 0)} vidéo(s), "
+              f"{status.get('errors', 0)} erreur(s)")
+        if status.get("last_poll"):
+            print(f"   Dernier passage : {status['last_poll']} ({status.get('last_new', 0)} nouvelle(s), "
+                  f"{status.get('last_cycle_s')} s)")
+        if status.get("last_regeneration"):
+            print(f"   Dernière régénération : {status['last_regeneration']}")
+        if status.get("pending"):
+            print(f"   Régénération en attente : {', '.join(status['pending'])}")
+        if status.get("next_poll") and status.get("state") != "stopped":
+            print(f"   Prochain passage : {status['next_poll']}")
+        warm = status.get("warm") or {}
+        if warm:
+            print(f"   Ressources : polices {'✓' if warm.get('fonts') else '✗'}, "
+                  f"{warm.get('palettes', 0)} palette(s), moteur TTS {'✓' if warm.get('tts_engine') else '✗'}")
+    return code
+
+def cmd_stop(args) -> int:
+    status = read_status()
+    if not status or status.get("state") == "stopped":
+        print("⚪ Aucun démon actif.")
+        return 0
+    # Fichier d'arrêt plutôt qu'un signal : même comportement sous Windows
+    os.makedirs(os.path.dirname(STOP_FILE) or ".", exist_ok=True)
+    with open(STOP_FILE, "w", encoding="utf-8") as f:
+        f.write(now_iso())
+    print(f"🛑 Arrêt demandé au démon (pid {status.get('pid')}).")
+    if not args.wait:
+        return 0
+    deadline = time.monotonic() + args.wait
+    while time.monotonic() < deadline:
+        status = read_status() or {}
+        if status.get("state") == "stopped" or pid_alive(status.get("pid")) is False:
+            print("👋 Démon arrêté.")
+            return 0
+        time.sleep(0.5)
+    print(f"⏳ Toujours actif après {args.wait} s (cycle en cours ?).")
+    return 1
+
+def parse_args():
+    p = argparse.ArgumentParser(description="FPL Radar en continu : ressources gardées chaudes, "
+                                            "régénération à l'arrivée de nouvelles vidéos.")
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    r = sub.add_parser("run", help="Lancer le démon (premier plan ; Ctrl+C pour arrêter)")
+    r.add_argument("--interval", "-i", type=int, default=INTERVAL_S,
+                   help="Secondes entre deux passages (env RADAR_DAEMON_INTERVAL)")
+    r.add_argument("--once", action="store_true", help="Un seul passage puis arrêt")
+    r.add_argument("--limit", "-n", type=int, default=DEFAULT_LIMIT, help="Vidéos regardées par chaîne")
+    r.add_argument("--workers", "-w", type=int, default=4, help="Flux téléchargés en parallèle")
+    r.add_argument("--per-host", type=int, default=agent.PER_HOST_LIMIT,
+                   help="Requêtes simultanées max vers un même hôte")
+    r.add_argument("--transcripts", action=argparse.BooleanOptionalAction, default=agent.USE_TRANSCRIPTS,
+                   help="Résumer depuis les transcriptions")
+    r.add_argument("--tts", action=argparse.BooleanOptionalAction, default=True,
+                   help="Voix off locale (moteur pyttsx3 gardé chargé)")
+    r.add_argument("--report", action=argparse.BooleanOptionalAction, default=True,
+                   help="Rapport HTML à chaque régénération")
+    r.add_argument("--images", default=os.getenv("REPORT_IMAGES", "link"), choices=("full", "link", "inline"),
+                   help="Images du rapport sur disque (voir thumbnails.py) ; le mail est toujours en cid")
+    r.add_argument("--email", action="store_true",
+                   help="Envoyer le rapport par Outlook à chaque régénération (REPORT_EMAIL_TO)")
+    tracing.add_argument(r)
+
+    s = sub.add_parser("status", help="État et santé du démon (code 0 = sain)")
+    s.add_argument("--json", action="store_true", help="Fichier d'état brut")
+
+    st = sub.add_parser("stop", help="Arrêt propre (après le cycle en cours)")
+    st.add_argument("--wait", type=float, default=0, help="Attendre l'arrêt effectif (secondes)")
+    return p.parse_args()
+
+def main():
+    args = parse_args()
+    return {"run": cmd_run, "status": cmd_status, "stop": cmd_stop}[args.cmd](args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+# disk_cache.py
+# Outils communs aux caches disque du projet (.cache/<type>/...) :
+# clés de contenu, répertoires, éviction par âge (TTL) et par taille totale.
+
+import os
+import glob
+import time
+import shutil
+import hashlib
+
+CACHE_ROOT = os.getenv("RADAR_CACHE_DIR", ".cache")
+
+def cache_dir(kind: str) -> str:
+    path = os.path.join(CACHE_ROOT, kind)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def content_key(*parts) -> str:
+    """
+    Clé sha256 stable construite à partir de plusieurs éléments (texte, paramètres...).
+    """
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, bytes):
+            h.update(part)
+        else:
+            h.update(str(part).encode("utf-8"))
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+def touch(path: str):
+    """
+    Met à jour la date d'accès/modification (sert d'horodatage LRU).
+    """
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+
+def prune(directory: str, max_bytes: int | None = None, ttl_s: float | None = None, pattern: str = "*") -> int:
+    """
+    Supprime les fichiers plus vieux que ttl_s, puis les moins récemment utilisés
+    (mtime) jusqu'à repasser sous max_bytes. Renvoie le nombre de fichiers supprimés.
+    """
+    entries = []
+    for path in glob.glob(os.path.join(directory, pattern)):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        if os.path.isfile(path):
+            entries.append((st.st_mtime, st.st_size, path))
+    removed = 0
+    now = time.time()
+    if ttl_s is not None:
+        keep = []
+        for mtime, size, path in entries:
+            if now - mtime > ttl_s:
+                removed += _remove(path)
+            else:
+                keep.append((mtime, size, path))
+        entries = keep
+    if max_bytes is not None:
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            removed += _remove(path)
+            total -= size
+    return removed
+
+def _remove(path: str) -> int:
+    try:
+        os.remove(path)
+        return 1
+    except OSError:
+        return 0
+
+class FileCache:
+    """
+    Cache adressé par contenu : un fichier <clé><suffixe> par entrée, éviction LRU par taille.
+    Une entrée est liée (hard link) ou copiée vers la sortie demandée.
+    """
+    def __init__(self, kind: str, suffix: str, max_bytes: int, directory: str | None = None):
+        self.directory = directory or cache_dir(kind)
+        os.makedirs(self.directory, exist_ok=True)
+        self.suffix = suffix
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}{self.suffix}")
+
+    def fetch_into(self, key: str, out_path: str) -> bool:
+        """
+        Si l'entrée existe, la place dans out_path (lien, sinon copie) et renvoie True.
+        Sinon out_path n'est libéré que s'il est lié à une entrée du cache : une génération
+        ratée laisse en place l'ancienne sortie (placeholder, rendu précédent).
+        """
+        src = self.path(key)
+        os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+        if not os.path.isfile(src):
+            # Une écriture en place (pyttsx3, PIL) dans ce lien modifierait le cache
+            if self.linked(out_path):
+                os.remove(out_path)
+            self.misses += 1
+            return False
+        if not (os.path.isfile(out_path) and os.path.samefile(src, out_path)):
+            # Remplacement atomique : la sortie existante ne disparaît jamais avant la nouvelle
+            tmp = out_path + ".tmp"
+            if os.path.lexists(tmp):
+                os.remove(tmp)
+            try:
+                os.link(src, tmp)
+            except OSError:
+                shutil.copyfile(src, tmp)
+            os.replace(tmp, out_path)
+        touch(src)  # horodatage LRU
+        self.hits += 1
+        return True
+
+    def linked(self, out_path: str) -> bool:
+        """
+        True si out_path est un lien dur vers une entrée du cache.
+        """
+        try:
+            st = os.stat(out_path)
+        except OSError:
+            return False
+        if st.st_nlink < 2:
+            return False
+        with os.scandir(self.directory) as entries:
+            return any(e.name.endswith(self.suffix) and os.path.samestat(e.stat(), st) for e in entries)
+
+    def touch(self, key: str):
+        touch(self.path(key))
+
+    def store(self, key: str, src_path: str):
+        """
+        Copie un fichier fraîchement produit dans le cache (indépendant de la sortie).
+        """
+        tmp = self.path(key) + ".tmp"
+        shutil.copyfile(src_path, tmp)
+        os.replace(tmp, self.path(key))
+
+    def evict(self) -> int:
+        return prune(self.directory, max_bytes=self.max_bytes, pattern=f"*{self.suffix}")
@@ -8,6 +8,9 @@ import datetime as _dt
 import pathlib as _pl
 import json as _json
 import re as _re
+import argparse as _argparse
+
+import tracing
 
 BASE = _pl.Path(__file__).resolve().parent
 IMAGES_ROOT = BASE / "social_images_out"
@@ -59,6 +62,14 @@ def _find_target_date_folder() -> tuple[_pl.Path, str] | None:
     return chosen, chosen.name
 
 def main() -> None:
+    p = _argparse.ArgumentParser(description="Exporte data/ideas.json depuis les visuels du jour.")
+    tracing.add_argument(p)
+    args = p.parse_args()
+    tracing.start("export_ideas_today", args.profile)
+    with tracing.span("export"):
+        export()
+
+def export() -> None:
     found = _find_target_date_folder()
     if not found:
         print(f"[INFO] Aucun dossier d'images trouvé dans {IMAGES_ROOT}")
@@ -87,6 +98,8 @@ def main() -> None:
 
     OUT_DIR.mkdir(parents=True, exist_ok=True)
     OUT_FILE.write_text(_json.dumps(ideas, ensure_ascii=False, indent=2), encoding="utf-8")
+    tracing.count("ideas", len(ideas))
+    tracing.count_file("bytes_written", OUT_FILE)
     print(f"[OK] {len(ideas)} idées exportées vers {OUT_FILE}")
 
 if __name__ == "__main__":
@@ -0,0 +1,103 @@
+# feed_cache.py
+# Cache disque des flux Atom YouTube : ETag / Last-Modified + vidéos déjà parsées.
+# Un 304 réutilise les vidéos en cache sans parser le flux.
+
+import os
+import json
+import time
+import threading
+from datetime import datetime
+
+from disk_cache import cache_dir, prune
+
+FEED_CACHE_TTL_S = float(os.getenv("FEED_CACHE_TTL_S", 7 * 24 * 3600))
+FEED_CACHE_MAX_BYTES = int(os.getenv("FEED_CACHE_MAX_BYTES", 20 * 1024 * 1024))
+
+class FeedCache:
+    def __init__(self, directory: str | None = None,
+                 ttl_s: float = FEED_CACHE_TTL_S, max_bytes: int = FEED_CACHE_MAX_BYTES):
+        self.directory = directory or cache_dir("feeds")
+        os.makedirs(self.directory, exist_ok=True)
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.stale = 0
+        self._lock = threading.Lock()
+
+    def _path(self, ucid: str) -> str:
+        return os.path.join(self.directory, f"{ucid}.json")
+
+    def _count(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def lookup(self, ucid: str) -> dict | None:
+        """
+        Renvoie l'entrée {etag, modified, videos} si elle existe et n'a pas expiré.
+        Le hit n'est compté qu'au 304 (mark_not_modified) : une entrée trouvée puis
+        remplacée par un 200 est un miss (mark_modified).
+        """
+        path = self._path(ucid)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self._count("misses")
+            return None
+        if time.time() - entry.get("fetched_at", 0) > self.ttl_s:
+            self._count("misses")
+            return None
+        for v in entry.get("videos", []):
+            v["published_dt"] = datetime.fromisoformat(v["published_dt"])
+        return entry
+
+    def store(self, ucid: str, etag: str | None, modified: str | None, videos: list):
+        entry = {
+            "etag": etag,
+            "modified": modified,
+            "fetched_at": time.time(),
+            "videos": [{**v, "published_dt": v["published_dt"].isoformat()} for v in videos],
+        }
+        self._write(ucid, entry)
+
+    def _write(self, ucid: str, entry: dict):
+        tmp = self._path(ucid) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp, self._path(ucid))
+
+    def mark_not_modified(self, ucid: str):
+        """
+        Réponse 304 : le flux n'a pas changé, on prolonge la validité de l'entrée.
+        """
+        self._count("hits")
+        self._count("not_modified")
+        try:
+            with open(self._path(ucid), encoding="utf-8") as f:
+                entry = json.load(f)
+            entry["fetched_at"] = time.time()
+            self._write(ucid, entry)
+        except (OSError, ValueError):
+            pass
+
+    def mark_modified(self, ucid: str):
+        """
+        Entrée trouvée mais remplacée par un flux re-téléchargé (200) : vidéos en cache non réutilisées.
+        """
+        self._count("misses")
+
+    def mark_stale(self, ucid: str):
+        """
+        Téléchargement raté (réseau, 4xx/5xx, flux illisible) : vidéos en cache réutilisées
+        telles quelles, sans prolonger l'entrée (ni hit ni miss).
+        """
+        self._count("stale")
+
+    def evict(self) -> int:
+        return prune(self.directory, max_bytes=self.max_bytes, ttl_s=self.ttl_s, pattern="*.json")
+
+    def stats_line(self) -> str:
+        line = f"📦 Cache flux : {self.hits} hit(s), {self.misses} miss, {self.not_modified} × 304"
+        return line + (f", {self.stale} flux en erreur (cache réutilisé)" if self.stale else "")
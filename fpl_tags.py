@@ -0,0 +1,54 @@
+# fpl_tags.py
+# Étiquettes FPL extraites d'un titre de vidéo (GWxx, Wildcard, Free Hit, Watchlist...).
+# Partagé par le résumé (youtube_fpl_agent.summarize_from_title) et les index d'archive.
+# La reconnaissance s'appuie sur title_analysis (dictionnaire data/fpl_dictionary.json).
+
+import re
+
+from title_analysis import default_analyzer
+
+# À incrémenter quand les règles changent : les index dérivés se reconstruisent
+TAGGER_VERSION = 3
+
+def normalize_title(title: str) -> str:
+    return re.sub(r"\s+", " ", (title or "").strip())
+
+def extract_tags(title: str) -> list[str]:
+    """
+    Étiquettes du titre (GWxx et jargon FPL), dans l'ordre d'apparition et sans doublon.
+    """
+    return default_analyzer().analyze(title)["tags"]
+
+# Mots capitalisés qui entourent parfois un nom dans les listes des titres ("Buy Saka", "Ekitike In")
+NOT_NAMES = {"Buy", "Sell", "Get", "In", "Out", "Captain", "Most", "Goals", "Assists", "Back", "The", "To", "Or", "Vs"}
+
+def listed_names(title: str) -> list[str]:
+    """
+    Noms cités dans les segments-listes du titre ("Wood, Cunha & Cucurella") : éléments
+    de 1 à 3 mots capitalisés (les MAJUSCULES sont des intitulés).
+    """
+    names = []
+    for segment in normalize_title(title).split("|"):
+        if not re.search(r",|&|\band\b", segment):
+            continue
+        for item in re.split(r",|&|\band\b", segment):
+            words = re.sub(r"[!?.']+$", "", item.strip()).split()
+            while words and words[0] in NOT_NAMES:
+                words.pop(0)
+            while words and words[-1] in NOT_NAMES:
+                words.pop()
+            if 1 <= len(words) <= 3 and all(w[:1].isupper() and not w.isupper() for w in words):
+                names.append(" ".join(words))
+    return names
+
+def extract_players(title: str) -> list[str]:
+    """
+    Joueurs du dictionnaire (nom canonique), puis noms inconnus des segments-listes du titre.
+    """
+    analyzer = default_analyzer()
+    names = analyzer.analyze(title)["players"]
+    for name in listed_names(title):
+        found = analyzer.analyze(name)
+        if not (found["players"] or found["clubs"]):   # déjà compté sous son nom canonique
+            names.append(name)
+    return list(dict.fromkeys(names))
@@ -0,0 +1,27 @@
+# image_cache.py
+# Cache adressé par contenu des images générées : clé = hash(prompt, modèle, taille).
+# Une image déjà rendue est liée (hard link) ou copiée dans social_images_out/<date>/
+# au lieu de rappeler l'API.
+
+import os
+
+from disk_cache import FileCache, content_key
+
+IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_BYTES", 500 * 1024 * 1024))
+
+class ImageCache(FileCache):
+    def __init__(self, directory: str | None = None, max_bytes: int = IMAGE_CACHE_MAX_BYTES):
+        super().__init__("images", ".png", max_bytes, directory)
+        self.api_calls = 0
+
+    @staticmethod
+    def key(prompt: str, model: str, size: str) -> str:
+        return content_key(prompt, model, size)
+
+    def store(self, key: str, src_path: str):
+        self.api_calls += 1
+        super().store(key, src_path)
+
+    def stats_line(self) -> str:
+        return (f"🗄️ Cache images : {self.hits} hit(s) = {self.hits} appel(s) API évité(s), "
+                f"{self.api_calls} appel(s) API")
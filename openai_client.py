@@ -0,0 +1,167 @@
+# openai_client.py
+# Couche HTTP commune aux appels OpenAI (images, TTS) :
+# - une Session requests partagée (keep-alive, taille de pool réglable),
+# - timeouts unifiés,
+# - reprises exponentielles avec jitter (Retry-After respecté),
+# - métriques par requête : latence, octets envoyés / reçus.
+
+import os
+import sys
+import time
+import json
+import random
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import tracing
+from rate_limit import retry_after_seconds
+
+BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/")
+POOL_SIZE = int(os.getenv("OPENAI_POOL_SIZE", 10))
+CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", 10))
+READ_TIMEOUT = float(os.getenv("OPENAI_READ_TIMEOUT", 120))
+RETRIES = int(os.getenv("OPENAI_RETRIES", 3))
+BACKOFF_S = 1.0
+
+class RetryableError(RuntimeError):
+    """Erreur transitoire (429, 5xx, réseau) : la requête peut être rejouée."""
+    def __init__(self, message, retry_after=None, throttled=False):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.throttled = throttled
+
+class ApiError(RuntimeError):
+    """Erreur définitive renvoyée par l'API (4xx hors 429)."""
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+class Metrics:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.latencies = []
+        self._lock = threading.Lock()
+
+    def record(self, latency, sent=0, received=0, error=False):
+        with self._lock:
+            self.requests += 1
+            self.errors += int(error)
+            self.bytes_sent += sent
+            self.bytes_received += received
+            self.latencies.append(latency)
+        tracing.count("api.openai_calls")
+        tracing.count("api.bytes_sent", sent)
+        tracing.count("api.bytes_received", received)
+
+    def add_received(self, n):
+        with self._lock:
+            self.bytes_received += n
+        tracing.count("api.bytes_received", n)
+
+    def add_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def summary_line(self) -> str:
+        if not self.requests:
+            return "🌐 HTTP OpenAI : aucune requête"
+        lat = sorted(self.latencies)
+        p50 = lat[len(lat) // 2]
+        return (f"🌐 HTTP OpenAI : {self.requests} requête(s), {self.retries} reprise(s), {self.errors} erreur(s), "
+                f"latence p50={p50:.2f}s max={lat[-1]:.2f}s, "
+                f"↑{self.bytes_sent / 1024:.1f} Ko ↓{self.bytes_received / 1024:.1f} Ko")
+
+METRICS = Metrics()
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session() -> requests.Session:
+    """
+    Session partagée par tous les appels du process (connexions TLS réutilisées).
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            _session = s
+        return _session
+
+def api_key() -> str | None:
+    return os.getenv("OPENAI_API_KEY")
+
+def require_api_key():
+    # Appelé par le main() des scripts et non à l'import : les modules restent réutilisables sans clé
+    if not api_key():
+        print("❌ OPENAI_API_KEY manquant dans l'environnement.")
+        print("   PowerShell (session): $env:OPENAI_API_KEY = 'sk-...'")
+        sys.exit(1)
+
+def backoff_delay(attempt: int, retry_after: float | None = None, base: float = BACKOFF_S) -> float:
+    # Retry-After prioritaire, sinon backoff exponentiel avec jitter (0.5x - 1.5x)
+    if retry_after is not None:
+        return retry_after
+    return base * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+
+def post_once(path: str, payload: dict, stream: bool = False) -> requests.Response:
+    """
+    Une seule tentative de POST JSON. Lève RetryableError (429, 5xx, réseau) ou ApiError.
+    """
+    body = json.dumps(payload).encode("utf-8")
+    headers = {
+        "Authorization": f"Bearer {api_key()}",
+        "Content-Type": "application/json",
+    }
+    t0 = time.perf_counter()
+    try:
+        r = get_session().post(f"{BASE_URL}{path}", headers=headers, data=body, stream=stream,
+                               timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+    except requests.RequestException as e:
+        METRICS.record(time.perf_counter() - t0, len(body), error=True)
+        raise RetryableError(str(e)) from e
+    received = 0 if stream and r.status_code == 200 else len(r.content)
+    METRICS.record(time.perf_counter() - t0, len(body), received, error=r.status_code != 200)
+    if r.status_code == 200:
+        return r
+    # tente de lire l'erreur JSON
+    try:
+        err = r.json()
+    except Exception:
+        err = r.text
+    if r.status_code == 429 or r.status_code >= 500:
+        raise RetryableError(f"{r.status_code} -> {err}", retry_after_seconds(r.headers),
+                             throttled=r.status_code == 429)
+    raise ApiError(f"{r.status_code} -> {err}", r.status_code)
+
+def post(path: str, payload: dict, stream: bool = False, retries: int = RETRIES) -> requests.Response:
+    """
+    POST avec reprises exponentielles (jitter, Retry-After) sur les erreurs transitoires.
+    """
+    for attempt in range(1, retries + 1):
+        try:
+            return post_once(path, payload, stream=stream)
+        except RetryableError as e:
+            if attempt >= retries:
+                raise RuntimeError(f"Echec API après {retries} tentatives: {e}") from e
+            wait_s = backoff_delay(attempt, e.retry_after)
+            print(f"❗ API error (try {attempt}/{retries}): {e} — nouvel essai dans {wait_s:.1f}s")
+            METRICS.add_retry()
+            time.sleep(wait_s)
+
+def iter_content(r: requests.Response, chunk_size: int = 8192):
+    """
+    Itère sur une réponse en streaming en comptabilisant les octets reçus.
+    """
+    for chunk in r.iter_content(chunk_size=chunk_size):
+        if chunk:
+            METRICS.add_received(len(chunk))
+            yield chunk
@@ -0,0 +1,368 @@
+# pipeline.py
+# Exécute la chaîne quotidienne FPL Radar (remplace daily_run.bat, fonctionne sous Linux).
+# Chaque étape déclare ses entrées / sorties, façon Makefile :
+# - une étape dont les entrées (hash de contenu) n'ont pas changé est sautée,
+# - après un échec, la relance reprend à l'étape en échec (les précédentes sont à jour),
+# - les étapes indépendantes (placeholders / tts) tournent en parallèle (--jobs).
+# - les entrées d'un script incluent les modules du projet qu'il importe (graphe lu par ast) ;
+# - fetch (requêtes aux flux YouTube) dépend de channels.txt, du code et de la date : elle
+#   tourne au premier passage du jour ; --poll la relance pour voir les vidéos publiées depuis
+#   (les étapes suivantes ne repartent que si ses sorties ont changé). Une relance sans
+#   changement saute toutes les étapes.
+# Usage :
+#   python pipeline.py                  # date du jour (UTC, comme youtube_fpl_agent.py)
+#   python pipeline.py --date 2025-09-07 --from placeholders
+#   python pipeline.py --poll           # interroger à nouveau les flux (nouvelles vidéos)
+#   python pipeline.py --force          # tout relancer
+#   python pipeline.py --jobs 1         # étapes une par une (défaut : PIPELINE_JOBS=2)
+
+import os
+import ast
+import sys
+import glob
+import json
+import time
+import hashlib
+import argparse
+import subprocess
+from datetime import datetime, UTC
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Toujours depuis le dossier du projet (comme le pushd de daily_run.bat)
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATE_FILE = os.path.join(ROOT, ".cache", "pipeline_state.json")
+FFMPEG_BIN = os.getenv("FFMPEG_BIN", "ffmpeg")
+PY = sys.executable
+JOBS = int(os.getenv("PIPELINE_JOBS", 2))   # étapes lancées en parallèle max
+
+class Stage:
+    def __init__(self, name, cmd, inputs=(), outputs=(), deps=()):
+        self.name = name
+        self.cmd = list(cmd)
+        self.inputs = list(inputs)     # motifs glob relatifs à ROOT (dossier du projet)
+        self.outputs = list(outputs)   # motifs glob : chacun doit exister après l'étape
+        self.deps = list(deps)
+
+def module_inputs(script: str, seen: set[str] | None = None) -> list[str]:
+    """
+    Le script et les modules du projet qu'il importe, récursivement (imports paresseux
+    dans les fonctions compris) : modifier l'un d'eux invalide l'étape.
+    """
+    seen = set() if seen is None else seen
+    if script in seen or not os.path.isfile(os.path.join(ROOT, script)):
+        return sorted(seen)
+    seen.add(script)
+    with open(os.path.join(ROOT, script), encoding="utf-8") as f:
+        tree = ast.parse(f.read(), script)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [a.name for a in node.names]
+        elif isinstance(node, ast.ImportFrom) and not node.level and node.module:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            module_inputs(name.split(".")[0] + ".py", seen)
+    return sorted(seen)
+
+def build_stages(date: str) -> list[Stage]:
+    social_md = f"fpl_summaries/social_{date}.md"
+    prompts = f"social_images/{date}/*.txt"
+    pngs = f"social_images_out/{date}/*.png"
+    voice = f"social_audio/{date}/voice_uk_local_v2.wav"
+    video = f"out/short_{date}.mp4"
+    return [
+        # Flux YouTube : une fois par date ; --poll pour les vidéos publiées depuis
+        Stage("fetch",
+              [PY, "youtube_fpl_agent.py", "--multi", "--limit", "2",
+               "--generate-social", "--generate-images", "--voiceover"],
+              inputs=["channels.txt", "data/fpl_dictionary.json", *module_inputs("youtube_fpl_agent.py")],
+              outputs=[social_md, prompts]),
+        # Index de recherche de l'archive (seuls les fichiers modifiés sont relus)
+        Stage("search_index",
+              [PY, "search_index.py", "update"],
+              inputs=["fpl_summaries/????-??-??.md", "data/fpl_dictionary.json", *module_inputs("search_index.py")],
+              outputs=[".cache/search_index.sqlite"], deps=["fetch"]),
+        Stage("placeholders",
+              [PY, "render_placeholders.py", date],
+              inputs=[prompts, *module_inputs("render_placeholders.py")],
+              outputs=[pngs], deps=["fetch"]),
+        Stage("tts",
+              [PY, "tts_pyttsx3.py", social_md, voice, "Hazel", "140", "1.0", "gentle"],
+              inputs=[social_md, *module_inputs("tts_pyttsx3.py")],
+              outputs=[voice], deps=["fetch"]),
+        Stage("concat_list",
+              [PY, "build_concat_list.py", date, "5.6", "list.txt"],
+              inputs=[pngs, *module_inputs("build_concat_list.py")],
+              outputs=["list.txt"], deps=["placeholders"]),
+        # Vidéo finale 1080x1080 + audio normalisé + fades
+        Stage("video",
+              [FFMPEG_BIN, "-y", "-f", "concat", "-safe", "0", "-i", "list.txt", "-i", voice,
+               "-filter_complex",
+               "[0:v]fps=30,scale=1080:1080:flags=lanczos,format=yuv420p[v];"
+               "[1:a]dynaudnorm=f=200:g=25,afade=t=in:st=0:d=0.5,afade=t=out:st=30:d=3[a]",
+               "-map", "[v]", "-map", "[a]", "-c:v", "libx264", "-crf", "20", "-preset", "veryfast",
+               "-c:a", "aac", "-b:a", "128k", "-movflags", "+faststart", "-shortest", video],
+              inputs=["list.txt", pngs, voice],
+              outputs=[video], deps=["concat_list", "tts"]),
+        Stage("export",
+              [PY, "export_ideas_today.py"],
+              inputs=[pngs, social_md, *module_inputs("export_ideas_today.py")],
+              outputs=["data/ideas.json"], deps=["placeholders"]),
+        # Vignettes du rapport (en parallèle de l'export)
+        Stage("thumbs",
+              [PY, "thumbnails.py", date],
+              inputs=[pngs, *module_inputs("thumbnails.py")],
+              outputs=["out/thumbs/index.json"], deps=["placeholders"]),
+        Stage("report",
+              [PY, "report_build_and_send.py", "--stream"],
+              inputs=["data/ideas.json", *module_inputs("report_build_and_send.py")],
+              outputs=["out/report.html"], deps=["export", "thumbs"]),
+    ]
+
+# --------- État & hash ---------
+
+def load_state() -> dict:
+    try:
+        with open(STATE_FILE, encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = {}
+    state.setdefault("stages", {})
+    state.setdefault("files", {})
+    return state
+
+def save_state(state: dict):
+    os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+    tmp = STATE_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, STATE_FILE)
+
+def file_digest(path: str, files: dict) -> str:
+    """
+    sha256 du contenu ; recalculé seulement si taille ou mtime ont changé.
+    """
+    st = os.stat(path)
+    rel = os.path.relpath(path, ROOT)
+    known = files.get(rel)
+    if known and known[0] == st.st_size and known[1] == st.st_mtime_ns:
+        return known[2]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    files[rel] = [st.st_size, st.st_mtime_ns, h.hexdigest()]
+    return h.hexdigest()
+
+def expand(patterns: list[str]) -> list[str]:
+    paths = set()
+    for pattern in patterns:
+        paths.update(p for p in glob.glob(os.path.join(ROOT, pattern)) if os.path.isfile(p))
+    return sorted(paths)
+
+def stage_key(stage: Stage, date: str, files: dict) -> str:
+    h = hashlib.sha256()
+    h.update(json.dumps([date, stage.cmd]).encode("utf-8"))
+    for path in expand(stage.inputs):
+        h.update(os.path.relpath(path, ROOT).encode("utf-8"))
+        h.update(file_digest(path, files).encode("ascii"))
+    return h.hexdigest()
+
+def outputs_exist(stage: Stage) -> bool:
+    return all(glob.glob(os.path.join(ROOT, pattern)) for pattern in stage.outputs)
+
+# --------- Exécution ---------
+
+def downstream(stages: list[Stage], names: set[str]) -> set[str]:
+    # Étapes `names` et tout ce qui en dépend
+    result = set(names)
+    changed = True
+    while changed:
+        changed = False
+        for s in stages:
+            if s.name not in result and result.intersection(s.deps):
+                result.add(s.name)
+                changed = True
+    return result
+
+def run_stage(stage: Stage, capture: bool = False) -> tuple[bool, float, str]:
+    """
+    Lance l'étape dans un processus séparé.
+    capture=True : sortie gardée pour être affichée d'un bloc (étapes parallèles non entremêlées).
+    """
+    t0 = time.perf_counter()
+    output = ""
+    try:
+        if capture:
+            proc = subprocess.run(stage.cmd, cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                  text=True, encoding="utf-8", errors="replace")
+            output = proc.stdout
+        else:
+            proc = subprocess.run(stage.cmd, cwd=ROOT)
+        ok = proc.returncode == 0
+    except OSError as e:
+        output = f"❌ {stage.name} : impossible de lancer {stage.cmd[0]} ({e})\n"
+        ok = False
+    return ok, time.perf_counter() - t0, output
+
+def critical_path(stages: list[Stage], durations: dict[str, float]) -> tuple[list[str], float]:
+    """
+    Plus longue chaîne de dépendances (en durée) : c'est elle qui borne le temps total.
+    Étapes sautées ou non lancées : durée 0.
+    """
+    best = {}   # nom -> (durée cumulée, chemin)
+    for s in stages:   # build_stages() liste les dépendances avant leurs dépendants
+        prev = max((best[d] for d in s.deps if d in best), default=(0.0, []), key=lambda b: b[0])
+        best[s.name] = (prev[0] + durations.get(s.name, 0.0), prev[1] + [s.name])
+    total, path = max(best.values(), key=lambda b: b[0], default=(0.0, []))
+    return path, total
+
+def print_timings(stages: list[Stage], status: dict, timings: dict, wall: float):
+    print("⏱️ Étapes :")
+    for s in stages:
+        if s.name in timings:
+            start, end = timings[s.name]
+            print(f"   {s.name:<13} {start:7.2f} → {end:7.2f} s  ({end - start:.2f} s)")
+        else:
+            label = {"skipped": "inchangée", "blocked": "bloquée"}.get(status.get(s.name), "non lancée")
+            print(f"   {s.name:<13} {label}")
+    durations = {name: end - start for name, (start, end) in timings.items()}
+    path, total = critical_path(stages, durations)
+    if path and total > 0:
+        print(f"🧭 Chemin critique : {' → '.join(path)} = {total:.2f} s (mur : {wall:.2f} s)")
+
+def run(date: str, force: set[str] | None = None, dry_run: bool = False, jobs: int = 1) -> bool:
+    """
+    Ordonnanceur : dès que les dépendances d'une étape sont à jour, elle est évaluée
+    (sautée si inchangée) ou lancée, jusqu'à `jobs` étapes en parallèle.
+    Les décisions et l'état sont gérés dans le thread principal uniquement.
+    """
+    stages = build_stages(date)
+    force = force or set()
+    jobs = max(1, jobs)
+    state = load_state()
+    status = {}       # nom -> "ok" | "skipped" | "failed" | "blocked" | "planned" | "running"
+    timings = {}      # nom -> (début, fin) en s depuis le lancement
+    running = {}      # future -> étape
+    t_start = time.perf_counter()
+
+    def settled(name):
+        return status.get(name) in ("ok", "skipped", "planned")
+
+    def finish(stage, ok, duration, output):
+        if output:
+            print(output, end="" if output.endswith("\n") else "\n")
+        if ok and not outputs_exist(stage):
+            print(f"❌ {stage.name} : sorties manquantes {stage.outputs}")
+            ok = False
+        # La clé est recalculée après coup : une étape qui modifie ses propres entrées reste cohérente
+        state["stages"][stage.name] = {
+            "status": "ok" if ok else "failed",
+            "key": stage_key(stage, date, state["files"]) if ok else None,
+            "date": date,
+            "duration": round(duration, 3),
+            "finished_at": datetime.now(UTC).isoformat(timespec="seconds"),
+        }
+        save_state(state)
+        status[stage.name] = "ok" if ok else "failed"
+        if ok:
+            print(f"✅ {stage.name} ({duration:.1f} s)")
+        else:
+            print(f"❌ {stage.name} en échec ({duration:.1f} s) — la prochaine exécution reprendra ici")
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while True:
+            progressed = True
+            while progressed:
+                progressed = False
+                for stage in stages:
+                    if stage.name in status:
+                        continue
+                    if any(status.get(d) in ("failed", "blocked") for d in stage.deps):
+                        print(f"⏸️  {stage.name} : en attente d'une étape en échec")
+                        status[stage.name] = "blocked"
+                        progressed = True
+                        continue
+                    if not all(settled(d) for d in stage.deps):
+                        continue
+                    planned = [d for d in stage.deps if status[d] == "planned"]
+                    if dry_run and planned:
+                        print(f"❔ {stage.name} : réévaluée après {', '.join(sorted(planned))}")
+                        status[stage.name] = "planned"
+                        progressed = True
+                        continue
+                    key = stage_key(stage, date, state["files"])
+                    prev = state["stages"].get(stage.name, {})
+                    if stage.name not in force and prev.get("status") == "ok" \
+                            and prev.get("key") == key and outputs_exist(stage):
+                        print(f"⏭️  {stage.name} : inchangé")
+                        status[stage.name] = "skipped"
+                        progressed = True
+                        continue
+                    if dry_run:
+                        print(f"▶️  {stage.name} : à exécuter")
+                        status[stage.name] = "planned"
+                        progressed = True
+                        continue
+                    if len(running) >= jobs:
+                        continue
+                    print(f"▶️  {stage.name} : {' '.join(stage.cmd)}")
+                    status[stage.name] = "running"
+                    timings[stage.name] = (time.perf_counter() - t_start, None)
+                    running[pool.submit(run_stage, stage, jobs > 1)] = stage
+                    progressed = True
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                stage = running.pop(fut)
+                ok, duration, output = fut.result()
+                timings[stage.name] = (timings[stage.name][0], time.perf_counter() - t_start)
+                finish(stage, ok, duration, output)
+
+    wall = time.perf_counter() - t_start
+    if not dry_run:
+        save_state(state)
+        print_timings(stages, status, timings, wall)
+    print(f"⏱️ Pipeline : {wall:.2f} s")
+    return all(settled(s.name) for s in stages)
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Pipeline quotidien FPL Radar (étapes incrémentales).")
+    p.add_argument("--date", default=datetime.now(UTC).strftime("%Y-%m-%d"), help="Date traitée (YYYY-MM-DD)")
+    p.add_argument("--force", action="store_true", help="Relancer toutes les étapes")
+    p.add_argument("--poll", action="store_true",
+                   help="Relancer fetch (nouvelles vidéos) ; la suite seulement si ses entrées changent")
+    p.add_argument("--from", dest="start", help="Relancer cette étape et toutes celles qui en dépendent")
+    p.add_argument("--dry-run", action="store_true", help="Afficher les étapes à exécuter sans les lancer")
+    p.add_argument("--list", action="store_true", help="Lister les étapes")
+    p.add_argument("--jobs", "-j", type=int, default=JOBS,
+                   help="Étapes indépendantes lancées en parallèle (processus séparés)")
+    return p.parse_args()
+
+def main():
+    args = parse_args()
+    stages = build_stages(args.date)
+    names = [s.name for s in stages]
+    if args.list:
+        for s in stages:
+            deps = f" (après {', '.join(s.deps)})" if s.deps else ""
+            print(f"- {s.name}{deps}")
+        return
+    force = set()
+    if args.force:
+        force = set(names)
+    elif args.start:
+        if args.start not in names:
+            print(f"❌ Étape inconnue : {args.start} (choix : {', '.join(names)})")
+            sys.exit(2)
+        force = downstream(stages, {args.start})
+    if args.poll:
+        force.add("fetch")
+    print(f"📅 Date = {args.date}")
+    ok = run(args.date, force, args.dry_run, args.jobs)
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
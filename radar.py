@@ -0,0 +1,60 @@
+# radar.py
+# Point d'entrée unique de FPL Radar : python radar.py <commande> [options de la commande]
+# Le module d'une commande (et ses dépendances lourdes : feedparser, Pillow, requests,
+# pyttsx3...) n'est importé qu'au lancement de cette commande : "radar --help" n'importe rien.
+# Les options restent celles de chaque script : "radar fetch --help" affiche l'aide de l'agent.
+# Usage :
+#   python radar.py fetch --multi -w 8 --generate-social
+#   python radar.py render 2025-09-07 -w 0
+#   python radar.py tts fpl_summaries/social_2025-09-07.md social_audio/voice.wav --segments
+#   python radar.py report --stream --profile
+#   python radar.py daemon run --interval 900 -w 8
+
+import sys
+
+COMMANDS = {
+    # commande : (module, description)
+    "fetch":       ("youtube_fpl_agent", "Résumés des vidéos YouTube (+ script social, prompts, voix off)"),
+    "render":      ("render_placeholders", "Visuels placeholders depuis social_images/<DATE>"),
+    "images":      ("render_images", "Visuels via l'API OpenAI Images"),
+    "tts":         ("tts_pyttsx3", "Voix off locale (pyttsx3)"),
+    "tts-openai":  ("tts_openai", "Voix off via l'API OpenAI"),
+    "export":      ("export_ideas_today", "data/ideas.json depuis les visuels du jour"),
+    "report":      ("report_build_and_send", "Rapport HTML (+ envoi Outlook)"),
+    "pipeline":    ("pipeline", "Chaîne quotidienne complète (étapes incrémentales)"),
+    "daemon":      ("daemon", "Mode continu : run | status | stop (ressources gardées chaudes)"),
+    "search":      ("search_index", "Recherche dans l'archive des résumés"),
+    "trends":      ("trends", "Termes en hausse"),
+    "archive":     ("archive_store", "Archive compactée des résumés"),
+    "transcripts": ("transcripts", "Cache des transcriptions"),
+    "trace":       ("tracing", "Agrégation des traces --profile"),
+}
+
+def usage() -> str:
+    lines = ["Usage : python radar.py <commande> [options]  (radar <commande> --help pour le détail)", "",
+             "Commandes :"]
+    lines += [f"  {name:<12} {desc}" for name, (_, desc) in COMMANDS.items()]
+    return "\n".join(lines)
+
+def run(command: str, argv: list[str]):
+    """
+    Importe le module de la commande et lance son main() avec argv comme arguments.
+    """
+    import importlib
+    module = importlib.import_module(COMMANDS[command][0])
+    sys.argv = [f"radar {command}", *argv]
+    return module.main()
+
+def main():
+    argv = sys.argv[1:]
+    if not argv or argv[0] in ("-h", "--help", "help"):
+        print(usage())
+        return 0 if argv else 2
+    command, rest = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"❌ Commande inconnue : {command}\n\n{usage()}")
+        return 2
+    return run(command, rest)
+
+if __name__ == "__main__":
+    sys.exit(main())
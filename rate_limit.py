@@ -0,0 +1,86 @@
+# rate_limit.py
+# Briques de régulation pour les appels API concurrents :
+# seau à jetons (débit), concurrence adaptative (AIMD) et lecture de Retry-After.
+
+import time
+import threading
+from email.utils import parsedate_to_datetime
+from datetime import datetime, UTC
+
+class TokenBucket:
+    """
+    Débit moyen `rate` requêtes/s avec des rafales jusqu'à `burst`.
+    """
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = max(rate, 1e-6)
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class AdaptiveConcurrency:
+    """
+    Limite de requêtes en vol : +1 après `limit` succès, divisée par 2 sur 429/5xx.
+    """
+    def __init__(self, max_limit: int, min_limit: int = 1):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.limit = self.max_limit
+        self.in_flight = 0
+        self._successes = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self.in_flight < self.limit:
+                self.in_flight += 1
+                return True
+            return False
+
+    def release(self):
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+
+    def on_success(self):
+        with self._lock:
+            self._successes += 1
+            if self._successes >= self.limit and self.limit < self.max_limit:
+                self.limit += 1
+                self._successes = 0
+
+    def on_throttle(self):
+        with self._lock:
+            self.limit = max(self.min_limit, self.limit // 2)
+            self._successes = 0
+
+def retry_after_seconds(headers) -> float | None:
+    """
+    Valeur de l'en-tête Retry-After (secondes ou date HTTP), sinon None.
+    """
+    value = (headers or {}).get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        return max(0.0, (when - datetime.now(UTC)).total_seconds())
+    except (TypeError, ValueError):
+        return None
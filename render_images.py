@@ -1,24 +1,22 @@
 # render_images.py
 # Rend des images depuis les prompts .txt de social_images/<date> via OpenAI Images API
-import os, sys, time, json, base64, glob
+import os, sys, time, base64, glob, heapq, argparse
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
-# --- Dépendances ---
-try:
-    import requests
-except ImportError:
-    print("⚠️ Module 'requests' manquant. Installe d'abord : pip install requests")
-    sys.exit(1)
+from image_cache import ImageCache
+from rate_limit import TokenBucket, AdaptiveConcurrency
 
-API_KEY = os.getenv("OPENAI_API_KEY")
-if not API_KEY:
-    print("❌ OPENAI_API_KEY manquant dans l'environnement.")
-    print("   PowerShell (session): $env:OPENAI_API_KEY = 'sk-...'")
-    sys.exit(1)
+import openai_client
+import tracing
+from openai_client import RetryableError
 
 MODEL = os.getenv("OPENAI_IMAGE_MODEL", "gpt-image-1")
 SIZE = os.getenv("OPENAI_IMAGE_SIZE", "1024x1024")  # 512x512, 1024x1024, 2048x2048
-API_URL = "https://api.openai.com/v1/images/generations"
+API_PATH = "/images/generations"
+WORKERS = int(os.getenv("OPENAI_IMAGE_WORKERS", 3))     # requêtes simultanées max
+RPS = float(os.getenv("OPENAI_IMAGE_RPS", 1.0))         # débit moyen (requêtes/s)
+USE_CACHE = os.getenv("OPENAI_IMAGE_CACHE", "1") != "0"  # 0 = toujours rappeler l'API
 
 ROOT = os.getcwd()  # doit être C:\\Users\\admin\\Documents\\radar
 IN_ROOT = os.path.join(ROOT, "social_images")
@@ -42,45 +40,95 @@ def list_prompt_files(in_dir):
     files = sorted(glob.glob(os.path.join(in_dir, "*.txt")))
     return files
 
-def call_openai_image(prompt, retries=3, delay=2):
-    headers = {
-        "Authorization": f"Bearer {API_KEY}",
-        "Content-Type": "application/json",
-    }
+def request_image(prompt):
+    """
+    Une seule tentative d'appel à l'API Images. Lève RetryableError si l'erreur est transitoire.
+    """
     payload = {
         "model": MODEL,
         "prompt": prompt,
         "size": SIZE,
     }
-    last_err = None
-    for attempt in range(1, retries + 1):
-        try:
-            r = requests.post(API_URL, headers=headers, data=json.dumps(payload), timeout=60)
-            if r.status_code == 200:
-                return r.json()
+    return openai_client.post_once(API_PATH, payload).json()
+
+def generate_all(jobs, on_done, workers=WORKERS, rps=RPS, retries=openai_client.RETRIES, delay=2):
+    """
+    Génère les images de `jobs` (liste de (clé, prompt)) en parallèle.
+    - seau à jetons : débit moyen `rps`,
+    - concurrence adaptative : divisée par 2 sur 429/5xx, remonte après des succès,
+    - Retry-After respecté ; les prompts en échec sont replanifiés sans bloquer les autres.
+    on_done(clé, data, erreur) est appelé dans le thread principal à chaque fin de prompt.
+    """
+    bucket = TokenBucket(rps, burst=workers)
+    limiter = AdaptiveConcurrency(workers)
+    pending = [(0.0, seq, key, prompt, 1) for seq, (key, prompt) in enumerate(jobs)]
+    heapq.heapify(pending)
+    seq = len(pending)
+    pause_until = 0.0
+    running = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            now = time.monotonic()
+            while pending and pending[0][0] <= now and now >= pause_until and limiter.try_acquire():
+                _, _, key, prompt, attempt = heapq.heappop(pending)
+                bucket.acquire()
+                running[pool.submit(request_image, prompt)] = (key, prompt, attempt)
+
+            if running:
+                timeout = 0.1
+                if pending:
+                    timeout = min(1.0, max(0.01, max(pending[0][0], pause_until) - time.monotonic()))
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
             else:
-                # tente de lire l'erreur JSON
+                time.sleep(max(0.01, max(pending[0][0], pause_until) - time.monotonic()))
+                done = ()
+
+            for fut in done:
+                key, prompt, attempt = running.pop(fut)
+                limiter.release()
                 try:
-                    err = r.json()
-                except Exception:
-                    err = r.text
-                print(f"❗ API error (try {attempt}/{retries}): {r.status_code} -> {err}")
-                last_err = err
-        except Exception as e:
-            print(f"❗ Exception (try {attempt}/{retries}): {e}")
-            last_err = str(e)
-        time.sleep(delay * attempt)
-    raise RuntimeError(f"Echec API après {retries} tentatives: {last_err}")
+                    data = fut.result()
+                except RetryableError as e:
+                    limiter.on_throttle()
+                    if attempt >= retries:
+                        on_done(key, None, RuntimeError(f"Echec API après {retries} tentatives: {e}"))
+                        continue
+                    wait_s = openai_client.backoff_delay(attempt, e.retry_after, base=delay)
+                    if e.throttled and e.retry_after is not None:
+                        # quota global : on suspend tous les envois pendant Retry-After
+                        pause_until = max(pause_until, time.monotonic() + wait_s)
+                    print(f"❗ {key} (try {attempt}/{retries}): {e} — nouvel essai dans {wait_s:.1f}s")
+                    openai_client.METRICS.add_retry()
+                    heapq.heappush(pending, (time.monotonic() + wait_s, seq, key, prompt, attempt + 1))
+                    seq += 1
+                except Exception as e:
+                    on_done(key, None, e)
+                else:
+                    limiter.on_success()
+                    on_done(key, data, None)
 
 def b64_to_png(b64, out_path):
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
-    with open(out_path, "wb") as f:
+    # Écriture via fichier temporaire : ne jamais écraser en place un lien vers le cache
+    tmp = out_path + ".tmp"
+    with open(tmp, "wb") as f:
         f.write(base64.b64decode(b64))
+    os.replace(tmp, out_path)
 
-def main():
+def parse_args():
+    p = argparse.ArgumentParser(description="Images OpenAI depuis social_images/<DATE>/*.txt")
     # Permet de forcer une date: python render_images.py 2025-09-06
-    forced_date = sys.argv[1] if len(sys.argv) > 1 else None
-    in_date = forced_date or newest_date_dir(IN_ROOT)
+    p.add_argument("date", nargs="?", help="Dossier date à rendre (défaut : le plus récent)")
+    p.add_argument("--workers", "-w", type=int, default=WORKERS, help="Requêtes simultanées max")
+    p.add_argument("--rps", type=float, default=RPS, help="Débit moyen max (requêtes/s)")
+    tracing.add_argument(p)
+    return p.parse_args()
+
+def main():
+    args = parse_args()
+    openai_client.require_api_key()
+    tracing.start("render_images", args.profile)
+    in_date = args.date or newest_date_dir(IN_ROOT)
     if not in_date:
         print(f"❌ Aucun dossier date trouvé dans {IN_ROOT}")
         sys.exit(1)
@@ -94,9 +142,13 @@ def main():
 
     print(f"📥 Dossier prompts : {in_dir}")
     print(f"📤 Dossier sortie  : {out_dir}")
-    print(f"🖼️ Modèle={MODEL}  Taille={SIZE}")
+    print(f"🖼️ Modèle={MODEL}  Taille={SIZE}  Concurrence={args.workers}  Débit={args.rps}/s")
     print(f"🔑 API key: OK\n")
 
+    cache = ImageCache() if USE_CACHE else None
+
+    jobs = []      # (out_path, prompt) à générer
+    keys = {}      # out_path -> clé de cache
     for idx, path in enumerate(files, 1):
         base = os.path.splitext(os.path.basename(path))[0]
         with open(path, "r", encoding="utf-8") as f:
@@ -105,17 +157,42 @@ def main():
             print(f"- {base}: prompt vide, saut.")
             continue
 
-        print(f"- [{idx}/{len(files)}] Génère: {base} ...", end="", flush=True)
+        out_path = os.path.join(out_dir, f"{idx:02}_{base}.png")
+        key = ImageCache.key(prompt, MODEL, SIZE)
+        if cache and cache.fetch_into(key, out_path):
+            tracing.count("images.cached")
+            print(f"- [{idx}/{len(files)}] Cache: {base} -> {out_path}")
+            continue
+        keys[out_path] = key
+        jobs.append((out_path, prompt))
+
+    if jobs:
+        print(f"- Génère {len(jobs)} image(s) ...")
+
+    def on_done(out_path, data, err):
+        if err is not None:
+            tracing.count("images.failed")
+            print(f"- ÉCHEC {os.path.basename(out_path)}: {err}")
+            return
         try:
-            data = call_openai_image(prompt)
-            b64 = data["data"][0]["b64_json"]
-            out_path = os.path.join(out_dir, f"{idx:02}_{base}.png")
-            b64_to_png(b64, out_path)
-            print(f" OK -> {out_path}")
-            time.sleep(0.5)  # petite pause
+            b64_to_png(data["data"][0]["b64_json"], out_path)
         except Exception as e:
-            print(f" ÉCHEC: {e}")
+            tracing.count("images.failed")
+            print(f"- ÉCHEC {os.path.basename(out_path)}: {e}")
+            return
+        tracing.count("images.generated")
+        tracing.count_file("bytes_written", out_path)
+        if cache:
+            cache.store(keys[out_path], out_path)
+        print(f"- OK -> {out_path}")
+
+    with tracing.span("generate_all", images=len(jobs), workers=args.workers):
+        generate_all(jobs, on_done, workers=max(1, args.workers), rps=args.rps)
 
+    print("\n" + openai_client.METRICS.summary_line())
+    if cache:
+        cache.evict()
+        print(cache.stats_line())
     print("\n✅ Terminé.")
 
 if __name__ == "__main__":
@@ -3,10 +3,15 @@
 # Entrée : social_images/<DATE>/*.txt
 # Sortie : social_images_out/<DATE>/*.png
 
-import os, sys, glob
+import os, sys, glob, argparse
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from PIL import Image, ImageDraw, ImageFont
 
+import tracing
+from text_layout import metrics_for, wrap
+
 ROOT = os.getcwd()  # C:\Users\admin\Documents\radar
 IN_ROOT = os.path.join(ROOT, "social_images")
 OUT_ROOT = os.path.join(ROOT, "social_images_out")
@@ -43,9 +48,8 @@ def load_font(size=44):
 
 # --- Utils compatibles Pillow 11 ---
 def text_width(draw: ImageDraw.ImageDraw, text: str, font: ImageFont.FreeTypeFont) -> int:
-    # draw.textbbox((0,0), ...) -> (l, t, r, b)
-    l, t, r, b = draw.textbbox((0, 0), text, font=font)
-    return r - l
+    # Largeur de la boîte (l, t, r, b), mise en cache par police
+    return metrics_for(font).width(text)
 
 def line_height(font: ImageFont.FreeTypeFont) -> int:
     # getbbox renvoie (l,t,r,b) de la boîte; hauteur = b - t
@@ -53,113 +57,189 @@ def line_height(font: ImageFont.FreeTypeFont) -> int:
     return b - t
 
 def wrap_text(text, draw, font, max_width):
-    # Coupe en lignes qui tiennent dans max_width (en pixels)
-    words = text.split()
-    lines = []
-    cur = []
-    for w in words:
-        test = " ".join(cur + [w])
-        if text_width(draw, test, font) <= max_width:
-            cur.append(w)
-        else:
-            if cur:
-                lines.append(" ".join(cur))
-            cur = [w]
-    if cur:
-        lines.append(" ".join(cur))
-    # Si pas de mots (texte vide), renvoyer une ligne par défaut
-    return lines or [""]
-
-def background(idx):
-    # Quelques palettes (gradient vertical simple)
-    palettes = [
-        ((30, 30, 60), (90, 40, 120)),
-        ((10, 60, 120), (10, 140, 200)),
-        ((20, 120, 80), (40, 200, 160)),
-        ((120, 40, 40), (220, 80, 80)),
-        ((100, 100, 100), (40, 40, 40)),
-    ]
-    a, b = palettes[idx % len(palettes)]
-    img = Image.new("RGB", (W, H), a)
-    # Gradient vertical pixel par pixel (suffisant pour quelques images)
-    for y in range(H):
-        ratio = y / (H - 1)
-        r = int(a[0] * (1 - ratio) + b[0] * ratio)
-        g = int(a[1] * (1 - ratio) + b[1] * ratio)
-        bl = int(a[2] * (1 - ratio) + b[2] * ratio)
-        for x in range(W):
-            img.putpixel((x, y), (r, g, bl))
+    # Coupe en lignes qui tiennent dans max_width (en pixels) ; mise en page mémoïsée
+    return list(wrap(text, font, max_width))
+
+PALETTES = [
+    ((30, 30, 60), (90, 40, 120)),
+    ((10, 60, 120), (10, 140, 200)),
+    ((20, 120, 80), (40, 200, 160)),
+    ((120, 40, 40), (220, 80, 80)),
+    ((100, 100, 100), (40, 40, 40)),
+]
+
+@lru_cache(maxsize=None)
+def gradient_column(a, b, h):
+    # Colonne 1 x h du gradient vertical (mêmes arrondis que l'ancienne boucle pixel par pixel)
+    col = Image.new("RGB", (1, h))
+    den = max(h - 1, 1)
+    col.putdata([
+        tuple(int(a[c] * (1 - y / den) + b[c] * (y / den)) for c in range(3))
+        for y in range(h)
+    ])
+    return col
+
+@lru_cache(maxsize=None)
+def gradient_image(a, b, w, h):
+    # Étire la colonne sur toute la largeur (resize natif Pillow, sans boucle Python)
+    return gradient_column(a, b, h).resize((w, h), Image.NEAREST)
+
+def background(idx, w=W, h=H):
+    # Gradient vertical simple, calculé une seule fois par palette et par taille
+    a, b = PALETTES[idx % len(PALETTES)]
+    return gradient_image(a, b, w, h).copy()
+
+def render_card(idx, text, font_title, font_body):
+    with tracing.span("gradient"):
+        img = background(idx)
+    draw = ImageDraw.Draw(img)
+
+    # Titre court : 6-8 mots
+    words = text.replace("\n", " ").split()
+    title = " ".join(words[:8]) if words else "FPL"
+    # Corps : ~250 caractères
+    body = text[:250] if text else "Résumé visuel généré hors-API."
+
+    max_w = W - 2 * MARGIN
+
+    title_lines = wrap_text(title, draw, font_title, max_w)
+    body_lines  = wrap_text(body,  draw, font_body,  max_w)
+
+    line_h_title = line_height(font_title)
+    line_h_body  = line_height(font_body)
+    spacing_title = 12
+    spacing_body  = 8
+
+    h_title = len(title_lines) * line_h_title + (len(title_lines) - 1) * spacing_title
+    h_body  = len(body_lines)  * line_h_body  + (len(body_lines)  - 1) * spacing_body
+    total_h = h_title + 24 + h_body
+
+    y = (H - total_h) // 2
+
+    def draw_centered(lines, font, y0, line_h, spacing, fill=(255,255,255)):
+        for line in lines:
+            w_px = text_width(draw, line, font)
+            x = (W - w_px) // 2
+            # ombre
+            draw.text((x+2, y0+2), line, font=font, fill=(0,0,0))
+            # texte
+            draw.text((x, y0), line, font=font, fill=fill)
+            y0 += line_h + spacing
+        return y0
+
+    y = draw_centered(title_lines, font_title, y, line_h_title, spacing_title, fill=(255,255,255))
+    y += 24
+    draw_centered(body_lines, font_body, y, line_h_body, spacing_body, fill=(240,240,240))
     return img
 
-def main():
-    forced_date = sys.argv[1] if len(sys.argv) > 1 else None
-    in_date = forced_date or newest_date_dir(IN_ROOT)
-    if not in_date:
-        print(f"❌ Aucun dossier date trouvé dans {IN_ROOT}")
-        sys.exit(1)
-
+# --- Rendu (un process par cœur possible) ---
+_FONTS = None
+
+def init_worker():
+    # Polices chargées une seule fois par process (et non par image)
+    global _FONTS
+    if _FONTS is None:
+        with tracing.span("load_fonts"):
+            _FONTS = (load_font(64), load_font(44))
+
+def render_job(job):
+    idx, path, out_path = job
+    init_worker()
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        text = (f.read() or "").strip()
+    with tracing.span("card", idx=idx):
+        img = render_card(idx, text, *_FONTS)
+        with tracing.span("save_png"):
+            img.save(out_path, "PNG")
+    return out_path
+
+def list_jobs(in_date):
+    """
+    Tâches (index, prompt .txt, PNG de sortie) d'un dossier date, dans l'ordre des noms.
+    """
     in_dir = os.path.join(IN_ROOT, in_date)
     out_dir = os.path.join(OUT_ROOT, in_date)
     files = sorted(glob.glob(os.path.join(in_dir, "*.txt")))
-    if not files:
-        print(f"❌ Aucun .txt trouvé dans {in_dir}")
-        sys.exit(1)
-
-    os.makedirs(out_dir, exist_ok=True)
-    print(f"📥 Dossier prompts : {in_dir}")
-    print(f"📤 Dossier sortie  : {out_dir}")
-
-    font_title = load_font(64)
-    font_body = load_font(44)
-
+    jobs = []
     for i, path in enumerate(files, 1):
         base = os.path.splitext(os.path.basename(path))[0]
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            text = (f.read() or "").strip()
-
-        img = background(i)
-        draw = ImageDraw.Draw(img)
-
-        # Titre court : 6-8 mots
-        words = text.replace("\n", " ").split()
-        title = " ".join(words[:8]) if words else "FPL"
-        # Corps : ~250 caractères
-        body = text[:250] if text else "Résumé visuel généré hors-API."
-
-        max_w = W - 2 * MARGIN
-
-        title_lines = wrap_text(title, draw, font_title, max_w)
-        body_lines  = wrap_text(body,  draw, font_body,  max_w)
-
-        line_h_title = line_height(font_title)
-        line_h_body  = line_height(font_body)
-        spacing_title = 12
-        spacing_body  = 8
-
-        h_title = len(title_lines) * line_h_title + (len(title_lines) - 1) * spacing_title
-        h_body  = len(body_lines)  * line_h_body  + (len(body_lines)  - 1) * spacing_body
-        total_h = h_title + 24 + h_body
-
-        y = (H - total_h) // 2
-
-        def draw_centered(lines, font, y0, line_h, spacing, fill=(255,255,255)):
-            for line in lines:
-                w_px = text_width(draw, line, font)
-                x = (W - w_px) // 2
-                # ombre
-                draw.text((x+2, y0+2), line, font=font, fill=(0,0,0))
-                # texte
-                draw.text((x, y0), line, font=font, fill=fill)
-                y0 += line_h + spacing
-            return y0
-
-        y = draw_centered(title_lines, font_title, y, line_h_title, spacing_title, fill=(255,255,255))
-        y += 24
-        draw_centered(body_lines, font_body, y, line_h_body, spacing_body, fill=(240,240,240))
-
-        out_path = os.path.join(out_dir, f"{i:02}_{base}.png")
-        img.save(out_path, "PNG")
-        print(f"✅ {out_path}")
+        jobs.append((i, path, os.path.join(out_dir, f"{i:02}_{base}.png")))
+    return jobs
+
+def all_date_dirs(root, start=None, end=None):
+    dates = []
+    for p in glob.glob(os.path.join(root, "*")):
+        base = os.path.basename(p)
+        if not os.path.isdir(p):
+            continue
+        try:
+            datetime.strptime(base, "%Y-%m-%d")
+        except ValueError:
+            continue
+        if (start and base < start) or (end and base > end):
+            continue
+        dates.append(base)
+    return sorted(dates)
+
+def render_jobs(jobs, workers=1):
+    if workers <= 1 or len(jobs) <= 1:
+        init_worker()
+        for job in jobs:
+            yield render_job(job)
+        return
+    # map() conserve l'ordre des tâches : sorties et logs déterministes
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+        yield from pool.map(render_job, jobs, chunksize=max(1, len(jobs) // (workers * 4)))
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Images placeholders depuis social_images/<DATE>/*.txt")
+    p.add_argument("date", nargs="?", help="Dossier date à rendre (défaut : le plus récent)")
+    p.add_argument("--workers", "-w", type=int, default=1,
+                   help="Nombre de process de rendu (0 = un par cœur)")
+    tracing.add_argument(p)
+    p.add_argument("--all", action="store_true", help="Re-rendre tous les dossiers date (backfill)")
+    p.add_argument("--from", dest="start", help="Backfill : première date incluse (YYYY-MM-DD)")
+    p.add_argument("--to", dest="end", help="Backfill : dernière date incluse (YYYY-MM-DD)")
+    return p.parse_args()
+
+def main():
+    args = parse_args()
+    tracing.start("render_placeholders", args.profile)
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+
+    if args.all or args.start or args.end:
+        dates = all_date_dirs(IN_ROOT, args.start, args.end)
+        if not dates:
+            print(f"❌ Aucun dossier date trouvé dans {IN_ROOT}")
+            sys.exit(1)
+    else:
+        in_date = args.date or newest_date_dir(IN_ROOT)
+        if not in_date:
+            print(f"❌ Aucun dossier date trouvé dans {IN_ROOT}")
+            sys.exit(1)
+        dates = [in_date]
+
+    jobs = []
+    for in_date in dates:
+        in_dir = os.path.join(IN_ROOT, in_date)
+        out_dir = os.path.join(OUT_ROOT, in_date)
+        date_jobs = list_jobs(in_date)
+        if not date_jobs:
+            print(f"❌ Aucun .txt trouvé dans {in_dir}")
+            if len(dates) == 1:
+                sys.exit(1)
+            continue
+        os.makedirs(out_dir, exist_ok=True)
+        print(f"📥 Dossier prompts : {in_dir}")
+        print(f"📤 Dossier sortie  : {out_dir}")
+        jobs.extend(date_jobs)
+
+    # Avec plusieurs process, seuls les totaux (images, octets) remontent dans la trace
+    with tracing.span("render", images=len(jobs), workers=workers):
+        for out_path in render_jobs(jobs, workers):
+            tracing.count("images.rendered")
+            tracing.count_file("bytes_written", out_path)
+            print(f"✅ {out_path}")
 
     print("✅ Terminé.")
 
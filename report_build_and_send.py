@@ -1,15 +1,25 @@
 # report_build_and_send.py
 # Génère un rapport HTML avec résumé global puis fiches idées (avec images),
 # puis envoie par Outlook si variable d’environnement REPORT_EMAIL_TO est définie.
+# Mode --stream : lecture incrémentale de ideas.json, résumé en une passe
+# (moyennes courantes, top 3 par tas borné), fiches écrites au fil de l'eau.
+# Images : vignettes (thumbnails.py) en lien relatif (défaut) ou data URI pour le rapport
+# sur disque ; le corps du mail est rendu à part, vignettes en pièces jointes CID.
 
 from __future__ import annotations
-import json, os, datetime, pathlib, statistics
-from typing import List, Dict, Any
+import json, os, datetime, pathlib, heapq, shutil, tempfile, argparse
+from typing import List, Dict, Any, Iterable, Iterator
+
+import tracing
+from thumbnails import ReportImages
 
 BASE_DIR = pathlib.Path(__file__).resolve().parent
 DATA_FILE = BASE_DIR / "data" / "ideas.json"          # <-- par défaut
 OUT_DIR   = BASE_DIR / "out"
 OUT_FILE  = OUT_DIR / "report.html"
+# Rapport sur disque : full | link | inline (voir thumbnails.py). Le mail est toujours en cid.
+DISK_MODES = ("full", "link", "inline")
+IMAGES_MODE = os.getenv("REPORT_IMAGES", "link")
 
 def load_data(path: pathlib.Path) -> List[Dict[str, Any]]:
     with open(path, "r", encoding="utf-8") as f:
@@ -19,36 +29,163 @@ def load_data(path: pathlib.Path) -> List[Dict[str, Any]]:
     assert isinstance(data, list), "Le fichier JSON doit contenir une liste d'idées."
     return data
 
-def build_summary(ideas: List[Dict[str, Any]]) -> Dict[str, Any]:
-    n = len(ideas)
-    metrics_all = [i.get("metrics", {}) for i in ideas]
-    def avg(key, default=0.0):
-        vals = [float(m.get(key, 0)) for m in metrics_all if key in m]
-        return round(statistics.fmean(vals), 2) if vals else default
-    top_by = lambda k: sorted(ideas, key=lambda x: float(x.get("metrics", {}).get(k, 0)), reverse=True)
-
-    summary = {
-        "count": n,
-        "generated_at": datetime.datetime.now().strftime("%Y-%m-%d %H:%M"),
-        "avg_views": avg("views"),
-        "avg_score": avg("score"),
-        "top_views": top_by("views")[:3],
-        "top_score": top_by("score")[:3],
-    }
-    return summary
+# --------- Lecture incrémentale ---------
+
+class _JsonStream:
+    """
+    Curseur sur un fichier JSON lu par blocs : les valeurs sont décodées une par une
+    (json.JSONDecoder.raw_decode), seul le bloc courant reste en mémoire.
+    """
+    def __init__(self, f, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        data = self.f.read(self.chunk_size)
+        if not data:
+            return False
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        # Prochain caractère significatif ("" en fin de fichier)
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, ch: str):
+        if self.peek() != ch:
+            raise ValueError(f"JSON invalide : '{ch}' attendu à la position {self.pos}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # Un nombre en fin de bloc peut être tronqué : on complète avant de conclure
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+    def items(self) -> Iterator[Any]:
+        # Éléments du tableau qui commence au curseur
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            c = self.peek()
+            self.pos += 1
+            if c == "]":
+                return
+            if c != ",":
+                raise ValueError(f"JSON invalide : ',' ou ']' attendu à la position {self.pos - 1}")
+
+def iter_ideas(path: pathlib.Path, chunk_size: int = 1 << 16) -> Iterator[Dict[str, Any]]:
+    """
+    Idées de `path` une à une, sans charger le fichier : liste JSON ou {"ideas": [...]}.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        stream = _JsonStream(f, chunk_size)
+        if stream.peek() == "[":
+            yield from stream.items()
+            return
+        stream.expect("{")
+        found = False
+        while stream.peek() != "}":
+            key = stream.value()
+            stream.expect(":")
+            if key == "ideas" and stream.peek() == "[":
+                yield from stream.items()
+                found = True
+            else:
+                stream.value()   # autre clé : ignorée
+            if stream.peek() == ",":
+                stream.pos += 1
+        if not found:
+            raise ValueError("Le fichier JSON doit contenir une liste d'idées.")
+
+# --------- Résumé ---------
+
+class SummaryBuilder:
+    """
+    Résumé en une passe : compte, moyennes courantes, top k par tas borné.
+    Même résultat (y compris l'ordre des ex aequo) qu'un tri décroissant stable.
+    """
+    def __init__(self, k: int = 3, keys: tuple = ("views", "score")):
+        self.k = k
+        self.count = 0
+        self.sums = {key: [0, 0.0] for key in keys}    # clé -> [n, somme]
+        self.tops = {key: [] for key in keys}          # clé -> tas de (valeur, -rang, idée)
+
+    def add(self, idea: Dict[str, Any]):
+        m = idea.get("metrics", {})
+        for key, acc in self.sums.items():
+            if key in m:
+                acc[0] += 1
+                acc[1] += float(m.get(key, 0))
+        for key, heap in self.tops.items():
+            # À valeur égale, la plus ancienne idée gagne : -rang la place au-dessus dans le tas
+            item = (float(m.get(key, 0)), -self.count, idea)
+            if len(heap) < self.k:
+                heapq.heappush(heap, item)
+            else:
+                heapq.heappushpop(heap, item)
+        self.count += 1
+
+    def avg(self, key: str, default: float = 0.0) -> float:
+        n, total = self.sums[key]
+        return round(total / n, 2) if n else default
+
+    def top(self, key: str) -> List[Dict[str, Any]]:
+        return [idea for _, _, idea in sorted(self.tops[key], key=lambda t: t[:2], reverse=True)]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "generated_at": datetime.datetime.now().strftime("%Y-%m-%d %H:%M"),
+            "avg_views": self.avg("views"),
+            "avg_score": self.avg("score"),
+            "top_views": self.top("views"),
+            "top_score": self.top("score"),
+        }
+
+def build_summary(ideas: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    builder = SummaryBuilder()
+    for idea in ideas:
+        builder.add(idea)
+    return builder.summary()
 
 def html_escape(s: str) -> str:
     import html
     return html.escape(s, quote=True)
 
-def card_html(idea: Dict[str, Any]) -> str:
+def card_html(idea: Dict[str, Any], images: ReportImages | None = None) -> str:
     title = html_escape(str(idea.get("title", "Sans titre")))
     desc  = html_escape(str(idea.get("description", "")))
     m = idea.get("metrics", {})
     views = m.get("views", "")
     score = m.get("score", "")
     img   = idea.get("image_url") or idea.get("image_path") or ""
-    img_tag = f'<img src="{html_escape(img)}" alt="image" style="max-width:320px;border-radius:12px;border:1px solid #ddd;" />' if img else ""
+    if img and images is not None:
+        img_tag = images.img_html(img)
+    else:
+        img_tag = f'<img src="{html_escape(img)}" alt="image" style="{ReportImages.IMG_STYLE}" />' if img else ""
 
     extra_rows = ""
     for k, v in m.items():
@@ -70,7 +207,8 @@ def card_html(idea: Dict[str, Any]) -> str:
     </div>
     """
 
-def render_html(summary: Dict[str, Any], ideas: List[Dict[str, Any]]) -> str:
+def render_head(summary: Dict[str, Any]) -> str:
+    # Tout le document jusqu'à la liste des fiches (partagé par les deux modes)
     head = """
     <meta charset="utf-8" />
     <meta name="viewport" content="width=device-width, initial-scale=1" />
@@ -86,8 +224,6 @@ def render_html(summary: Dict[str, Any], ideas: List[Dict[str, Any]]) -> str:
     top_views_html = "".join(f"<li>{html_escape(i.get('title',''))} — {i.get('metrics',{}).get('views','')}</li>" for i in summary["top_views"])
     top_score_html = "".join(f"<li>{html_escape(i.get('title',''))} — {i.get('metrics',{}).get('score','')}</li>" for i in summary["top_score"])
 
-    cards = "\n".join(card_html(i) for i in ideas)
-
     return f"""<!doctype html>
 <html lang="fr">
 <head>{head}<style>{css}</style></head>
@@ -114,22 +250,71 @@ def render_html(summary: Dict[str, Any], ideas: List[Dict[str, Any]]) -> str:
     <hr style="border:none;border-top:1px solid #e5e7eb;margin:8px 0 16px 0"/>
     <section>
       <h2>Idées (avec images)</h2>
-      <div style="display:flex;flex-direction:column;gap:12px">{cards}</div>
+      <div style="display:flex;flex-direction:column;gap:12px">"""
+
+HTML_FOOT = """</div>
     </section>
   </div>
 </body>
 </html>"""
 
+def render_html(summary: Dict[str, Any], ideas: Iterable[Dict[str, Any]], images: ReportImages | None = None) -> str:
+    cards = "\n".join(card_html(i, images) for i in ideas)
+    return render_head(summary) + cards + HTML_FOOT
+
+def render_mail(summary: Dict[str, Any], ideas: Iterable[Dict[str, Any]],
+                images: ReportImages) -> tuple[str, ReportImages]:
+    """
+    Corps du mail Outlook : mêmes fiches que le rapport, vignettes en pièces jointes CID
+    (liens relatifs et fonds CSS ne s'affichent pas dans Outlook). Rien n'est écrit sur disque.
+    """
+    mail_images = ReportImages("cid", images.report_dir, store=images.store)
+    return render_html(summary, ideas, mail_images), mail_images
+
+def mail_attachment(images: ReportImages, saved: pathlib.Path) -> pathlib.Path | None:
+    # Seul le rapport inline est autonome : les autres modes pointent vers des fichiers locaux
+    return saved if images.mode == "inline" else None
+
 def save_html(html: str, path: pathlib.Path) -> pathlib.Path:
     OUT_DIR.mkdir(parents=True, exist_ok=True)
     path.write_text(html, encoding="utf-8")
     return path
 
-def try_send_outlook(subject: str, html_body: str, attachment_path: pathlib.Path | None = None) -> bool:
+def build_report_stream(data_path: pathlib.Path, out_path: pathlib.Path,
+                        images: ReportImages | None = None) -> Dict[str, Any]:
+    """
+    Rapport en flux : les fiches partent dans un fichier temporaire pendant que le résumé
+    s'accumule, puis en-tête + fiches + pied sont assemblés dans out_path.
+    La mémoire ne dépend pas du nombre d'idées.
+    """
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    builder = SummaryBuilder()
+    fd, cards_path = tempfile.mkstemp(prefix="cards_", suffix=".html", dir=out_path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as cards:
+            for idea in iter_ideas(data_path):
+                if builder.count:
+                    cards.write("\n")
+                cards.write(card_html(idea, images))
+                builder.add(idea)
+        summary = builder.summary()
+        tmp = out_path.with_name(out_path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as out, open(cards_path, "r", encoding="utf-8") as cards:
+            out.write(render_head(summary))
+            shutil.copyfileobj(cards, out)
+            out.write(HTML_FOOT)
+        os.replace(tmp, out_path)
+    finally:
+        os.remove(cards_path)
+    return summary
+
+def try_send_outlook(subject: str, html_body: str, attachment_path: pathlib.Path | None = None,
+                     inline_images: List[tuple] = ()) -> bool:
     """
     Envoi via Outlook si disponible et si REPORT_EMAIL_TO est défini.
     - REPORT_EMAIL_TO: destinataire(s), séparés par ';'
     - REPORT_EMAIL_SUBJECT (optionnel)
+    - inline_images : (chemin, Content-ID) référencés par src="cid:..." dans le corps
     """
     to = os.getenv("REPORT_EMAIL_TO")
     if not to:
@@ -146,17 +331,55 @@ def try_send_outlook(subject: str, html_body: str, attachment_path: pathlib.Path
     mail.HTMLBody = html_body
     if attachment_path and attachment_path.exists():
         mail.Attachments.Add(str(attachment_path))
+    for path, cid in inline_images:
+        att = mail.Attachments.Add(str(path))
+        att.PropertyAccessor.SetProperty("http://schemas.microsoft.com/mapi/proptag/0x3712001F", cid)
     mail.Send()
     return True
 
 def main():
-    ideas = load_data(DATA_FILE)
-    summary = build_summary(ideas)
-    html = render_html(summary, ideas)
-    saved = save_html(html, OUT_FILE)
+    p = argparse.ArgumentParser(description="Rapport HTML FPL Radar (+ envoi Outlook).")
+    p.add_argument("--stream", action="store_true",
+                   help="Lecture incrémentale et écriture au fil de l'eau (mémoire constante)")
+    p.add_argument("--images", choices=DISK_MODES, default=IMAGES_MODE,
+                   help="Rapport sur disque : full = images d'origine, link = vignettes (défaut), "
+                        "inline = data URI (fichier autonome, joint au mail)")
+    tracing.add_argument(p)
+    args = p.parse_args()
+    tracing.start("report_build_and_send", args.profile)
+
+    images = ReportImages(args.images, OUT_FILE.parent)
+    if args.stream:
+        with tracing.span("build_report_stream", images=args.images):
+            summary = build_report_stream(DATA_FILE, OUT_FILE, images)
+        saved = OUT_FILE
+        ideas = None
+    else:
+        with tracing.span("load_data"):
+            ideas = load_data(DATA_FILE)
+        with tracing.span("build_summary"):
+            summary = build_summary(ideas)
+        with tracing.span("render_html", images=args.images):
+            html = render_html(summary, ideas, images)
+        saved = save_html(html, OUT_FILE)
+    tracing.count("ideas", summary["count"])
+    tracing.count_file("bytes_written", saved)
+    print(images.payload_line(saved.stat().st_size))
 
     subject = f"[FPL Radar] Rapport {summary['generated_at']}"
-    sent = try_send_outlook(subject, html_body=html, attachment_path=saved)
+    sent = False
+    if os.getenv("REPORT_EMAIL_TO"):
+        # Corps du mail rendu à part (cid) : le rapport sur disque garde ses liens
+        with tracing.span("render_mail"):
+            body, mail_images = render_mail(summary, ideas if ideas is not None else iter_ideas(DATA_FILE), images)
+        images.store = mail_images.store
+        with tracing.span("send_outlook"):
+            sent = try_send_outlook(subject, html_body=body,
+                                    attachment_path=mail_attachment(images, saved),
+                                    inline_images=mail_images.attachments())
+    if images.store is not None:
+        images.store.save()
+        print(images.store.stats_line())
 
     print(f"[OK] Rapport généré: {saved}")
     if sent:
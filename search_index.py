@@ -0,0 +1,234 @@
+# search_index.py
+# Index plein texte (SQLite FTS5) de l'archive fpl_summaries/*.md :
+# titre, chaîne, date de publication, jour du fichier et étiquettes (fpl_tags).
+# Mise à jour incrémentale : seuls les fichiers nouveaux ou modifiés (taille/mtime puis sha256)
+# sont relus ; un fichier disparu sort de l'index.
+# Usage :
+#   python search_index.py update
+#   python search_index.py search "free hit" --tag GW3 --channel UC... --since 2025-08-01
+
+import os
+import re
+import sys
+import time
+import sqlite3
+import hashlib
+import argparse
+
+from fpl_tags import TAGGER_VERSION, extract_tags
+
+SUMMARIES_DIR = "fpl_summaries"
+SEARCH_INDEX_PATH = os.getenv("SEARCH_INDEX_PATH", os.path.join(".cache", "search_index.sqlite"))
+DAY_FILE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}\.md$")   # les social_*.md ne sont pas indexés
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS files (
+    path     TEXT PRIMARY KEY,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256   TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries USING fts5(
+    title, tags, channel UNINDEXED, published UNINDEXED, day UNINDEXED, url UNINDEXED, file UNINDEXED,
+    tokenize = "unicode61 remove_diacritics 2"
+);
+"""
+
+# --------- Lecture des Markdown ---------
+
+def iter_entries(path: str):
+    """
+    Vidéos d'un fichier jour : dict(channel, published, title, url, summary).
+    Tolère les lignes parasites (restes de conflits git, etc.).
+    """
+    channel = None
+    entry = None
+    in_summary = False
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if line.startswith("# Chaîne "):
+                channel = line[len("# Chaîne "):].strip()
+                continue
+            m = re.match(r"^## (\d{4}-\d{2}-\d{2}) — (.*)$", line)
+            if m:
+                if entry:
+                    yield entry
+                entry = {"channel": channel, "published": m.group(1), "title": m.group(2).strip(),
+                         "url": None, "summary": ""}
+                in_summary = False
+                continue
+            if entry is None:
+                continue
+            if line.startswith("🔗 "):
+                entry["url"] = line[2:].strip()
+            elif line.strip() == "Résumé :":
+                in_summary = True
+            elif line.strip() == "---":
+                in_summary = False
+            elif in_summary and line.strip():
+                entry["summary"] = (entry["summary"] + " " + line.strip()).strip()
+    if entry:
+        yield entry
+
+def day_files(directory: str = SUMMARIES_DIR) -> list[str]:
+    if not os.path.isdir(directory):
+        return []
+    return sorted(os.path.join(directory, n) for n in os.listdir(directory) if DAY_FILE_RE.match(n))
+
+def sha256_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+# --------- Index ---------
+
+class SearchIndex:
+    def __init__(self, path: str = SEARCH_INDEX_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'tagger'").fetchone()
+        if row is None or row["value"] != str(TAGGER_VERSION):
+            # Règles d'étiquetage changées : tout est relu à la prochaine mise à jour
+            self.conn.execute("DELETE FROM entries")
+            self.conn.execute("DELETE FROM files")
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('tagger', ?)", (str(TAGGER_VERSION),))
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def update(self, directory: str = SUMMARIES_DIR) -> dict:
+        """
+        Réindexe les fichiers nouveaux ou modifiés. Renvoie les compteurs de la passe.
+        """
+        stats = {"files": 0, "indexed": 0, "unchanged": 0, "removed": 0, "entries": 0}
+        known = {r["path"]: r for r in self.conn.execute("SELECT * FROM files")}
+        seen = set()
+        with self.conn:
+            for path in day_files(directory):
+                rel = os.path.relpath(path, directory).replace(os.sep, "/")
+                seen.add(rel)
+                stats["files"] += 1
+                st = os.stat(path)
+                prev = known.get(rel)
+                if prev and prev["size"] == st.st_size and prev["mtime_ns"] == st.st_mtime_ns:
+                    stats["unchanged"] += 1
+                    continue
+                digest = sha256_file(path)
+                if prev and prev["sha256"] == digest:
+                    # Simple changement de date (copie, checkout) : contenu identique
+                    self.conn.execute("UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?",
+                                      (st.st_size, st.st_mtime_ns, rel))
+                    stats["unchanged"] += 1
+                    continue
+                self.conn.execute("DELETE FROM entries WHERE file = ?", (rel,))
+                day = rel[:-len(".md")]
+                rows = [(e["title"], " ".join(extract_tags(e["title"])), e["channel"], e["published"],
+                         day, e["url"], rel) for e in iter_entries(path)]
+                self.conn.executemany(
+                    "INSERT INTO entries (title, tags, channel, published, day, url, file) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows)
+                self.conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                                  (rel, st.st_size, st.st_mtime_ns, digest))
+                stats["indexed"] += 1
+                stats["entries"] += len(rows)
+            for rel in set(known) - seen:
+                self.conn.execute("DELETE FROM entries WHERE file = ?", (rel,))
+                self.conn.execute("DELETE FROM files WHERE path = ?", (rel,))
+                stats["removed"] += 1
+        return stats
+
+    def search(self, query: str = "", tags: list[str] | None = None, channel: str | None = None,
+               since: str | None = None, until: str | None = None, limit: int = 50, raw: bool = False) -> list[dict]:
+        """
+        Vidéos correspondantes, une ligne par vidéo (la plus récente d'abord), avec le
+        premier jour où elle apparaît dans l'archive et le nombre de fichiers qui la citent.
+        query : mots (tous requis) ou syntaxe FTS5 si raw=True ; tags : étiquettes exactes.
+        """
+        terms = []
+        if query:
+            terms.append(query if raw else " ".join(fts_quote(w) for w in query.split()))
+        for tag in tags or []:
+            terms.append(f"tags : {fts_quote(tag)}")
+        sql = "SELECT url, title, MAX(channel) AS channel, published, MIN(day) AS first_day, COUNT(*) AS files FROM entries WHERE 1=1"
+        params = []
+        if terms:
+            sql += " AND entries MATCH ?"
+            params.append(" AND ".join(f"({t})" for t in terms))
+        if channel:
+            sql += " AND channel = ?"
+            params.append(channel)
+        if since:
+            sql += " AND published >= ?"
+            params.append(since)
+        if until:
+            sql += " AND published <= ?"
+            params.append(until)
+        sql += " GROUP BY COALESCE(url, title) ORDER BY published DESC, title LIMIT ?"
+        params.append(limit)
+        return [dict(r) for r in self.conn.execute(sql, params)]
+
+def fts_quote(word: str) -> str:
+    # Terme littéral pour FTS5 (":" "-" "|" etc. ne sont pas interprétés)
+    return '"' + word.replace('"', '""') + '"'
+
+# --------- CLI ---------
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Index de recherche de l'archive fpl_summaries/.")
+    p.add_argument("--index", default=SEARCH_INDEX_PATH, help="Chemin de la base SQLite")
+    p.add_argument("--dir", default=SUMMARIES_DIR, help="Dossier des résumés quotidiens")
+    sub = p.add_subparsers(dest="command", required=True)
+    sub.add_parser("update", help="Indexer les fichiers nouveaux ou modifiés")
+    s = sub.add_parser("search", help="Chercher dans l'archive (met l'index à jour avant)")
+    s.add_argument("query", nargs="*", help="Mots recherchés dans le titre et les étiquettes")
+    s.add_argument("--tag", "-t", action="append", help="Étiquette exacte (GW3, Wildcard...), répétable")
+    s.add_argument("--channel", "-c", help="Filtrer sur un channel_id (UC....)")
+    s.add_argument("--since", "-s", help="Date de publication minimale (YYYY-MM-DD)")
+    s.add_argument("--until", "-u", help="Date de publication maximale (YYYY-MM-DD)")
+    s.add_argument("--limit", "-n", type=int, default=50, help="Nombre max de résultats")
+    s.add_argument("--raw", action="store_true", help="Requête en syntaxe FTS5 (OR, NEAR, préfixe*...)")
+    s.add_argument("--no-update", action="store_true", help="Ne pas relire les fichiers modifiés")
+    return p.parse_args()
+
+def main():
+    args = parse_args()
+    with SearchIndex(args.index) as index:
+        if args.command == "update" or not args.no_update:
+            t0 = time.perf_counter()
+            st = index.update(args.dir)
+            if args.command == "update" or st["indexed"] or st["removed"]:
+                print(f"🔎 Index : {st['indexed']} fichier(s) indexé(s) ({st['entries']} entrée(s)), "
+                      f"{st['unchanged']} inchangé(s), {st['removed']} retiré(s) "
+                      f"en {(time.perf_counter() - t0) * 1000:.0f} ms")
+        if args.command == "update":
+            return
+        t0 = time.perf_counter()
+        try:
+            rows = index.search(" ".join(args.query), args.tag, args.channel, args.since, args.until,
+                                args.limit, args.raw)
+        except sqlite3.OperationalError as e:
+            print(f"❌ Requête invalide : {e}")
+            sys.exit(2)
+        elapsed = (time.perf_counter() - t0) * 1000
+    for r in rows:
+        print(f"[{r['published']}] {r['channel']} — {r['title']}")
+        print(f"🔗 {r['url']}  (archivée le {r['first_day']}, {r['files']} fichier(s))")
+    print(f"{len(rows)} vidéo(s) en {elapsed:.1f} ms.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# tests/conftest.py
+# Fixtures communes : modules du dépôt importables, serveur local benchmarks/stub_server.py
+# (flux Atom YouTube et API OpenAI simulés) démarré sur un port libre pour chaque test.
+# Usage : python -m pytest -q
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "benchmarks")]
+
+import stub_server
+
+@pytest.fixture
+def stub():
+    """
+    stub(entries=.., latency=.., rate_limit=.., fail_rate=..) -> URL de base "http://127.0.0.1:<port>".
+    """
+    servers = []
+
+    def start(**options):
+        stub_server.StubHandler.hits = 0
+        stub_server.StubHandler.api_calls = []
+        server = stub_server.serve(0, **options)
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+@pytest.fixture
+def feeds(stub, monkeypatch):
+    """
+    feeds(**options) : flux YouTube de youtube_fpl_agent servis par le stub ; renvoie l'URL de base.
+    """
+    import youtube_fpl_agent as agent
+
+    def start(**options):
+        base_url = stub(**options)
+        monkeypatch.setattr(agent, "FEED_URL_TEMPLATE", base_url + "/feeds/videos.xml?channel_id={ucid}")
+        return base_url
+    return start
@@ -0,0 +1,81 @@
+# tests/test_archive_store.py
+# Archive compacte : append_section par passage, load_day limité aux blocs du jour,
+# compaction qui dédoublonne sans changer le rendu, bloc tronqué ignoré puis écrasé.
+
+import os
+
+import pytest
+
+from archive_store import ArchiveStore
+
+def entry(n: int, summary: str = "Résumé") -> dict:
+    return {"published": f"2025-09-0{n % 9 + 1}T10:00:00", "title": f"Vidéo {n}",
+            "url": f"https://youtu.be/v{n}", "summary": f"{summary} {n}"}
+
+@pytest.fixture(params=["zlib", "none"])
+def store(tmp_path, request):
+    return ArchiveStore(str(tmp_path / "data" / "archive.fplarc"), codec=request.param)
+
+def test_append_section_and_render_day(store):
+    store.append_section("2025-09-07", "UC_a", [entry(1), entry(2)])
+    store.append_section("2025-09-08", "UC_a", [entry(3)])
+    # Deuxième passage du même jour : ajouté dans la même section
+    store.append_section("2025-09-07", "UC_a", [entry(4)])
+    assert store.days() == ["2025-09-07", "2025-09-08"]
+    text = store.render_day("2025-09-07")
+    assert text.count("# Chaîne UC_a") == 1
+    assert [f"Vidéo {n}" in text for n in (1, 2, 3, 4)] == [True, True, False, True]
+    assert store.render_day("2025-09-06") is None
+
+def test_load_day_reads_only_its_blocks(store):
+    for day in range(1, 6):
+        store.append_section(f"2025-09-0{day}", "UC_a", [entry(day)])
+    assert len(store.index()["days"]["2025-09-03"]) == 1
+    videos, sections = store.load_day("2025-09-03")
+    assert [s["day"] for s in sections] == ["2025-09-03"]
+    assert [v["t"] for v in videos.values()] == ["Vidéo 3"]
+
+def test_reprocess_replaces_same_video(store):
+    store.append_section("2025-09-07", "UC_a", [entry(1), entry(2)])
+    store.append_section("2025-09-07", "UC_a", [entry(1, summary="Nouveau")])
+    text = store.render_day("2025-09-07")
+    assert text.count("Vidéo 1") == 1 and "Nouveau 1" in text
+    assert text.index("Vidéo 1") < text.index("Vidéo 2")   # position conservée
+
+def test_compact_dedupes_and_keeps_rendering(store):
+    days = [f"2025-09-{d:02d}" for d in range(1, 17)]
+    for day in days:
+        # La même vidéo citée 16 jours de suite
+        store.append_section(day, "UC_a", [entry(1), entry(int(day[-2:]) + 10)])
+    before = {day: store.render_day(day) for day in days}
+    stats = store.compact()
+    assert stats["videos"] == 17 and stats["days"] == 16 and stats["refs"] == 32
+    assert store.stats()["blocks"] == 1
+    assert {day: store.render_day(day) for day in days} == before
+    # Index relu depuis le disque par une autre instance
+    assert ArchiveStore(store.path, codec=store.codec).render_day(days[3]) == before[days[3]]
+
+def test_compact_imports_markdown_days_once(store):
+    store.append_section("2025-09-07", "UC_a", [entry(1)])
+    stats = store.compact([("2025-09-07", "UC_a", [entry(9)]), ("2025-09-06", "UC_b", [entry(2)])])
+    assert stats["days"] == 2
+    assert "Vidéo 9" not in store.render_day("2025-09-07")   # jour déjà archivé : ignoré
+    assert "# Chaîne UC_b" in store.render_day("2025-09-06")
+
+def test_truncated_block_is_ignored_then_overwritten(store):
+    store.append_section("2025-09-07", "UC_a", [entry(1)])
+    good = os.path.getsize(store.path)
+    store.append_section("2025-09-08", "UC_a", [entry(2)])
+    # Arrêt brutal au milieu de l'écriture du deuxième bloc
+    with open(store.path, "r+b") as f:
+        f.truncate(os.path.getsize(store.path) - 5)
+    fresh = ArchiveStore(store.path, codec=store.codec)
+    assert fresh.valid_end() == good
+    assert fresh.days() == ["2025-09-07"]
+    fresh.append_section("2025-09-09", "UC_a", [entry(3)])
+    assert fresh.days() == ["2025-09-07", "2025-09-09"]
+    assert "Vidéo 3" in fresh.render_day("2025-09-09")
+
+def test_unknown_codec(tmp_path):
+    with pytest.raises(ValueError):
+        ArchiveStore(str(tmp_path / "a.fplarc"), codec="lz4")
@@ -0,0 +1,33 @@
+# tests/test_audio_cache.py
+# Cache audio partagé : tts_pyttsx3.py et youtube_fpl_agent --voiceover passent par la même
+# clé ; un script déjà rendu par l'un n'est pas re-synthétisé par l'autre.
+
+import disk_cache
+import tts_pyttsx3
+import youtube_fpl_agent as agent
+
+class FakeEngine:
+    def __init__(self):
+        self.jobs = []
+
+    def save_to_file(self, text, path):
+        self.jobs.append((text, path))
+
+    def runAndWait(self):
+        for text, path in self.jobs:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        self.jobs = []
+
+def test_voiceover_and_tts_share_cache(tmp_path, monkeypatch):
+    script = tmp_path / "social.md"
+    script.write_text("# Radar FPL\n- Free Hit en vue.\n- Haaland capitaine ?\n", encoding="utf-8")
+    monkeypatch.setattr(disk_cache, "CACHE_ROOT", str(tmp_path / "cache"))
+    inits = []
+    monkeypatch.setattr(tts_pyttsx3, "init_engine", lambda *a: inits.append(a) or FakeEngine())
+
+    tts_pyttsx3.generate_tts(str(script), str(tmp_path / "a" / "voice.wav"), None, 175, 1.0, gentle=False)
+    agent.generate_voiceover_from_script(str(script), str(tmp_path / "b"), "voice.wav", rate=175)
+    assert len(inits) == 1
+    assert len(list((tmp_path / "cache" / "audio").glob("*.wav"))) == 1
+    assert (tmp_path / "b" / "voice.wav").read_text(encoding="utf-8") == "Radar FPL Free Hit en vue. Haaland capitaine ?"
@@ -0,0 +1,71 @@
+# tests/test_daemon.py
+# Démon : la session HTTP donne les mêmes vidéos que feedparser.parse(url) et une chaîne
+# injoignable n'interrompt pas le passage ; une régénération ratée laisse le jour en attente
+# (fichier d'état), retentée aux passages suivants même sans nouvelle vidéo.
+
+import argparse
+
+import pytest
+import requests
+
+import daemon
+import youtube_fpl_agent as agent
+from feed_cache import FeedCache
+
+UCIDS = ["UCstub000001", "UCstub000002", "UCstub000003"]
+
+def test_session_path_matches_feedparser_path(feeds):
+    feeds(entries=4)
+    with requests.Session() as session:
+        assert agent.fetch_all_videos(UCIDS, workers=2, session=session) == agent.fetch_all_videos(UCIDS, workers=2)
+
+def test_unreachable_channel_does_not_abort_poll(feeds, monkeypatch, tmp_path):
+    feeds(entries=2)
+    # Chaîne "down" : port fermé ; les autres passent par le stub
+    feed_url_for = agent.feed_url_for
+    monkeypatch.setattr(agent, "feed_url_for", lambda ucid: (
+        "http://127.0.0.1:9/feeds/videos.xml" if ucid == "down" else feed_url_for(ucid)))
+    cache = FeedCache(str(tmp_path))
+    with requests.Session() as session:
+        results = agent.fetch_all_videos([UCIDS[0], "down", UCIDS[1]], workers=3, cache=cache, session=session)
+    assert [len(videos) for videos in results] == [2, 0, 2]
+
+@pytest.fixture
+def radar(tmp_path, monkeypatch):
+    # Fichier d'état relatif au dossier courant (.cache/daemon_status.json)
+    monkeypatch.chdir(tmp_path)
+    if daemon.os.path.isabs(daemon.STATUS_FILE):
+        pytest.skip("RADAR_CACHE_DIR absolu : le fichier d'état ne serait pas isolé")
+    return daemon.Daemon(argparse.Namespace(interval=1))
+
+def test_failed_regeneration_is_retried(radar):
+    new_videos = [2, 0, 0]
+    regenerated = []
+
+    def poll(date_str):
+        n = new_videos.pop(0)
+        if n:
+            radar.mark_pending(date_str)
+        return n
+
+    def regenerate(date_str):
+        regenerated.append(date_str)
+        if len(regenerated) == 1:
+            raise RuntimeError("TTS indisponible")
+
+    radar.poll, radar.regenerate = poll, regenerate
+    radar.cycle()
+    day = regenerated[0]
+    assert radar.status["pending"] == [day]
+    assert radar.status["last_error"] == "RuntimeError: TTS indisponible"
+    assert daemon.read_status()["pending"] == [day]
+    # Un démon relancé reprend le jour en attente
+    assert daemon.Daemon(argparse.Namespace(interval=1)).status["pending"] == [day]
+
+    radar.cycle()
+    assert regenerated == [day, day]
+    assert radar.status["pending"] == [] and daemon.read_status()["pending"] == []
+    assert radar.status["regenerations"] == 1 and radar.status["last_error"] is None
+
+    radar.cycle()
+    assert regenerated == [day, day]
@@ -0,0 +1,40 @@
+# tests/test_feed_cache.py
+# Requêtes conditionnelles contre le serveur local : un 304 renvoie les vidéos du cache,
+# compté en hit ; un 200 qui remplace l'entrée est un miss.
+
+import requests
+
+import youtube_fpl_agent as agent
+from feed_cache import FeedCache
+from stub_server import StubHandler
+
+UCIDS = ["UCstub000001", "UCstub000002", "UCstub000003"]
+
+def test_feed_cache_not_modified(feeds, tmp_path):
+    feeds(entries=6)
+    cache = FeedCache(str(tmp_path))
+    with requests.Session() as session:
+        first = agent.fetch_all_videos(UCIDS, workers=3, cache=cache, session=session)
+        assert (cache.hits, cache.misses, cache.not_modified) == (0, 3, 0)
+        second = agent.fetch_all_videos(UCIDS, workers=3, cache=cache, session=session)
+    assert second == first
+    assert (cache.hits, cache.misses, cache.not_modified) == (3, 3, 3)
+    assert StubHandler.hits == 6
+
+def test_feed_cache_not_modified_feedparser(feeds, tmp_path):
+    feeds(entries=3)
+    cache = FeedCache(str(tmp_path))
+    first = agent.fetch_videos(UCIDS[0], cache=cache)
+    assert agent.fetch_videos(UCIDS[0], cache=cache) == first
+    assert (cache.hits, cache.not_modified) == (1, 1)
+
+def test_feed_cache_reused_when_fetch_fails(feeds, monkeypatch, tmp_path):
+    feeds(entries=3)
+    cache = FeedCache(str(tmp_path))
+    with requests.Session() as session:
+        first = agent.fetch_videos(UCIDS[0], cache=cache, session=session)
+        # Serveur injoignable au passage suivant : les vidéos en cache restent servies
+        monkeypatch.setattr(agent, "feed_url_for", lambda ucid: "http://127.0.0.1:9/feeds/videos.xml")
+        assert agent.fetch_videos(UCIDS[0], cache=cache, session=session) == first
+        assert agent.fetch_videos(UCIDS[0], cache=cache) == first
+    assert (cache.hits, cache.misses, cache.not_modified, cache.stale) == (0, 1, 0, 2)
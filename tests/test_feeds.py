@@ -0,0 +1,15 @@
+# tests/test_feeds.py
+# Téléchargement des flux en parallèle contre le serveur local : un résultat par chaîne,
+# dans l'ordre de la liste, quel que soit l'ordre d'arrivée.
+
+import youtube_fpl_agent as agent
+
+UCIDS = ["UCstub000001", "UCstub000002", "UCstub000003"]
+
+def test_fetch_all_videos_keeps_channel_order(feeds):
+    feeds(entries=5, latency=0.05)
+    results = agent.fetch_all_videos(UCIDS, workers=3)
+    assert [len(videos) for videos in results] == [5, 5, 5]
+    for ucid, videos in zip(UCIDS, results):
+        assert all(v["id"].startswith(ucid[-6:]) for v in videos)
+        assert videos == sorted(videos, key=lambda v: v["published_dt"], reverse=True)
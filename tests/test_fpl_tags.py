@@ -0,0 +1,34 @@
+# tests/test_fpl_tags.py
+# Étiquettes des titres : celles de l'ancien résumé (mots de jargon, préfixe GW) sont
+# conservées, les termes en plusieurs mots les regroupent.
+
+import pytest
+
+from fpl_tags import extract_players, extract_tags
+
+@pytest.mark.parametrize("title, tags", [
+    ("Team reveal", ["Team"]),
+    ("Selection headaches", ["Selection"]),
+    ("Big hit or not", ["Hit"]),
+    ("My Team for GW5", ["Team", "GW5"]),
+    ("GW5-6 planner", ["GW5"]),
+    ("gw05 free transfers", ["GW05", "Free", "Transfers"]),
+    ("FPL GW3: FREE HIT DRAFT | TIPS' PICKS", ["GW3", "Free Hit", "Draft", "Picks"]),   # "TIPS'" : un mot
+    ("FPL GW3: TEAM SELECTION", ["GW3", "Team Selection"]),
+    ("", []),
+])
+def test_extract_tags(title, tags):
+    assert extract_tags(title) == tags
+
+def test_extract_players():
+    title = "FPL GW3 | Wood, Cunha & B.Fernandes | Calvert-Lewin or rice?"
+    assert extract_players(title) == ["Wood", "Cunha", "Bruno Fernandes", "Calvert-Lewin"]
+    # Nom hors dictionnaire cité dans une liste : gardé tel quel
+    assert extract_players("Sarr, Mbeumo & Zed Unknown | Team") == ["Sarr", "Mbeumo", "Zed Unknown"]
+
+def test_results_are_independent():
+    # Chaque appel renvoie ses propres listes : les modifier ne change pas le suivant
+    tags = extract_tags("Team reveal")
+    tags.append("X")
+    assert extract_tags("Team reveal") == ["Team"]
+    assert extract_players("Wood, Cunha & Cucurella") == extract_players("Wood,  Cunha &  Cucurella")
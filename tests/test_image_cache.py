@@ -0,0 +1,42 @@
+# tests/test_image_cache.py
+# Cache d'images adressé par contenu : un hit lie l'entrée dans la sortie, un miss laisse
+# en place la sortie existante (placeholder) sauf si c'est un lien vers le cache.
+
+import os
+
+from image_cache import ImageCache
+
+def write(path, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
+
+def read(path) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+def test_miss_keeps_existing_output(tmp_path):
+    cache = ImageCache(str(tmp_path / "cache"))
+    out = tmp_path / "out" / "01_prompt.png"
+    out.parent.mkdir()
+    write(out, b"placeholder")
+    key = ImageCache.key("prompt", "gpt-image-1", "1024x1024")
+    assert not cache.fetch_into(key, str(out))
+    assert read(out) == b"placeholder"
+    assert cache.misses == 1
+
+def test_hit_links_entry_and_miss_detaches_link(tmp_path):
+    cache = ImageCache(str(tmp_path / "cache"))
+    out = str(tmp_path / "01_prompt.png")
+    write(out, b"render A")
+    key_a = ImageCache.key("A", "gpt-image-1", "1024x1024")
+    cache.store(key_a, out)
+    write(out, b"placeholder")
+    assert cache.fetch_into(key_a, out)
+    assert read(out) == b"render A" and cache.linked(out)
+    assert cache.fetch_into(key_a, out)   # déjà en place
+    # Miss sur une autre clé : le lien est retiré, l'entrée A reste intacte
+    assert not cache.fetch_into(ImageCache.key("B", "gpt-image-1", "1024x1024"), out)
+    assert not os.path.exists(out)
+    assert read(cache.path(key_a)) == b"render A"
+    assert (cache.hits, cache.misses) == (2, 1)
+    assert not os.path.exists(out + ".tmp")
@@ -0,0 +1,73 @@
+# tests/test_pipeline.py
+# Ordonnanceur incrémental sur des étapes factices (dossier temporaire) : relance sans
+# changement = tout sauté, reprise après échec, étape forcée (--poll) sans effet en aval
+# si ses sorties sont identiques, entrée modifiée = l'étape et sa suite seulement.
+
+import pytest
+
+import pipeline
+
+def step(name, source, target, fail_flag=None):
+    # Copie source -> target en journalisant le passage ; échoue si fail_flag existe
+    code = ("import os, sys\n"
+            f"open('runs.log', 'a').write('{name}\\n')\n"
+            f"sys.exit(1) if {fail_flag!r} and os.path.exists({fail_flag!r}) else None\n"
+            f"open({target!r}, 'w').write(open({source!r}).read())\n")
+    return [pipeline.PY, "-c", code]
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "ROOT", str(tmp_path))
+    monkeypatch.setattr(pipeline, "STATE_FILE", str(tmp_path / ".cache" / "pipeline_state.json"))
+    monkeypatch.setattr(pipeline, "build_stages", lambda date: [
+        pipeline.Stage("fetch", step("fetch", "channels.txt", "social.md"),
+                       inputs=["channels.txt"], outputs=["social.md"]),
+        pipeline.Stage("render", step("render", "social.md", "card.png", fail_flag="render.fail"),
+                       inputs=["social.md"], outputs=["card.png"], deps=["fetch"]),
+        pipeline.Stage("report", step("report", "card.png", "report.html"),
+                       inputs=["card.png"], outputs=["report.html"], deps=["render"]),
+    ])
+    (tmp_path / "channels.txt").write_text("UCstub000001\n")
+
+    def runs():
+        log = tmp_path / "runs.log"
+        done = log.read_text().split() if log.exists() else []
+        log.unlink(missing_ok=True)
+        return done
+    return tmp_path, runs
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_unchanged_rerun_skips_every_stage(project, jobs):
+    root, runs = project
+    assert pipeline.run("2025-09-07", jobs=jobs)
+    assert runs() == ["fetch", "render", "report"]
+    assert pipeline.run("2025-09-07", jobs=jobs)
+    assert runs() == []
+    # Nouvelle date : nouvelles sorties du jour, tout repart
+    assert pipeline.run("2025-09-08", jobs=jobs)
+    assert runs() == ["fetch", "render", "report"]
+
+def test_resume_after_failure(project):
+    root, runs = project
+    (root / "render.fail").touch()
+    assert not pipeline.run("2025-09-07")
+    assert runs() == ["fetch", "render"]
+    (root / "render.fail").unlink()
+    assert pipeline.run("2025-09-07")
+    assert runs() == ["render", "report"]
+
+def test_forced_fetch_and_changed_input(project):
+    root, runs = project
+    assert pipeline.run("2025-09-07")
+    runs()
+    # --poll : fetch relancée ; mêmes sorties -> rien d'autre
+    assert pipeline.run("2025-09-07", force={"fetch"})
+    assert runs() == ["fetch"]
+    (root / "channels.txt").write_text("UCstub000001\nUCstub000002\n")
+    assert pipeline.run("2025-09-07")
+    assert runs() == ["fetch", "render", "report"]
+
+def test_fetch_inputs_follow_imported_modules():
+    fetch = pipeline.build_stages("2025-09-07")[0]
+    assert fetch.name == "fetch"
+    assert {"channels.txt", "youtube_fpl_agent.py", "fpl_tags.py", "feed_cache.py"} <= set(fetch.inputs)
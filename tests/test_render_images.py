@@ -0,0 +1,48 @@
+# tests/test_render_images.py
+# generate_all contre l'API Images simulée : 429 + Retry-After (pause globale puis succès),
+# erreurs 5xx répétées (abandon après `retries` tentatives, backoff entre les essais).
+
+import time
+
+import pytest
+
+import openai_client
+import render_images
+from stub_server import StubHandler
+
+JOBS = [(f"prompt_{i}", f"FPL visual {i}") for i in range(3)]
+
+@pytest.fixture
+def api(stub, monkeypatch):
+    def start(**options):
+        monkeypatch.setattr(openai_client, "BASE_URL", stub(**options) + "/v1")
+        monkeypatch.setattr(openai_client, "METRICS", openai_client.Metrics())
+        monkeypatch.setenv("OPENAI_API_KEY", "stub")
+    return start
+
+def run(jobs, **kwargs):
+    results = {}
+    render_images.generate_all(jobs, lambda key, data, err: results.__setitem__(key, (data, err)), **kwargs)
+    return results
+
+def test_generate_all_respects_retry_after(api):
+    api(rate_limit=1)
+    t0 = time.monotonic()
+    results = run(JOBS, workers=3, rps=100, retries=5, delay=0.01)
+    elapsed = time.monotonic() - t0
+    assert sorted(results) == sorted(key for key, _ in JOBS)
+    assert all(err is None and data["data"][0]["b64_json"] for data, err in results.values())
+    # 1 requête/s acceptée, Retry-After: 1 -> au moins deux pauses d'une seconde
+    assert openai_client.METRICS.retries >= 2
+    assert elapsed >= 2.0
+
+def test_generate_all_gives_up_after_retries(api):
+    api(fail_rate=1.0)
+    t0 = time.monotonic()
+    results = run(JOBS[:2], workers=2, rps=100, retries=3, delay=0.05)
+    elapsed = time.monotonic() - t0
+    assert all(data is None and "3 tentatives" in str(err) for data, err in results.values())
+    assert StubHandler.hits == 2 * 3
+    assert openai_client.METRICS.retries == 2 * 2
+    # Backoff exponentiel (jitter 0.5x - 1.5x) : au moins 0.025 s puis 0.05 s avant les reprises
+    assert elapsed >= 0.075
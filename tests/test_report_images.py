@@ -0,0 +1,54 @@
+# tests/test_report_images.py
+# Images du rapport : liens relatifs par défaut sur disque, data URI écrite une seule fois
+# par vignette en mode inline, corps du mail rendu à part en cid.
+
+import json
+
+import pytest
+from PIL import Image
+
+import report_build_and_send as report
+from thumbnails import ReportImages, ThumbnailStore
+
+@pytest.fixture
+def ideas(tmp_path):
+    paths = []
+    for i, color in enumerate(("red", "blue")):
+        path = tmp_path / f"{i}.png"
+        Image.new("RGB", (640, 360), color).save(path)
+        paths.append(str(path))
+    # La première image revient sur deux fiches
+    return [{"title": f"Idée {i}", "image_path": path, "metrics": {"views": 100 * i, "score": i}}
+            for i, path in enumerate(paths + paths[:1])]
+
+@pytest.fixture
+def store(tmp_path):
+    return ThumbnailStore(tmp_path / "thumbs")
+
+def render(mode, ideas, store, report_dir):
+    images = ReportImages(mode, report_dir, store=store)
+    return report.render_html(report.build_summary(ideas), ideas, images), images
+
+def test_link_mode_uses_relative_thumbnails(tmp_path, ideas, store):
+    html, _ = render("link", ideas, store, tmp_path / "out")
+    assert html.count('src="../thumbs/') == 3
+    assert "cid:" not in html and "data:" not in html
+
+def test_inline_mode_writes_each_thumbnail_once(tmp_path, ideas, store):
+    html, images = render("inline", ideas, store, tmp_path / "out")
+    assert html.count("data:image/webp;base64,") == 2
+    assert html.count('role="img"') == 3
+    assert len(images.inlined) == 2 and not images.cids
+
+def test_mail_body_is_cid_and_disk_report_keeps_links(tmp_path, ideas, store):
+    out = tmp_path / "out" / "report.html"
+    data = tmp_path / "ideas.json"
+    data.write_text(json.dumps(ideas), encoding="utf-8")
+    images = ReportImages("link", out.parent, store=store)
+    summary = report.build_report_stream(data, out, images)
+    body, mail_images = report.render_mail(summary, report.iter_ideas(data), images)
+    assert "cid:" not in out.read_text(encoding="utf-8")
+    assert body.count('src="cid:') == 3
+    assert len(mail_images.attachments()) == 2
+    assert report.mail_attachment(images, out) is None
+    assert report.mail_attachment(ReportImages("inline", out.parent, store=store), out) == out
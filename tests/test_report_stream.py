@@ -0,0 +1,40 @@
+# tests/test_report_stream.py
+# Rapport --stream : même résumé (ex aequo compris) et même HTML que le mode batch.
+
+import json
+
+import pytest
+
+import report_build_and_send as report
+
+def make_ideas(n: int):
+    # Vues et scores répétés : l'ordre des ex aequo doit suivre celui du fichier
+    return [{"title": f"Idée {i} — \"é\"", "description": "x" * (i % 7),
+             "metrics": {"views": (i * 37) % 11, "score": round((i % 5) * 1.5, 1), "ctr": i}}
+            for i in range(n)]
+
+def without_date(summary):
+    return {k: v for k, v in summary.items() if k != "generated_at"}
+
+@pytest.mark.parametrize("wrapped", [False, True])
+def test_stream_matches_batch(tmp_path, wrapped):
+    ideas = make_ideas(200)
+    data = tmp_path / "ideas.json"
+    data.write_text(json.dumps({"date": "2026-10-18", "ideas": ideas} if wrapped else ideas,
+                               ensure_ascii=False, indent=1), encoding="utf-8")
+    out = tmp_path / "report.html"
+
+    summary = report.build_report_stream(data, out, None)
+    batch = report.build_summary(report.load_data(data))
+    assert without_date(summary) == without_date(batch)
+
+    batch["generated_at"] = summary["generated_at"]
+    assert out.read_text(encoding="utf-8") == report.render_html(batch, ideas, None)
+    assert not list(tmp_path.glob("cards_*"))   # fichier temporaire des fiches supprimé
+
+def test_iter_ideas_small_chunks(tmp_path):
+    # Blocs de quelques octets : valeurs et nombres coupés entre deux lectures
+    ideas = make_ideas(30)
+    data = tmp_path / "ideas.json"
+    data.write_text(json.dumps(ideas), encoding="utf-8")
+    assert list(report.iter_ideas(data, chunk_size=7)) == ideas
@@ -0,0 +1,63 @@
+# tests/test_search_index.py
+# Index FTS5 : seuls les fichiers nouveaux ou modifiés sont relus, un fichier disparu sort
+# de l'index, un changement de TAGGER_VERSION force une réindexation complète.
+
+import os
+
+import pytest
+
+import search_index
+from search_index import SearchIndex
+
+def write_day(directory, day: str, videos: list[tuple[str, str]], channel: str = "UC_a"):
+    text = f"# Chaîne {channel}\n\n" + "".join(
+        f"## {day} — {title}\n🔗 https://youtu.be/{vid}\n\nRésumé :\nTexte.\n\n---\n\n" for vid, title in videos)
+    path = directory / f"{day}.md"
+    path.write_text(text, encoding="utf-8")
+    return path
+
+@pytest.fixture
+def summaries(tmp_path):
+    directory = tmp_path / "fpl_summaries"
+    directory.mkdir()
+    write_day(directory, "2025-09-01", [("a", "GW3 Free Hit tips"), ("b", "Wildcard draft")])
+    write_day(directory, "2025-09-02", [("c", "Salah captain GW4")])
+    (directory / "social_2025-09-02.md").write_text("## ignoré", encoding="utf-8")
+    return directory
+
+def test_incremental_update(tmp_path, summaries):
+    db = str(tmp_path / "index.sqlite")
+    with SearchIndex(db) as idx:
+        first = idx.update(str(summaries))
+        assert (first["files"], first["indexed"], first["entries"]) == (2, 2, 3)
+        again = idx.update(str(summaries))
+        assert (again["indexed"], again["unchanged"]) == (0, 2)
+
+        # Nouvelle date, même contenu : pas relu
+        os.utime(summaries / "2025-09-01.md", ns=(1, 1))
+        assert idx.update(str(summaries))["indexed"] == 0
+
+        # Fichier modifié : seul lui est relu, ses anciennes entrées remplacées
+        write_day(summaries, "2025-09-02", [("c", "Salah captain GW4"), ("d", "Haaland injury news")])
+        (summaries / "2025-09-01.md").unlink()
+        stats = idx.update(str(summaries))
+        assert (stats["indexed"], stats["removed"], stats["entries"]) == (1, 1, 2)
+        assert [r["title"] for r in idx.search()] == ["Haaland injury news", "Salah captain GW4"]
+        assert idx.search("free hit") == []
+
+def test_search_by_tag(tmp_path, summaries):
+    with SearchIndex(str(tmp_path / "index.sqlite")) as idx:
+        idx.update(str(summaries))
+        assert [r["title"] for r in idx.search(tags=["Free Hit"])] == ["GW3 Free Hit tips"]
+        assert [r["title"] for r in idx.search("captain", tags=["GW4"])] == ["Salah captain GW4"]
+
+def test_tagger_version_change_reindexes(tmp_path, summaries, monkeypatch):
+    db = str(tmp_path / "index.sqlite")
+    with SearchIndex(db) as idx:
+        idx.update(str(summaries))
+    with SearchIndex(db) as idx:
+        assert idx.update(str(summaries))["indexed"] == 0
+    monkeypatch.setattr(search_index, "TAGGER_VERSION", search_index.TAGGER_VERSION + 1)
+    with SearchIndex(db) as idx:
+        assert idx.search() == []   # entrées vidées à l'ouverture
+        assert idx.update(str(summaries))["indexed"] == 2
@@ -0,0 +1,69 @@
+# tests/test_transcripts.py
+# Transcriptions via le fournisseur local (fixtures) : téléchargée une seule fois, absence
+# mémorisée, contenu identique partagé, résumé en flux limité aux premières phrases.
+
+import pytest
+
+import transcripts
+from transcripts import FixtureProvider, TranscriptStore, summarize_segments
+
+@pytest.fixture
+def fixtures(tmp_path):
+    directory = tmp_path / "fixtures"
+    directory.mkdir()
+    text = "Bonjour à tous.\nCette semaine   on parle du Free Hit !\n\nSalah ou Haaland ?\nDernière phrase.\n"
+    (directory / "vid1.txt").write_text(text, encoding="utf-8")
+    (directory / "vid2.txt").write_text(text, encoding="utf-8")
+    return directory
+
+class CountingProvider(FixtureProvider):
+    def __init__(self, directory):
+        super().__init__(str(directory))
+        self.calls = 0
+
+    def fetch(self, video_id):
+        self.calls += 1
+        return super().fetch(video_id)
+
+def test_fetched_once_then_cached(tmp_path, fixtures):
+    provider = CountingProvider(fixtures)
+    store = TranscriptStore(str(tmp_path / "cache"), provider=provider)
+    assert list(store.segments("vid1")) == ["Bonjour à tous.", "Cette semaine on parle du Free Hit !",
+                                            "Salah ou Haaland ?", "Dernière phrase."]
+    assert list(store.segments("vid1")) and provider.calls == 1
+    store.save()
+
+    # Nouvelle instance : l'index sur disque suffit, pas de nouvel appel
+    again = TranscriptStore(str(tmp_path / "cache"), provider=provider)
+    assert again.ensure("vid1") == store.index["vid1"]["sha"]
+    assert provider.calls == 1 and again.hits == 1
+
+def test_same_content_shares_one_blob(tmp_path, fixtures):
+    store = TranscriptStore(str(tmp_path / "cache"), provider=FixtureProvider(str(fixtures)))
+    assert store.ensure("vid1") == store.ensure("vid2")
+    assert store.stats()["blobs"] == 1 and store.fetched == 2
+
+def test_missing_is_remembered(tmp_path, fixtures):
+    provider = CountingProvider(fixtures)
+    store = TranscriptStore(str(tmp_path / "cache"), provider=provider)
+    assert store.segments("absent") is None
+    assert store.ensure("absent") is None
+    assert provider.calls == 1 and store.missing == 1
+    assert store.index["absent"]["provider"] == "fixture"
+    # Passé le délai, l'absence est revérifiée
+    store.retry_s = 0
+    (fixtures / "absent.txt").write_text("Enfin disponible.\n", encoding="utf-8")
+    assert list(store.segments("absent")) == ["Enfin disponible."]
+
+def test_summary_reads_first_sentences_only(tmp_path, fixtures):
+    store = TranscriptStore(str(tmp_path / "cache"), provider=FixtureProvider(str(fixtures)))
+    assert summarize_segments(store.segments("vid1"), max_sentences=2) == \
+        "Bonjour à tous. Cette semaine on parle du Free Hit ! ..."
+    # Flux infini : la lecture s'arrête d'elle-même
+    endless = iter(lambda: "Encore une phrase.", None)
+    assert summarize_segments(endless, max_sentences=3).endswith("...")
+
+def test_get_provider():
+    assert transcripts.get_provider("fixture").name == "fixture"
+    with pytest.raises(ValueError):
+        transcripts.get_provider("inconnu")
@@ -0,0 +1,57 @@
+# tests/test_trends.py
+# Tendances : compteurs journaliers, fenêtres glissantes 7 / 28 jours, termes en hausse,
+# une vidéo comptée une seule fois, purge au-delà de la rétention.
+
+import pytest
+
+from trends import TrendStore, day_offset
+
+END = "2025-09-28"
+
+@pytest.fixture
+def store(tmp_path):
+    return TrendStore(str(tmp_path / "data" / "trends.json"))
+
+def add(store, day: str, title: str, n: int = 1):
+    for i in range(n):
+        store.add_video(f"{day}/{title}/{i}", day, title)
+
+def test_window_sums_daily_counters(store):
+    add(store, END, "Salah captain | Wildcard draft")
+    add(store, day_offset(END, -6), "Wildcard time")
+    add(store, day_offset(END, -7), "Wildcard again")   # hors fenêtre de 7 jours
+    week = store.window(END, 7)
+    assert week[("tag", "Wildcard")] == 2
+    assert week[("player", "Salah")] == 1
+    assert store.window(END, 28)[("tag", "Wildcard")] == 3
+    assert store.window(day_offset(END, -7), 1)[("tag", "Wildcard")] == 1
+
+def test_video_counted_once(store):
+    assert store.add_video("https://youtu.be/a", END, "Wildcard draft")
+    assert not store.add_video("https://youtu.be/a", END, "Wildcard draft")   # --reprocess
+    assert not store.add_video("", END, "Wildcard draft")
+    assert store.window(END, 1)[("tag", "Wildcard")] == 1 and store.added == 1
+
+def test_rising_ranks_recent_terms(store):
+    # Wildcard : présent toute la fenêtre longue ; Bench Boost : seulement cette semaine
+    for d in range(28):
+        add(store, day_offset(END, -d), "Wildcard plans")
+    add(store, END, "Bench Boost GW6 | Tips", n=3)
+    rising = store.rising(END)
+    assert rising[0]["term"] == "Bench Boost"
+    assert (rising[0]["recent"], rising[0]["base"]) == (3, 0)
+    assert all(r["term"] not in ("GW6", "Tips") for r in rising)   # jamais classés
+    wildcard = next(r for r in rising if r["term"] == "Wildcard")
+    assert wildcard["score"] < rising[0]["score"]
+    line = store.social_line(END)
+    assert line.startswith("Tendances du jour : Bench Boost")
+    assert store.social_line("2024-01-01") is None
+
+def test_save_prunes_and_reloads(store):
+    add(store, END, "Wildcard draft")
+    add(store, day_offset(END, -120), "Free Hit chip")
+    store.save()
+    reloaded = TrendStore(store.path)
+    assert list(reloaded.days) == [END]
+    assert len(reloaded.seen) == 1
+    assert reloaded.window(END, 28)[("tag", "Wildcard")] == 1
@@ -0,0 +1,23 @@
+# tests/test_tts_openai.py
+# Voix off OpenAI contre l'API Speech simulée : mode simple et mode --chunked envoient la
+# même requête (style dans "instructions") et donnent le même fichier pour un seul morceau.
+
+import openai_client
+import tts_openai
+
+def test_single_and_chunked_send_same_request(stub, monkeypatch, tmp_path):
+    monkeypatch.setattr(openai_client, "BASE_URL", stub() + "/v1")
+    monkeypatch.setenv("OPENAI_API_KEY", "stub")
+    payloads = []
+    post = openai_client.post
+    monkeypatch.setattr(openai_client, "post", lambda path, payload, **kw: payloads.append(payload) or post(path, payload, **kw))
+
+    script = tmp_path / "social.md"
+    script.write_text("# Radar FPL\n- Free Hit en vue.\n", encoding="utf-8")
+    tts_openai.generate_tts(str(script), str(tmp_path / "single.mp3"))
+    tts_openai.generate_tts_chunked(str(script), str(tmp_path / "chunked.mp3"))
+
+    assert payloads[0] == payloads[1]
+    assert payloads[0]["input"] == tts_openai.clean_markdown(str(script))
+    assert payloads[0]["instructions"] == tts_openai.STYLE_PROMPT
+    assert (tmp_path / "single.mp3").read_bytes() == (tmp_path / "chunked.mp3").read_bytes()
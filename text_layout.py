@@ -0,0 +1,74 @@
+# text_layout.py
+# Mise en page rapide du texte des cartes :
+# - avances de mots mises en cache par police,
+# - coupure de lignes par accumulation incrémentale des largeurs,
+# - mises en page mémoïsées par (texte, police, largeur max).
+
+from functools import lru_cache
+
+class FontMetrics:
+    """
+    Mesures mises en cache pour une police donnée.
+    """
+    def __init__(self, font):
+        self.font = font
+        self.space = font.getlength(" ")
+        # Marge d'incertitude entre somme des avances et boîte réelle (approches, crénage)
+        self.slack = max(2, int(getattr(font, "size", 10)) // 4)
+        self._advances = {}
+        self._widths = {}
+
+    def advance(self, word: str) -> float:
+        adv = self._advances.get(word)
+        if adv is None:
+            adv = self._advances[word] = self.font.getlength(word)
+        return adv
+
+    def width(self, text: str) -> int:
+        # Largeur exacte de la boîte englobante (identique à draw.textbbox((0, 0), ...))
+        w = self._widths.get(text)
+        if w is None:
+            l, t, r, b = self.font.getbbox(text)
+            w = self._widths[text] = r - l
+        return w
+
+_METRICS = {}
+
+def metrics_for(font) -> FontMetrics:
+    m = _METRICS.get(font)
+    if m is None:
+        m = _METRICS[font] = FontMetrics(font)
+    return m
+
+@lru_cache(maxsize=4096)
+def wrap(text: str, font, max_width: int) -> tuple[str, ...]:
+    """
+    Coupe `text` en lignes qui tiennent dans max_width pixels.
+    La largeur courante est accumulée mot par mot ; la mesure exacte n'est faite
+    que lorsque l'estimation tombe dans la marge d'incertitude autour de max_width.
+    """
+    m = metrics_for(font)
+    lines = []
+    cur = []
+    cur_w = 0.0
+    for w in text.split():
+        adv = m.advance(w)
+        est = cur_w + m.space + adv if cur else adv
+        if est <= max_width - m.slack:
+            fits = True
+        elif est > max_width + m.slack:
+            fits = False
+        else:
+            fits = m.width(" ".join(cur + [w])) <= max_width
+        if fits:
+            cur.append(w)
+            cur_w = est
+        else:
+            if cur:
+                lines.append(" ".join(cur))
+            cur = [w]
+            cur_w = adv
+    if cur:
+        lines.append(" ".join(cur))
+    # Si pas de mots (texte vide), renvoyer une ligne par défaut
+    return tuple(lines) or ("",)
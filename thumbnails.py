@@ -0,0 +1,239 @@
+# thumbnails.py
+# Vignettes légères (WebP ou JPEG) des visuels pour le rapport HTML.
+# - une vignette par image source, nommée d'après le hash du contenu (deux visuels
+#   identiques partagent la même vignette),
+# - le hash n'est recalculé que si la taille ou la date de modification changent (index.json),
+# - dans le rapport : lien relatif (défaut), data URI écrite une seule fois par vignette
+#   (classe CSS) ou pièce jointe CID (corps du mail Outlook).
+# Usage : python thumbnails.py [DATE]   # vignettes de social_images_out/<DATE>
+
+from __future__ import annotations
+import os, sys, json, html, base64, hashlib, pathlib, argparse
+from typing import Dict, List, Set, Tuple
+
+from disk_cache import prune
+
+BASE_DIR = pathlib.Path(__file__).resolve().parent
+IMAGES_ROOT = BASE_DIR / "social_images_out"
+THUMBS_DIR = BASE_DIR / "out" / "thumbs"
+
+THUMB_SIZE = int(os.getenv("THUMB_SIZE", 320))              # côté max (px), = max-width des fiches
+THUMB_FORMAT = os.getenv("THUMB_FORMAT", "webp").lower()    # webp | jpeg
+THUMB_QUALITY = int(os.getenv("THUMB_QUALITY", 80))
+THUMBS_MAX_BYTES = int(os.getenv("THUMBS_MAX_BYTES", 50 * 1024 * 1024))
+
+MIME = {"webp": "image/webp", "jpeg": "image/jpeg"}
+EXT = {"webp": ".webp", "jpeg": ".jpg"}
+
+def supported_format(fmt: str) -> str:
+    # Pillow compilé sans WebP : repli sur JPEG
+    if fmt == "webp":
+        from PIL import features
+        if not features.check("webp"):
+            print("⚠️ Pillow sans support WebP : vignettes en JPEG.")
+            return "jpeg"
+    return fmt if fmt in MIME else "jpeg"
+
+class ThumbnailStore:
+    """
+    Vignettes dans out/thumbs/<sha16>_<taille>.<ext>, créées une seule fois par image source.
+    """
+    def __init__(self, directory: pathlib.Path = THUMBS_DIR, size: int = THUMB_SIZE,
+                 fmt: str = THUMB_FORMAT, quality: int = THUMB_QUALITY):
+        self.directory = pathlib.Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.index_file = self.directory / "index.json"
+        self.size = size
+        self.fmt = supported_format(fmt)
+        self.quality = quality
+        self.created = 0
+        self.reused = 0
+        try:
+            self.index = json.loads(self.index_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.index = {}
+
+    def source_digest(self, src: pathlib.Path) -> str:
+        # sha256 du contenu ; recalculé seulement si taille ou mtime ont changé.
+        # Index par chemin absolu : relatif et absolu vers le même fichier partagent l'entrée.
+        src = src.resolve()
+        st = src.stat()
+        known = self.index.get(str(src))
+        if known and known[0] == st.st_size and known[1] == st.st_mtime_ns:
+            return known[2]
+        h = hashlib.sha256()
+        with open(src, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        self.index[str(src)] = [st.st_size, st.st_mtime_ns, h.hexdigest()]
+        return h.hexdigest()
+
+    def thumbnail(self, src: str | pathlib.Path) -> pathlib.Path | None:
+        """
+        Chemin de la vignette de `src` (créée si besoin), None si la source est illisible.
+        """
+        src = pathlib.Path(src)
+        try:
+            digest = self.source_digest(src)
+        except OSError:
+            return None
+        out = self.directory / f"{digest[:16]}_{self.size}{EXT[self.fmt]}"
+        if out.exists():
+            self.reused += 1
+            os.utime(out, None)   # horodatage LRU pour l'éviction
+            return out
+        from PIL import Image
+        try:
+            with Image.open(src) as im:
+                im = im.convert("RGB")
+                im.thumbnail((self.size, self.size), Image.LANCZOS)
+                tmp = out.with_name(out.name + ".tmp")
+                if self.fmt == "webp":
+                    im.save(tmp, "WEBP", quality=self.quality, method=4)
+                else:
+                    im.save(tmp, "JPEG", quality=self.quality, optimize=True, progressive=True)
+        except OSError as e:
+            print(f"⚠️ Vignette impossible pour {src.name} : {e}")
+            return None
+        os.replace(tmp, out)
+        self.created += 1
+        return out
+
+    def save(self):
+        # Oublie les sources disparues, puis éviction LRU des vignettes
+        self.index = {p: v for p, v in self.index.items() if os.path.exists(p)}
+        tmp = self.index_file.with_name(self.index_file.name + ".tmp")
+        tmp.write_text(json.dumps(self.index, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(tmp, self.index_file)
+        prune(str(self.directory), max_bytes=THUMBS_MAX_BYTES, pattern=f"*{EXT[self.fmt]}")
+
+    def stats_line(self) -> str:
+        return f"🖼️ Vignettes : {self.created} créée(s), {self.reused} réutilisée(s) ({self.fmt}, {self.size}px)"
+
+class ReportImages:
+    """
+    Images des fiches du rapport :
+    - "full"   : image d'origine (comportement historique),
+    - "link"   : vignette en lien relatif au rapport (défaut du rapport sur disque),
+    - "inline" : vignette en data URI, écrite une seule fois par vignette dans une classe CSS
+                 (<style> juste avant la première fiche qui l'utilise : compatible --stream),
+    - "cid"    : vignette en pièce jointe inline (src="cid:..."), pour le corps du mail Outlook.
+    Mesure aussi le poids des images avant / après.
+    """
+    MODES = ("full", "link", "inline", "cid")
+    IMG_STYLE = "max-width:320px;border-radius:12px;border:1px solid #ddd;"
+
+    def __init__(self, mode: str, report_dir: pathlib.Path, store: ThumbnailStore | None = None):
+        self.mode = mode
+        self.report_dir = pathlib.Path(report_dir)
+        self.store = store if store is not None or mode == "full" else ThumbnailStore()
+        self.sources: Dict[str, int] = {}     # image source -> taille d'origine
+        self.thumbs: Dict[str, int] = {}      # vignette -> taille
+        self.inlined: Set[str] = set()        # classes CSS déjà écrites (mode inline)
+        self.cids: Dict[str, str] = {}        # vignette -> Content-ID (mode cid)
+        self.inline_bytes = 0                 # poids des data URI écrites dans le HTML
+
+    def _thumb(self, src: str) -> pathlib.Path | None:
+        thumb = self.store.thumbnail(src)
+        if thumb is not None:
+            self.thumbs[str(thumb)] = thumb.stat().st_size
+        return thumb
+
+    def _resolve(self, src: str) -> pathlib.Path | None:
+        # Vignette à référencer, None pour garder la source telle quelle
+        if src not in self.sources:
+            try:
+                self.sources[src] = os.path.getsize(src)
+            except OSError:
+                self.sources[src] = 0
+        if self.mode == "full" or src.startswith(("http://", "https://", "data:")):
+            return None
+        return self._thumb(src)
+
+    def img_html(self, src: str) -> str:
+        """
+        Image de la fiche : <img> (chemin, lien relatif, cid:) ou bloc à fond CSS (inline).
+        """
+        thumb = self._resolve(src)
+        url = src
+        if thumb is not None:
+            if self.mode == "inline":
+                return self._inline_html(thumb)
+            if self.mode == "link":
+                url = os.path.relpath(thumb, self.report_dir).replace(os.sep, "/")
+            else:
+                key = str(thumb)
+                if key not in self.cids:
+                    self.cids[key] = f"{thumb.stem}@fplradar"
+                url = f"cid:{self.cids[key]}"
+        return f'<img src="{html.escape(url, quote=True)}" alt="image" style="{self.IMG_STYLE}" />'
+
+    def _inline_html(self, thumb: pathlib.Path) -> str:
+        # Rapport sur disque (navigateur) : Outlook n'affiche pas les fonds CSS, le mail passe en cid.
+        # Vignettes nommées par hash : une image répétée réutilise la classe déjà écrite.
+        cls = "t" + thumb.stem
+        css = ""
+        if cls not in self.inlined:
+            from PIL import Image
+            with Image.open(thumb) as im:
+                width, height = im.size
+            uri = f"data:{MIME[self.store.fmt]};base64,{base64.b64encode(thumb.read_bytes()).decode('ascii')}"
+            self.inlined.add(cls)
+            self.inline_bytes += len(uri)
+            css = (f"<style>.{cls}{{background-image:url({uri});width:{width}px;height:{height}px;"
+                   f"background-size:contain;flex:none;{self.IMG_STYLE}}}</style>")
+        return f'{css}<div class="{cls}" role="img" aria-label="image"></div>'
+
+    def attachments(self) -> List[Tuple[str, str]]:
+        # (chemin, Content-ID) des pièces jointes inline (mode cid)
+        return list(self.cids.items())
+
+    def payload_line(self, html_bytes: int) -> str:
+        """
+        Poids total rapport + images : avec les images d'origine vs. avec ce mode.
+        """
+        before = html_bytes - self.inline_bytes + sum(self.sources.values())
+        if self.mode == "full":
+            after = before
+        elif self.mode == "inline":
+            after = html_bytes   # les vignettes sont déjà dans le HTML
+        else:
+            after = html_bytes + sum(self.thumbs.values())
+        return (f"📦 Poids rapport + images : {human_size(before)} → {human_size(after)} "
+                f"({len(self.sources)} image(s), {len(self.thumbs)} vignette(s), mode {self.mode})")
+
+def human_size(n: int) -> str:
+    for unit in ("o", "Ko", "Mo"):
+        if n < 1024 or unit == "Mo":
+            return f"{n:.0f} {unit}" if unit == "o" else f"{n:.1f} {unit}"
+        n /= 1024
+
+def newest_date_dir(root: pathlib.Path) -> str | None:
+    dates = [p.name for p in root.glob("????-??-??") if p.is_dir()] if root.exists() else []
+    return max(dates) if dates else None
+
+def main():
+    p = argparse.ArgumentParser(description="Vignettes des visuels de social_images_out/<DATE> (out/thumbs).")
+    p.add_argument("date", nargs="?", help="Dossier date (défaut : le plus récent)")
+    p.add_argument("--size", type=int, default=THUMB_SIZE, help="Côté max en pixels")
+    p.add_argument("--format", choices=sorted(MIME), default=THUMB_FORMAT, help="Format des vignettes")
+    args = p.parse_args()
+
+    date = args.date or newest_date_dir(IMAGES_ROOT)
+    images = sorted((IMAGES_ROOT / date).glob("*.png")) if date else []
+    if not images:
+        print(f"❌ Aucune image .png dans {IMAGES_ROOT / (date or '')}")
+        sys.exit(1)
+    store = ThumbnailStore(size=args.size, fmt=args.format)
+    before = after = 0
+    for img in images:
+        thumb = store.thumbnail(img)
+        if thumb is not None:
+            before += img.stat().st_size
+            after += thumb.stat().st_size
+    store.save()
+    print(store.stats_line())
+    print(f"📦 Images : {human_size(before)} → {human_size(after)}")
+
+if __name__ == "__main__":
+    main()
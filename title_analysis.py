@@ -0,0 +1,184 @@
+# title_analysis.py
+# Analyse des titres de vidéos : gameweeks (GWxx), jargon FPL, clubs et joueurs,
+# y compris les expressions en plusieurs mots ("Free Hit", "Bruno Fernandes").
+# Dictionnaire chargeable (data/fpl_dictionary.json) compilé en automate d'Aho-Corasick
+# sur les mots : chaque titre est parcouru une seule fois, quel que soit le nombre de termes.
+# Mots et étiquettes GW* identiques à l'ancien résumé (re.split(r"[^\w']+"), préfixe "GW").
+# Usage : python title_analysis.py "FPL GW3: FREE HIT DRAFT | Wood, Cunha & Cucurella"
+
+import os
+import re
+import sys
+import json
+from collections import deque
+from operator import itemgetter
+from functools import lru_cache
+
+DICTIONARY_PATH = os.getenv("FPL_DICTIONARY_PATH",
+                            os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "fpl_dictionary.json"))
+KINDS = ("jargon", "clubs", "players")
+
+MAX_GAMEWEEK = 38
+# Mots de l'ancien résumé : "Calvert-Lewin" et "B.Fernandes" sont des motifs de deux mots
+TOKEN_RE = re.compile(r"[\w']+")
+GW_TAG = "gw_tag"   # tout mot commençant par "GW" est une étiquette (GW5, GW05, GW5-6 -> GW5)
+
+def fold(text: str) -> str:
+    # Minuscules caractère par caractère : les positions restent celles du texte d'origine
+    low = text.lower()
+    return low if len(low) == len(text) else "".join(c.lower()[:1] or c for c in text)
+
+class Automaton:
+    """
+    Automate d'Aho-Corasick sur une suite de symboles (ici des mots en minuscules).
+    build() complète les transitions (delta : symbole -> nœud, liens d'échec déjà suivis),
+    parcourues directement par TitleAnalyzer.analyze ; out : (longueur, valeur).
+    """
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        self.delta = []
+
+    def add(self, pattern, value):
+        node = 0
+        for sym in pattern:
+            nxt = self.goto[node].get(sym)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+                self.goto[node][sym] = nxt
+            node = nxt
+        self.out[node].append((len(pattern), value))
+
+    def build(self):
+        # Liens d'échec en largeur ; chaque nœud hérite des sorties et des transitions de son lien d'échec
+        self.delta = [dict(self.goto[0])] + [None] * (len(self.goto) - 1)
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            self.delta[node] = {**self.delta[self.fail[node]], **self.goto[node]}
+            for sym, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and sym not in self.goto[f]:
+                    f = self.fail[f]
+                target = self.goto[f].get(sym, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+        return self
+
+class TitleAnalyzer:
+    """
+    Dictionnaire {"jargon"|"clubs"|"players": {nom canonique: [alias, ...]}}.
+    Alias en minuscules : insensible à la casse ("free hit" trouve "FREE HIT").
+    Alias avec majuscules (noms propres) : tel quel ou tout en majuscules ("Rice", "RICE", pas "rice").
+    Les gameweeks ("GW3", "GW 3") sont des motifs de l'automate comme les autres ; les
+    étiquettes suivent la règle de l'ancien résumé (mot commençant par "GW", en majuscules).
+    """
+    def __init__(self, dictionary: dict):
+        self.automaton = Automaton()
+        self.size = 0
+        for n in range(1, MAX_GAMEWEEK + 1):
+            for pattern in ((f"gw{n}",), ("gw", str(n)), (f"gw{n:02d}",), ("gw", f"{n:02d}")):
+                self.automaton.add(pattern, ("gameweek", n, None))
+        for kind in KINDS:
+            for canonical, aliases in dictionary.get(kind, {}).items():
+                for alias in aliases:
+                    words = tuple(TOKEN_RE.findall(alias))
+                    if not words:
+                        continue
+                    exact = words if alias != alias.lower() else None
+                    self.automaton.add(tuple(fold(w) for w in words), (kind, canonical, exact))
+                    self.size += 1
+        self.automaton.build()
+
+    @classmethod
+    def from_file(cls, path: str = DICTIONARY_PATH) -> "TitleAnalyzer":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    @staticmethod
+    def _result(title: str, matches: list) -> dict:
+        """
+        matches : (type, nom) dans l'ordre du titre, sans chevauchement (hors étiquettes GW*).
+        tags : GW* et jargon dans l'ordre d'apparition (même rôle que l'ancien indice du résumé).
+        """
+        found = {"gameweek": {}, "jargon": {}, "players": {}, "clubs": {}}
+        tags = {}
+        for kind, name in matches:
+            if kind == GW_TAG:
+                tags[name] = None
+                continue
+            if kind == "jargon":
+                tags[name] = None
+            found[kind][name] = None
+        return {"title": title, "gameweeks": list(found["gameweek"]), "tags": list(tags),
+                "players": list(found["players"]), "clubs": list(found["clubs"])}
+
+    def analyze(self, title: str) -> dict:
+        # ’ devient ' (même longueur, mêmes positions)
+        text = (title or "").replace("’", "'")
+        folded = fold(text)
+        symbols = TOKEN_RE.findall(folded)
+
+        # Parcours de l'automate (boucle en ligne : c'est le point chaud de l'analyse)
+        delta, out = self.automaton.delta, self.automaton.out
+        found, node = [], 0
+        for j, sym in enumerate(symbols, 1):
+            node = delta[node].get(sym, 0)
+            if out[node]:
+                for length, value in out[node]:
+                    found.append((j - length, -j, value))
+            if sym[:2] == "gw":
+                found.append((j - 1, 0, (GW_TAG, sym.upper(), None)))
+        if not found:
+            return self._result(title, ())
+        found.sort(key=itemgetter(0, 1))
+
+        matches = []
+        words = None   # mots d'origine, relus seulement pour vérifier la casse des noms propres
+        last_end = -1
+        for i, neg_end, (kind, name, exact) in found:
+            if kind == GW_TAG:
+                matches.append((kind, name))
+                continue
+            # Plus longue correspondance à gauche, sans chevauchement
+            if i < last_end:
+                continue
+            if exact is not None:
+                if words is None:
+                    words = TOKEN_RE.findall(text)
+                    if len(words) != len(symbols):   # minuscule hors \w (rarissime) : relecture par position
+                        words = [text[m.start():m.end()] for m in TOKEN_RE.finditer(folded)]
+                written = tuple(words[i:-neg_end])
+                if written != exact and written != tuple(w.upper() for w in exact):
+                    continue
+            matches.append((kind, name))
+            last_end = -neg_end
+        return self._result(title, matches)
+
+@lru_cache(maxsize=None)
+def default_analyzer() -> TitleAnalyzer:
+    # Dictionnaire absent : analyseur vide (seuls les GW* sont reconnus)
+    try:
+        return TitleAnalyzer.from_file(DICTIONARY_PATH)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Dictionnaire FPL illisible ({DICTIONARY_PATH}) : {e}")
+        return TitleAnalyzer({})
+
+def analyze(title: str) -> dict:
+    return default_analyzer().analyze(title)
+
+def main():
+    titles = sys.argv[1:] or [line.rstrip("\n") for line in sys.stdin]
+    for r in map(analyze, titles):
+        print(f"{r['title']}")
+        print(f"   étiquettes : {', '.join(r['tags']) or '-'}")
+        print(f"   joueurs    : {', '.join(r['players']) or '-'}")
+        print(f"   clubs      : {', '.join(r['clubs']) or '-'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+# tracing.py
+# Instrumentation commune des scripts : durées imbriquées (spans), compteurs
+# (éléments traités, octets écrits, appels API) et profil cProfile optionnel.
+# Activée par --profile (ou RADAR_PROFILE=trace|cprofile) ; désactivée, chaque appel est un no-op.
+# Sortie : .cache/traces/YYYY-MM-DD.jsonl — une ligne par span, une ligne par exécution ;
+# les fichiers de plusieurs jours s'agrègent avec la commande summary.
+# Usage :
+#   python youtube_fpl_agent.py --multi --profile
+#   RADAR_PROFILE=cprofile python render_placeholders.py     # + .cache/traces/<run>.prof
+#   python tracing.py summary --days 7
+
+import os
+import sys
+import json
+import time
+import atexit
+import functools
+import argparse
+import threading
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta, UTC
+
+from disk_cache import CACHE_ROOT
+
+TRACE_DIR = os.getenv("RADAR_TRACE_DIR", os.path.join(CACHE_ROOT, "traces"))
+PROFILE_MODE = os.getenv("RADAR_PROFILE", "").strip().lower()   # "" | trace | cprofile (1 = trace)
+MODES = ("trace", "cprofile")
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL = _NullSpan()
+_tracer = None
+
+class _Span:
+    __slots__ = ("tracer", "name", "attrs", "id", "parent", "depth", "t0", "counters")
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.counters = None
+
+    def __enter__(self):
+        stack = self.tracer.stack()
+        self.parent = stack[-1].id if stack else 0
+        self.depth = len(stack) + 1
+        self.id = self.tracer.next_id()
+        stack.append(self)
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        self.tracer.stack().pop()
+        record = {"type": "span", "run": self.tracer.run_id, "script": self.tracer.script,
+                  "id": self.id, "parent": self.parent, "depth": self.depth, "name": self.name,
+                  "start_ms": round((self.t0 - self.tracer.t0) * 1000, 3),
+                  "ms": round((end - self.t0) * 1000, 3)}
+        if threading.current_thread() is not threading.main_thread():
+            record["thread"] = threading.current_thread().name
+        if self.attrs:
+            record["attrs"] = self.attrs
+        if self.counters:
+            record["counters"] = dict(self.counters)
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        self.tracer.emit(record)
+        return False
+
+class Tracer:
+    def __init__(self, script: str, mode: str = "trace", directory: str = TRACE_DIR):
+        self.script = script
+        self.mode = mode
+        self.directory = directory
+        self.started = datetime.now(UTC)
+        self.run_id = f"{script}-{self.started.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+        self.t0 = time.perf_counter()
+        self.records = []
+        self.written = 0      # spans déjà écrits par flush()
+        self.totals = Counter()
+        self._ids = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.profiler = None
+        if mode == "cprofile":
+            import cProfile
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def stack(self) -> list:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def next_id(self) -> int:
+        with self._lock:
+            self._ids += 1
+            return self._ids
+
+    def emit(self, record: dict):
+        with self._lock:
+            self.records.append(record)
+
+    def count(self, name: str, n: int | float = 1):
+        with self._lock:
+            self.totals[name] += n
+        stack = self.stack()
+        if stack:
+            top = stack[-1]
+            if top.counters is None:
+                top.counters = Counter()
+            top.counters[name] += n
+
+    def _append(self, records: list) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{datetime.now(UTC).strftime('%Y-%m-%d')}.jsonl")
+        with open(path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return path
+
+    def flush(self) -> str | None:
+        """
+        Écrit les spans terminés sans attendre la fin du process (démon) : la mémoire
+        reste bornée et "summary" voit les cycles au fil de l'eau.
+        """
+        with self._lock:
+            records, self.records = self.records, []
+        if not records:
+            return None
+        self.written += len(records)
+        return self._append(records)
+
+    def finish(self) -> str:
+        """
+        Écrit les spans et le bilan de l'exécution dans <dossier>/<jour>.jsonl (ajout).
+        """
+        profile_path = None
+        if self.profiler is not None:
+            self.profiler.disable()
+            os.makedirs(self.directory, exist_ok=True)
+            profile_path = os.path.join(self.directory, f"{self.run_id}.prof")
+            self.profiler.dump_stats(profile_path)
+        run = {"type": "run", "run": self.run_id, "script": self.script,
+               "started": self.started.isoformat(timespec="seconds"),
+               "ms": round((time.perf_counter() - self.t0) * 1000, 3),
+               "argv": sys.argv[1:], "counters": dict(self.totals),
+               "spans": self.written + len(self.records)}
+        if profile_path:
+            run["profile"] = profile_path
+        self.written += len(self.records)
+        return self._append(self.records + [run])
+
+# --------- API des scripts ---------
+
+def add_argument(parser: argparse.ArgumentParser):
+    parser.add_argument("--profile", nargs="?", const="trace", choices=MODES, default=None,
+                        help="Trace JSONL des étapes (.cache/traces/) ; cprofile = + profil cProfile")
+
+def start(script: str, mode: str | None = None) -> bool:
+    """
+    Active la trace si mode (ou RADAR_PROFILE) le demande ; écrite automatiquement à la sortie.
+    """
+    global _tracer
+    mode = mode or ("trace" if PROFILE_MODE == "1" else PROFILE_MODE)
+    if _tracer is not None or mode not in MODES:
+        return _tracer is not None
+    _tracer = Tracer(script, mode)
+    atexit.register(finish)
+    return True
+
+def finish():
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is None:
+        return
+    path = tracer.finish()
+    print(f"🧭 Trace : {tracer.written} span(s) ajouté(s) à {path}"
+          + (f", profil {tracer.run_id}.prof" if tracer.profiler else ""))
+
+def flush():
+    if _tracer is not None:
+        _tracer.flush()
+
+def enabled() -> bool:
+    return _tracer is not None
+
+def span(name: str, **attrs):
+    """
+    with tracing.span("render", date=d): ...  — imbriquable, par thread.
+    """
+    if _tracer is None:
+        return _NULL
+    return _Span(_tracer, name, attrs)
+
+def count(name: str, n: int | float = 1):
+    if _tracer is not None:
+        _tracer.count(name, n)
+
+def count_file(name: str, path: str):
+    # Octets écrits : taille du fichier produit (ignoré s'il n'existe pas)
+    if _tracer is not None:
+        try:
+            _tracer.count(name, os.path.getsize(path))
+        except OSError:
+            pass
+
+def traced(name: str | None = None):
+    """
+    Décorateur : un span par appel de la fonction.
+    """
+    def wrap(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with span(label):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+# --------- Agrégation ---------
+
+def trace_files(directory: str = TRACE_DIR, days: int = 7, until: str | None = None) -> list[str]:
+    end = date.fromisoformat(until) if until else datetime.now(UTC).date()
+    names = [(end - timedelta(days=i)).isoformat() + ".jsonl" for i in range(days)]
+    return [os.path.join(directory, n) for n in reversed(names) if os.path.isfile(os.path.join(directory, n))]
+
+def iter_records(paths):
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue   # ligne tronquée (exécution interrompue)
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+def aggregate(records, script: str | None = None) -> dict:
+    """
+    {"runs": {script: [ms...]}, "spans": {(script, nom): [ms...]}, "counters": {script: Counter}}
+    """
+    runs, spans, counters = defaultdict(list), defaultdict(list), defaultdict(Counter)
+    for r in records:
+        if script and r.get("script") != script:
+            continue
+        if r.get("type") == "run":
+            runs[r["script"]].append(r["ms"])
+            counters[r["script"]].update(r.get("counters", {}))
+        elif r.get("type") == "span":
+            spans[(r["script"], r["name"])].append(r["ms"])
+    return {"runs": runs, "spans": spans, "counters": counters}
+
+def main():
+    p = argparse.ArgumentParser(description="Agrégation des traces FPL Radar (.cache/traces/*.jsonl).")
+    p.add_argument("--dir", default=TRACE_DIR, help="Dossier des traces")
+    sub = p.add_subparsers(dest="command", required=True)
+    s = sub.add_parser("summary", help="Durées par script et par étape sur plusieurs jours")
+    s.add_argument("--days", "-d", type=int, default=7, help="Nombre de jours (fichiers) agrégés")
+    s.add_argument("--until", help="Dernier jour inclus (YYYY-MM-DD, défaut : aujourd'hui)")
+    s.add_argument("--script", help="Limiter à un script")
+    args = p.parse_args()
+
+    paths = trace_files(args.dir, args.days, args.until)
+    if not paths:
+        print(f"ℹ️ Aucune trace dans {args.dir} sur {args.days} jour(s).")
+        return
+    agg = aggregate(iter_records(paths), args.script)
+    print(f"🧭 {len(paths)} fichier(s) de trace, {sum(len(v) for v in agg['runs'].values())} exécution(s)")
+    for script in sorted(agg["runs"]):
+        ms = agg["runs"][script]
+        print(f"\n{script} : {len(ms)} exécution(s), moyenne {sum(ms) / len(ms) / 1000:.2f} s, "
+              f"max {max(ms) / 1000:.2f} s")
+        rows = sorted(((name, v) for (s_, name), v in agg["spans"].items() if s_ == script),
+                      key=lambda row: -sum(row[1]))
+        for name, v in rows:
+            print(f"   {name:<28} {len(v):>5} ×  total {sum(v) / 1000:8.2f} s  "
+                  f"p50 {percentile(v, 0.5):8.1f} ms  p95 {percentile(v, 0.95):8.1f} ms")
+        for name, n in sorted(agg["counters"][script].items()):
+            print(f"   # {name:<26} {n:>12,.0f}")
+
+if __name__ == "__main__":
+    main()
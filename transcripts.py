@@ -0,0 +1,272 @@
+# transcripts.py
+# Transcriptions des vidéos pour les résumés :
+# - fournisseurs interchangeables : youtube-transcript-api (optionnel) ou fichiers locaux (tests),
+# - cache disque compressé (gzip) adressé par contenu, indexé par video id : une transcription
+#   n'est téléchargée qu'une seule fois, jamais à chaque exécution (absences mémorisées aussi),
+# - résumé en flux : seules les premières phrases sont lues, en mémoire bornée.
+# Usage :
+#   python transcripts.py fetch VIDEO_ID [...]
+#   python transcripts.py show VIDEO_ID
+#   python transcripts.py stats
+
+import os
+import re
+import sys
+import gzip
+import json
+import time
+import hashlib
+import argparse
+
+TRANSCRIPTS_DIR = os.getenv("TRANSCRIPTS_DIR", os.path.join("data", "transcripts"))
+TRANSCRIPT_PROVIDER = os.getenv("TRANSCRIPT_PROVIDER", "youtube")          # youtube | fixture
+TRANSCRIPT_FIXTURES = os.getenv("TRANSCRIPT_FIXTURES", os.path.join("data", "transcript_fixtures"))
+TRANSCRIPT_LANGS = [l.strip() for l in os.getenv("TRANSCRIPT_LANGS", "fr,en").split(",") if l.strip()]
+TRANSCRIPT_RETRY_S = float(os.getenv("TRANSCRIPT_RETRY_S", 7 * 24 * 3600))  # "pas de transcription" revérifié après
+
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+SUMMARY_SENTENCES = 3
+SUMMARY_MAX_CHARS = 2000
+
+class TranscriptUnavailable(Exception):
+    """
+    Pas de transcription pour cette vidéo (désactivée, inexistante) : mémorisé dans l'index.
+    Les autres erreurs (réseau, blocage) ne sont pas mémorisées et seront retentées.
+    """
+
+# --------- Fournisseurs ---------
+# fetch(video_id) -> (langue, segments de texte) ; lève TranscriptUnavailable si absente.
+
+class YouTubeProvider:
+    name = "youtube"
+    # Noms des exceptions "définitives" de youtube-transcript-api (stables entre versions)
+    UNAVAILABLE = {"NoTranscriptFound", "NoTranscriptAvailable", "TranscriptsDisabled",
+                   "VideoUnavailable", "VideoUnplayable", "InvalidVideoId", "AgeRestricted"}
+
+    def __init__(self, languages: list[str] = TRANSCRIPT_LANGS):
+        try:
+            from youtube_transcript_api import YouTubeTranscriptApi
+        except ImportError:
+            raise RuntimeError("youtube-transcript-api n'est pas installé (pip install youtube-transcript-api)")
+        self.api = YouTubeTranscriptApi
+        self.languages = languages
+
+    def fetch(self, video_id: str):
+        try:
+            if hasattr(self.api, "get_transcript"):
+                # API < 1.0 : liste de dicts
+                items = self.api.get_transcript(video_id, languages=self.languages)
+                return None, (item["text"] for item in items)
+            fetched = self.api().fetch(video_id, languages=self.languages)
+            return getattr(fetched, "language_code", None), (snippet.text for snippet in fetched)
+        except Exception as e:
+            if type(e).__name__ in self.UNAVAILABLE:
+                raise TranscriptUnavailable(type(e).__name__) from e
+            raise
+
+class FixtureProvider:
+    """
+    Transcriptions locales : <dossier>/<video_id>.txt (une ligne par segment). Pour les tests.
+    """
+    name = "fixture"
+
+    def __init__(self, directory: str = TRANSCRIPT_FIXTURES):
+        self.directory = directory
+
+    def fetch(self, video_id: str):
+        path = os.path.join(self.directory, f"{video_id}.txt")
+        if not os.path.isfile(path):
+            raise TranscriptUnavailable("fixture absente")
+
+        def lines():
+            with open(path, encoding="utf-8") as f:
+                yield from f
+        return None, lines()
+
+PROVIDERS = {"youtube": YouTubeProvider, "fixture": FixtureProvider}
+
+def get_provider(name: str = TRANSCRIPT_PROVIDER):
+    if name not in PROVIDERS:
+        raise ValueError(f"Fournisseur de transcriptions inconnu : {name} ({', '.join(PROVIDERS)})")
+    return PROVIDERS[name]()
+
+# --------- Cache ---------
+
+class TranscriptStore:
+    """
+    <dossier>/<sha256>.txt.gz : texte (un segment par ligne), nommé d'après son contenu.
+    <dossier>/index.json : {video_id: {"sha", "provider", "lang", "at"} | {"missing", "provider", "at"}}.
+    """
+    def __init__(self, directory: str = TRANSCRIPTS_DIR, provider=None, retry_s: float = TRANSCRIPT_RETRY_S):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.index_file = os.path.join(directory, "index.json")
+        self._provider = provider
+        self.retry_s = retry_s
+        self.hits = 0
+        self.fetched = 0
+        self.missing = 0
+        self.errors = 0
+        try:
+            with open(self.index_file, encoding="utf-8") as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+
+    @property
+    def provider(self):
+        # Créé au premier téléchargement : un cache complet ne demande pas le paquet optionnel
+        if self._provider is None:
+            self._provider = get_provider()
+        return self._provider
+
+    def blob_path(self, sha: str) -> str:
+        return os.path.join(self.directory, f"{sha}.txt.gz")
+
+    def _write_blob(self, segments) -> str:
+        # Écriture en flux (jamais tout le texte en mémoire), hash calculé au passage
+        h = hashlib.sha256()
+        tmp = os.path.join(self.directory, f".tmp-{os.getpid()}.txt.gz")
+        try:
+            with open(tmp, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as gz:
+                for seg in segments:
+                    line = " ".join(str(seg).split())
+                    if not line:
+                        continue
+                    data = (line + "\n").encode("utf-8")
+                    h.update(data)
+                    gz.write(data)
+        except BaseException:
+            os.remove(tmp)   # segments interrompus (réseau...) : rien n'est mis en cache
+            raise
+        sha = h.hexdigest()
+        if os.path.isfile(self.blob_path(sha)):
+            os.remove(tmp)   # contenu déjà connu (autre vidéo, re-téléchargement)
+        else:
+            os.replace(tmp, self.blob_path(sha))
+        return sha
+
+    def ensure(self, video_id: str) -> str | None:
+        """
+        sha de la transcription de video_id, téléchargée seulement si jamais vue ; None sinon.
+        """
+        if not video_id:
+            return None
+        entry = self.index.get(video_id)
+        if entry and entry.get("sha") and os.path.isfile(self.blob_path(entry["sha"])):
+            self.hits += 1
+            return entry["sha"]
+        if entry and entry.get("missing") and time.time() - entry.get("at", 0) < self.retry_s:
+            self.hits += 1
+            return None
+        try:
+            lang, segments = self.provider.fetch(video_id)
+            sha = self._write_blob(segments)
+        except TranscriptUnavailable as e:
+            self.missing += 1
+            self.index[video_id] = {"missing": str(e), "provider": self.provider.name, "at": time.time()}
+            return None
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️ Transcription {video_id} indisponible pour l'instant : {e}")
+            return None
+        self.fetched += 1
+        self.index[video_id] = {"sha": sha, "provider": self.provider.name, "lang": lang, "at": time.time()}
+        return sha
+
+    def segments(self, video_id: str):
+        """
+        Segments de la transcription (lecture gzip en flux), None si aucune.
+        """
+        sha = self.ensure(video_id)
+        if sha is None:
+            return None
+
+        def lines():
+            with gzip.open(self.blob_path(sha), "rt", encoding="utf-8") as f:
+                for line in f:
+                    yield line.rstrip("\n")
+        return lines()
+
+    def save(self):
+        tmp = self.index_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(dict(sorted(self.index.items())), f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.index_file)
+
+    def stats(self) -> dict:
+        blobs = [n for n in os.listdir(self.directory) if n.endswith(".txt.gz") and not n.startswith(".")]
+        return {"videos": sum(1 for e in self.index.values() if e.get("sha")),
+                "missing": sum(1 for e in self.index.values() if e.get("missing")),
+                "blobs": len(blobs),
+                "bytes": sum(os.path.getsize(os.path.join(self.directory, n)) for n in blobs)}
+
+    def stats_line(self) -> str:
+        return (f"📜 Transcriptions : {self.hits} en cache, {self.fetched} téléchargée(s), "
+                f"{self.missing} absente(s), {self.errors} erreur(s)")
+
+# --------- Résumé en flux ---------
+
+def summarize_segments(segments, max_sentences: int = SUMMARY_SENTENCES,
+                       max_chars: int = SUMMARY_MAX_CHARS) -> str | None:
+    """
+    Premières phrases du texte (même règle que l'ancien résumé : max_chars premiers caractères,
+    max_sentences phrases, "..." s'il y en a d'autres). La lecture s'arrête dès que le
+    résultat est connu : mémoire bornée par max_chars, quelle que soit la durée de la vidéo.
+    """
+    text = ""
+    for seg in segments:
+        seg = " ".join(seg.split())
+        if not seg:
+            continue
+        text = f"{text} {seg}" if text else seg
+        if len(text) >= max_chars:
+            text = text[:max_chars]
+            break
+        if len(SENTENCE_SPLIT.split(text, maxsplit=max_sentences)) > max_sentences:
+            break
+    if not text:
+        return None
+    sentences = SENTENCE_SPLIT.split(text, maxsplit=max_sentences)
+    summary = " ".join(sentences[:max_sentences]).strip()
+    return summary + (" ..." if len(sentences) > max_sentences else "")
+
+# --------- CLI ---------
+
+def main():
+    p = argparse.ArgumentParser(description="Cache des transcriptions YouTube.")
+    p.add_argument("--dir", default=TRANSCRIPTS_DIR, help="Dossier du cache")
+    p.add_argument("--provider", default=TRANSCRIPT_PROVIDER, choices=sorted(PROVIDERS))
+    sub = p.add_subparsers(dest="command", required=True)
+    f = sub.add_parser("fetch", help="Mettre en cache les transcriptions (une seule fois par vidéo)")
+    f.add_argument("video_ids", nargs="+")
+    s = sub.add_parser("show", help="Afficher le résumé d'une transcription")
+    s.add_argument("video_id")
+    s.add_argument("--full", action="store_true", help="Afficher tout le texte")
+    sub.add_parser("stats", help="Taille du cache")
+    args = p.parse_args()
+
+    store = TranscriptStore(args.dir, provider=None if args.command == "stats" else get_provider(args.provider))
+    if args.command == "fetch":
+        for vid in args.video_ids:
+            print(f"{vid} : {'✅' if store.ensure(vid) else '—'}")
+        store.save()
+        print(store.stats_line())
+    elif args.command == "show":
+        segments = store.segments(args.video_id)
+        store.save()
+        if segments is None:
+            print("❌ Pas de transcription.")
+            sys.exit(1)
+        if args.full:
+            for line in segments:
+                print(line)
+        else:
+            print(summarize_segments(segments))
+    else:
+        st = store.stats()
+        print(f"📜 {st['videos']} transcription(s) ({st['blobs']} fichier(s), {st['bytes'] / 1024:.1f} Ko), "
+              f"{st['missing']} vidéo(s) sans transcription")
+
+if __name__ == "__main__":
+    main()
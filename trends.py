@@ -0,0 +1,158 @@
+# trends.py
+# Tendances FPL : compteurs par jour (étiquettes et joueurs cités dans les titres) dans
+# data/trends.json, mis à jour à chaque nouvelle vidéo (coût O(nouvelles vidéos)).
+# Fenêtres glissantes 7 / 28 jours calculées sur les seuls compteurs journaliers,
+# classement des termes en hausse, ligne "Tendances du jour" du script social.
+# Usage : python trends.py [--date 2025-09-07] [--rebuild]
+
+import os
+import json
+import argparse
+from collections import Counter
+from datetime import date, datetime, timedelta, UTC
+
+from fpl_tags import extract_players, extract_tags
+
+TRENDS_PATH = os.getenv("TRENDS_PATH", os.path.join("data", "trends.json"))
+RETENTION_DAYS = 90     # compteurs journaliers conservés
+SHORT_WINDOW = 7
+LONG_WINDOW = 28
+# Mots de format présents dans presque tous les titres : comptés, jamais classés
+GENERIC_TAGS = {"Tips", "Team Selection", "Team", "Selection", "Picks", "Draft"}
+
+def day_offset(day: str, delta: int) -> str:
+    return (date.fromisoformat(day) + timedelta(days=delta)).isoformat()
+
+def video_terms(title: str) -> dict:
+    return {"tag": extract_tags(title), "player": extract_players(title)}
+
+def rankable(kind: str, term: str) -> bool:
+    # Les GWxx changent chaque semaine et les mots de format sont partout
+    return kind != "tag" or not (term.startswith("GW") or term in GENERIC_TAGS)
+
+class TrendStore:
+    """
+    days : {"YYYY-MM-DD": {"tag": {terme: n}, "player": {nom: n}}} (jour de publication)
+    seen : {clé vidéo: jour} pour ne compter une vidéo qu'une fois (même avec --reprocess).
+    """
+    def __init__(self, path: str = TRENDS_PATH, retention_days: int = RETENTION_DAYS):
+        self.path = path
+        self.retention_days = retention_days
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        self.days = data.get("days", {})
+        self.seen = data.get("seen", {})
+        self.added = 0
+
+    def exists(self) -> bool:
+        return os.path.isfile(self.path)
+
+    def add_video(self, key: str, published: str, title: str) -> bool:
+        if not key or key in self.seen:
+            return False
+        self.seen[key] = published
+        counters = self.days.setdefault(published, {})
+        for kind, terms in video_terms(title).items():
+            bucket = counters.setdefault(kind, {})
+            for term in terms:
+                bucket[term] = bucket.get(term, 0) + 1
+        self.added += 1
+        return True
+
+    def save(self):
+        # Purge au-delà de la rétention : le fichier reste de taille bornée
+        if self.days:
+            cutoff = day_offset(max(self.days), -self.retention_days)
+            self.days = {d: c for d, c in self.days.items() if d > cutoff}
+            self.seen = {k: d for k, d in self.seen.items() if d > cutoff}
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"days": dict(sorted(self.days.items())), "seen": self.seen}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.path)
+
+    def window(self, end_day: str, days: int) -> Counter:
+        """
+        Totaux des `days` jours qui finissent à end_day (inclus).
+        """
+        total = Counter()
+        for i in range(days):
+            for kind, bucket in self.days.get(day_offset(end_day, -i), {}).items():
+                total.update({(kind, term): n for term, n in bucket.items()})
+        return total
+
+    def rising(self, end_day: str, short: int = SHORT_WINDOW, long: int = LONG_WINDOW,
+               limit: int = 5, min_count: int = 1) -> list[dict]:
+        """
+        Termes dont la fréquence récente (short jours) dépasse celle des jours précédents
+        de la fenêtre longue. Score = taux récent / taux de base, lissés (+1).
+        """
+        recent = self.window(end_day, short)
+        base = self.window(day_offset(end_day, -short), long - short)
+        ranked = []
+        for (kind, term), n in recent.items():
+            if n < min_count or not rankable(kind, term):
+                continue
+            score = ((n + 1) / short) / ((base[(kind, term)] + 1) / (long - short))
+            ranked.append({"term": term, "kind": kind, "recent": n, "base": base[(kind, term)],
+                           "score": round(score, 2)})
+        ranked.sort(key=lambda r: (-r["score"], -r["recent"], r["term"]))
+        return ranked[:limit]
+
+    def social_line(self, end_day: str, n: int = 3) -> str | None:
+        """
+        "Tendances du jour : A, B et C à surveiller." — termes en hausse, complétés par
+        les plus cités de la fenêtre longue ; None sans données.
+        """
+        terms = [r["term"] for r in self.rising(end_day, limit=n) if r["score"] > 1]
+        if len(terms) < n:
+            for (kind, term), _ in self.window(end_day, LONG_WINDOW).most_common():
+                if len(terms) >= n:
+                    break
+                if term not in terms and rankable(kind, term):
+                    terms.append(term)
+        if not terms:
+            return None
+        text = terms[0] if len(terms) == 1 else ", ".join(terms[:-1]) + " et " + terms[-1]
+        return f"Tendances du jour : {text} à surveiller."
+
+    def rebuild_from_archive(self, archive) -> int:
+        """
+        Reconstruction (une seule fois) depuis les vidéos uniques de l'archive.
+        """
+        videos, _ = archive.load()
+        for rec in videos.values():
+            self.add_video(rec.get("u") or rec["t"], rec["p"], rec["t"])
+        return self.added
+
+def main():
+    p = argparse.ArgumentParser(description="Tendances FPL (étiquettes et joueurs en hausse).")
+    p.add_argument("--date", default=datetime.now(UTC).strftime("%Y-%m-%d"), help="Dernier jour de la fenêtre")
+    p.add_argument("--short", type=int, default=SHORT_WINDOW, help="Fenêtre récente (jours)")
+    p.add_argument("--long", type=int, default=LONG_WINDOW, help="Fenêtre de référence (jours)")
+    p.add_argument("--limit", "-n", type=int, default=10, help="Nombre de termes affichés")
+    p.add_argument("--rebuild", action="store_true", help="Recalculer depuis l'archive (archive_store.py)")
+    args = p.parse_args()
+
+    store = TrendStore()
+    if args.rebuild:
+        from archive_store import ArchiveStore
+        store.days, store.seen = {}, {}
+        print(f"🔁 {store.rebuild_from_archive(ArchiveStore())} vidéo(s) relue(s) depuis l'archive")
+        store.save()
+    rows = store.rising(args.date, args.short, args.long, args.limit)
+    print(f"📈 Termes en hausse au {args.date} ({args.short} j vs {args.long} j) :")
+    for r in rows:
+        print(f"   {r['term']:<20} {r['kind']:<7} {r['recent']:>3} récent(s) / {r['base']:>3} avant  x{r['score']}")
+    if not rows:
+        print("   (aucun)")
+    line = store.social_line(args.date)
+    if line:
+        print(f"📱 {line}")
+
+if __name__ == "__main__":
+    main()
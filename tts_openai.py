@@ -3,18 +3,25 @@
 # Entrée : fichier markdown (script social)
 # Sortie : fichier MP3 dans social_audio/<date>/
 
-import os, sys, re, requests
+import os, re, shutil, argparse
+from concurrent.futures import ThreadPoolExecutor
 
-API_KEY = os.getenv("OPENAI_API_KEY")
-if not API_KEY:
-    print("❌ Variable OPENAI_API_KEY manquante.")
-    print("   PowerShell : $env:OPENAI_API_KEY = 'sk-...'")
-    sys.exit(1)
+import openai_client
+import tracing
+from disk_cache import content_key
 
-API_URL = "https://api.openai.com/v1/audio/speech"
+API_PATH = "/audio/speech"
 MODEL = "gpt-4o-mini-tts"   # modèle TTS
 VOICE = "alloy"             # voix (ex: alloy, verse, echo)
 FORMAT = "mp3"
+CHUNK_CHARS = 600           # taille max d'un morceau en mode --chunked
+CHUNK_WORKERS = 4           # morceaux synthétisés en parallèle
+
+# Style: accent britannique, voix masculine, chaleureuse
+STYLE_PROMPT = (
+    "Read this like a warm, natural British male voice. "
+    "Conversational tone, flowing speech, no blanks or awkward pauses."
+)
 
 def clean_markdown(path: str) -> str:
     if not os.path.isfile(path):
@@ -31,50 +38,161 @@ def clean_markdown(path: str) -> str:
     raw = re.sub(r"\\s+", " ", raw).strip()
     return raw
 
+def speech_payload(text: str) -> dict:
+    # Même requête dans les deux modes : le style va dans "instructions", jamais lu à voix haute
+    return {
+        "model": MODEL,
+        "voice": VOICE,
+        "input": text,
+        "instructions": STYLE_PROMPT,
+        "format": FORMAT,
+    }
+
 def generate_tts(in_file: str, out_file: str):
     text = clean_markdown(in_file)
     if not text:
         print("❌ Script social vide ou introuvable.")
         return
 
-    # Style: accent britannique, voix masculine, chaleureuse
-    style_prompt = (
-        "Read this like a warm, natural British male voice. "
-        "Conversational tone, flowing speech, no blanks or awkward pauses."
-    )
-    payload = {
-        "model": MODEL,
-        "voice": VOICE,
-        "input": style_prompt + " " + text,
-        "format": FORMAT,
-    }
-    headers = {
-        "Authorization": f"Bearer {API_KEY}",
-        "Content-Type": "application/json",
-    }
-
+    payload = speech_payload(text)
     print(f"🎙️ Génération TTS avec modèle={MODEL}, voix={VOICE}...")
-    r = requests.post(API_URL, headers=headers, json=payload, stream=True)
+    with tracing.span("tts.request", chars=len(text)):
+        try:
+            r = openai_client.post(API_PATH, payload, stream=True)
+        except (RuntimeError, openai_client.ApiError) as e:
+            print(f"❌ Erreur API : {e}")
+            return
 
-    if r.status_code != 200:
-        print(f"❌ Erreur API {r.status_code}: {r.text}")
-        return
+        os.makedirs(os.path.dirname(out_file) or ".", exist_ok=True)
+        with open(out_file, "wb") as f:
+            for chunk in openai_client.iter_content(r):
+                f.write(chunk)
+    tracing.count_file("bytes_written", out_file)
 
-    os.makedirs(os.path.dirname(out_file), exist_ok=True)
-    with open(out_file, "wb") as f:
-        for chunk in r.iter_content(chunk_size=8192):
-            if chunk:
+    print(f"✅ Fichier audio généré : {out_file}")
+    print(openai_client.METRICS.summary_line())
+
+# --------- Mode découpé (--chunked) ---------
+
+def split_sentences(text: str) -> list[str]:
+    return [p for p in re.split(r"(?<=[.!?…])\s+", text) if p.strip()]
+
+def make_chunks(text: str, max_chars: int = CHUNK_CHARS) -> list[str]:
+    """
+    Regroupe les phrases en morceaux d'au plus max_chars caractères.
+    Une phrase trop longue est coupée sur les espaces.
+    """
+    chunks = []
+    cur = ""
+    for sentence in split_sentences(text):
+        pieces = [sentence]
+        if len(sentence) > max_chars:
+            pieces, piece = [], ""
+            for word in sentence.split():
+                if piece and len(piece) + 1 + len(word) > max_chars:
+                    pieces.append(piece)
+                    piece = word
+                else:
+                    piece = f"{piece} {word}".strip()
+            if piece:
+                pieces.append(piece)
+        for piece in pieces:
+            if cur and len(cur) + 1 + len(piece) > max_chars:
+                chunks.append(cur)
+                cur = piece
+            else:
+                cur = f"{cur} {piece}".strip()
+    if cur:
+        chunks.append(cur)
+    return chunks
+
+def strip_id3(data: bytes) -> bytes:
+    # Retire un éventuel tag ID3v2 en tête (seul le premier morceau garde le sien)
+    if len(data) >= 10 and data[:3] == b"ID3":
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        return data[10 + size:]
+    return data
+
+def synthesize_chunk(text: str, part_path: str) -> str:
+    """
+    Synthétise un morceau vers part_path (écriture atomique : un fichier présent est complet).
+    """
+    payload = speech_payload(text)
+    with tracing.span("tts.chunk", chars=len(text)):
+        r = openai_client.post(API_PATH, payload, stream=True)
+        tmp = part_path + ".tmp"
+        with open(tmp, "wb") as f:
+            for chunk in openai_client.iter_content(r):
                 f.write(chunk)
+        os.replace(tmp, part_path)
+    tracing.count("tts.chunks")
+    return part_path
+
+def generate_tts_chunked(in_file: str, out_file: str, max_chars: int = CHUNK_CHARS, workers: int = CHUNK_WORKERS):
+    """
+    Découpe le texte aux frontières de phrases, synthétise les morceaux en parallèle,
+    puis les assemble dans l'ordre (concaténation des trames MP3, sans ré-encodage).
+    Les morceaux déjà présents dans <out_file>.parts/ sont réutilisés (reprise).
+    """
+    text = clean_markdown(in_file)
+    if not text:
+        print("❌ Script social vide ou introuvable.")
+        return
 
+    chunks = make_chunks(text, max_chars)
+    parts_dir = out_file + ".parts"
+    os.makedirs(parts_dir, exist_ok=True)
+    parts = [os.path.join(parts_dir, f"{i:03d}_{content_key(c, MODEL, VOICE, STYLE_PROMPT)[:12]}.{FORMAT}")
+             for i, c in enumerate(chunks)]
+    todo = [i for i, p in enumerate(parts) if not os.path.isfile(p)]
+    print(f"🎙️ TTS découpé : {len(chunks)} morceau(x), {len(chunks) - len(todo)} déjà prêt(s), "
+          f"modèle={MODEL}, voix={VOICE}")
+
+    failed = False
+    tmp_out = out_file + ".tmp"
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool, open(tmp_out, "wb") as out:
+        futures = {i: pool.submit(synthesize_chunk, chunks[i], parts[i]) for i in todo}
+        # Écriture en flux, dans l'ordre, au fur et à mesure que les morceaux arrivent
+        for i, part in enumerate(parts):
+            if i in futures:
+                try:
+                    futures[i].result()
+                except Exception as e:
+                    print(f"❌ Morceau {i + 1}/{len(parts)} : {e}")
+                    failed = True
+            if failed:
+                continue
+            with open(part, "rb") as f:
+                data = f.read()
+            out.write(data if i == 0 else strip_id3(data))
+
+    if failed:
+        os.remove(tmp_out)
+        print(f"⚠️ Génération incomplète : relance la même commande pour reprendre ({parts_dir}).")
+        print(openai_client.METRICS.summary_line())
+        return
+    os.replace(tmp_out, out_file)
+    tracing.count_file("bytes_written", out_file)
+    shutil.rmtree(parts_dir, ignore_errors=True)
     print(f"✅ Fichier audio généré : {out_file}")
+    print(openai_client.METRICS.summary_line())
 
 def main():
-    if len(sys.argv) != 3:
-        print("Usage: python tts_openai.py <script_social.md> <out_file.mp3>")
-        sys.exit(1)
-    in_file = sys.argv[1]
-    out_file = sys.argv[2]
-    generate_tts(in_file, out_file)
+    p = argparse.ArgumentParser(description="Voix off OpenAI depuis le script social.")
+    p.add_argument("in_file", help="Script social (.md)")
+    p.add_argument("out_file", help="Fichier audio de sortie (.mp3)")
+    p.add_argument("--chunked", action="store_true",
+                   help="Découper par phrases et synthétiser les morceaux en parallèle (reprise possible)")
+    p.add_argument("--chunk-chars", type=int, default=CHUNK_CHARS, help="Taille max d'un morceau (caractères)")
+    p.add_argument("--workers", "-w", type=int, default=CHUNK_WORKERS, help="Morceaux synthétisés en parallèle")
+    tracing.add_argument(p)
+    args = p.parse_args()
+    openai_client.require_api_key()
+    tracing.start("tts_openai", args.profile)
+    if args.chunked:
+        generate_tts_chunked(args.in_file, args.out_file, args.chunk_chars, args.workers)
+    else:
+        generate_tts(args.in_file, args.out_file)
 
 if __name__ == "__main__":
     main()
@@ -1,12 +1,18 @@
 # tts_pyttsx3.py
 # Génère une voix off locale avec pyttsx3
 # Amélioré : paramètres rate, volume, gentle pauses
+# Mode --segments : une phrase = un WAV en cache, seules les phrases modifiées
+# sont re-synthétisées, puis assemblage PCM (module wave, sans ré-encodage).
 
-import os, sys, re, pyttsx3
+import os, sys, re, json, wave, shutil, tempfile
 
-def clean_markdown(path: str, gentle: bool = False) -> str:
+import tracing
+from audio_cache import AudioCache
+from disk_cache import cache_dir
+
+def clean_lines(path: str, gentle: bool = False) -> list[str]:
     if not os.path.isfile(path):
-        return ""
+        return []
     lines = []
     with open(path, encoding="utf-8") as f:
         for line in f:
@@ -19,7 +25,10 @@ def clean_markdown(path: str, gentle: bool = False) -> str:
                     lines.append(line + ". ")
                 else:
                     lines.append(line)
-    text = " ".join(lines)
+    return lines
+
+def clean_markdown(path: str, gentle: bool = False) -> str:
+    text = " ".join(clean_lines(path, gentle))
     text = re.sub(r"\s+", " ", text).strip()
     return text
 
@@ -53,17 +62,9 @@ def choose_voice_forced(voices, selector: str):
             return v.id
     return None
 
-def generate_tts(in_file: str, out_file: str,
-                 voice_selector: str | None = None,
-                 rate: int = 150, volume: float = 1.0,
-                 gentle: bool = True):
-    text = clean_markdown(in_file, gentle=gentle)
-    if not text:
-        print("❌ Script social vide ou introuvable.")
-        return
-
-    os.makedirs(os.path.dirname(out_file), exist_ok=True)
-
+@tracing.traced("tts.engine_init")
+def init_engine(voice_selector: str | None, rate: int, volume: float):
+    import pyttsx3   # chargé seulement si une synthèse est nécessaire (cache manquant)
     engine = pyttsx3.init()
     engine.setProperty("rate", rate)
     engine.setProperty("volume", volume)
@@ -80,24 +81,144 @@ def generate_tts(in_file: str, out_file: str,
         print(f"🎙️ Voix sélectionnée : {voice_id}")
     else:
         print("⚠️ Aucune voix spécifique trouvée, utilisation par défaut.")
+    return engine
 
-    engine.save_to_file(text, out_file)
-    engine.runAndWait()
+def generate_tts(in_file: str, out_file: str,
+                 voice_selector: str | None = None,
+                 rate: int = 150, volume: float = 1.0,
+                 gentle: bool = True, cache: AudioCache | None = None, engine=None):
+    """
+    engine : moteur déjà initialisé par init_engine (mode démon), réutilisé tel quel.
+    """
+    text = clean_markdown(in_file, gentle=gentle)
+    if not text:
+        print("❌ Script social vide ou introuvable.")
+        return
+
+    os.makedirs(os.path.dirname(out_file) or ".", exist_ok=True)
+
+    # Script identique (texte + réglages) : réutilise le WAV sans lancer le moteur
+    cache = cache or AudioCache()
+    key = AudioCache.key(text, voice_selector, rate, volume, gentle)
+    if cache.fetch_into(key, out_file):
+        print(f"✅ Fichier audio (cache) : {out_file}")
+        return
+
+    engine = engine or init_engine(voice_selector, rate, volume)
+    with tracing.span("tts.synthesis", chars=len(text)):
+        engine.save_to_file(text, out_file)
+        engine.runAndWait()
+    tracing.count_file("bytes_written", out_file)
+    if os.path.isfile(out_file):
+        cache.store(key, out_file)
+        cache.evict()
     print(f"✅ Fichier audio généré : {out_file}")
 
-def main():
-    if len(sys.argv) < 3:
-        print("Usage: python tts_pyttsx3.py <script_social.md> <out_file.wav> [voice_selector] [rate] [volume] [gentle]")
-        sys.exit(1)
+# --------- Mode segments ---------
+
+def split_segments(lines: list[str]) -> list[str]:
+    # Une entrée par phrase (une ligne du script peut en contenir plusieurs)
+    segments = []
+    for line in lines:
+        for sentence in re.split(r"(?<=[.!?…])\s+", line):
+            sentence = re.sub(r"\s+", " ", sentence).strip()
+            if sentence:
+                segments.append(sentence)
+    return segments
+
+def concat_wavs(paths: list[str], out_file: str) -> list[float]:
+    """
+    Concatène des WAV de mêmes paramètres (trames PCM copiées telles quelles).
+    Renvoie la durée (s) de chaque segment.
+    """
+    durations = []
+    params = None
+    tmp = out_file + ".tmp"
+    with wave.open(tmp, "wb") as out:
+        for path in paths:
+            with wave.open(path, "rb") as w:
+                p = w.getparams()
+                if params is None:
+                    params = p
+                    out.setnchannels(p.nchannels)
+                    out.setsampwidth(p.sampwidth)
+                    out.setframerate(p.framerate)
+                elif (p.nchannels, p.sampwidth, p.framerate) != (params.nchannels, params.sampwidth, params.framerate):
+                    raise ValueError(f"Format WAV différent : {path}")
+                out.writeframes(w.readframes(p.nframes))
+                durations.append(p.nframes / p.framerate)
+    os.replace(tmp, out_file)
+    return durations
+
+def generate_tts_segments(in_file: str, out_file: str,
+                          voice_selector: str | None = None,
+                          rate: int = 150, volume: float = 1.0,
+                          gentle: bool = True, cache: AudioCache | None = None):
+    """
+    Synthèse phrase par phrase avec cache par segment, puis assemblage.
+    Écrit aussi <out_file>.segments.json (texte, début, durée) pour caler les slides.
+    """
+    segments = split_segments(clean_lines(in_file, gentle=gentle))
+    if not segments:
+        print("❌ Script social vide ou introuvable.")
+        return
 
-    in_file = sys.argv[1]
-    out_file = sys.argv[2]
-    voice_selector = sys.argv[3] if len(sys.argv) >= 4 else None
-    rate = int(sys.argv[4]) if len(sys.argv) >= 5 else 150
-    volume = float(sys.argv[5]) if len(sys.argv) >= 6 else 1.0
-    gentle = (len(sys.argv) >= 7 and sys.argv[6].lower() in ["1","true","yes","gentle"])
+    os.makedirs(os.path.dirname(out_file) or ".", exist_ok=True)
+    cache = cache or AudioCache(directory=cache_dir("audio_segments"))
+    keys = [AudioCache.key(seg, voice_selector, rate, volume, gentle) for seg in segments]
+    missing = {k: seg for k, seg in zip(keys, segments) if not os.path.isfile(cache.path(k))}
+    print(f"🧩 {len(segments)} segment(s), {len(missing)} à synthétiser.")
+
+    if missing:
+        engine = init_engine(voice_selector, rate, volume)
+        tmp_dir = tempfile.mkdtemp(prefix="tts_segments_")
+        try:
+            with tracing.span("tts.synthesis", segments=len(missing)):
+                for k, seg in missing.items():
+                    engine.save_to_file(seg, os.path.join(tmp_dir, f"{k}.wav"))
+                engine.runAndWait()  # un seul passage moteur pour tous les segments modifiés
+            tracing.count("tts.segments_synthesized", len(missing))
+            for k in missing:
+                cache.store(k, os.path.join(tmp_dir, f"{k}.wav"))
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    with tracing.span("tts.concat", segments=len(keys)):
+        durations = concat_wavs([cache.path(k) for k in keys], out_file)
+    tracing.count_file("bytes_written", out_file)
+    timeline, start = [], 0.0
+    for seg, d in zip(segments, durations):
+        timeline.append({"text": seg, "start": round(start, 3), "duration": round(d, 3)})
+        start += d
+    with open(out_file + ".segments.json", "w", encoding="utf-8") as f:
+        json.dump(timeline, f, ensure_ascii=False, indent=2)
+    for k in keys:
+        cache.touch(k)
+    cache.evict()
+    print(f"✅ Fichier audio généré : {out_file} ({start:.1f} s)")
 
-    generate_tts(in_file, out_file, voice_selector, rate, volume, gentle)
+def main():
+    flags = [a for a in sys.argv[1:] if a.startswith("--")]
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    segments = "--segments" in flags
+    if len(args) < 2:
+        print("Usage: python tts_pyttsx3.py <script_social.md> <out_file.wav> [voice_selector] [rate] [volume] [gentle] "
+              "[--segments] [--profile[=cprofile]]")
+        sys.exit(1)
+    profile = next((f.partition("=")[2] or "trace" for f in flags if f.split("=")[0] == "--profile"), None)
+    tracing.start("tts_pyttsx3", profile)
+
+    in_file = args[0]
+    out_file = args[1]
+    voice_selector = args[2] if len(args) >= 3 else None
+    rate = int(args[3]) if len(args) >= 4 else 150
+    volume = float(args[4]) if len(args) >= 5 else 1.0
+    gentle = (len(args) >= 6 and args[5].lower() in ["1","true","yes","gentle"])
+
+    if segments:
+        generate_tts_segments(in_file, out_file, voice_selector, rate, volume, gentle)
+    else:
+        generate_tts(in_file, out_file, voice_selector, rate, volume, gentle)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,115 @@
+# video_index.py
+# Index persistant (SQLite) des vidéos déjà vues et résumées, clé = yt_videoid.
+# Permet de ne traiter que les nouvelles vidéos à chaque exécution et de requêter
+# l'historique sans relire les Markdown de fpl_summaries/.
+# Usage : python video_index.py --channel UC... --since 2025-09-01
+
+import os
+import sqlite3
+import argparse
+from datetime import datetime, UTC
+
+INDEX_PATH = os.getenv("VIDEO_INDEX_PATH", os.path.join("data", "video_index.sqlite"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    video_id      TEXT PRIMARY KEY,
+    channel_id    TEXT NOT NULL,
+    title         TEXT,
+    url           TEXT,
+    published     TEXT,
+    first_seen    TEXT NOT NULL,
+    summary       TEXT,
+    summarized_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_videos_channel_published ON videos(channel_id, published);
+CREATE INDEX IF NOT EXISTS idx_videos_published ON videos(published);
+"""
+
+def video_key(video: dict) -> str | None:
+    # yt_videoid en priorité, sinon l'URL (flux atypiques)
+    return video.get("id") or video.get("url")
+
+class VideoIndex:
+    def __init__(self, path: str = INDEX_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def known_ids(self, ids: list[str]) -> set[str]:
+        ids = [i for i in ids if i]
+        if not ids:
+            return set()
+        marks = ",".join("?" * len(ids))
+        rows = self.conn.execute(
+            f"SELECT video_id FROM videos WHERE video_id IN ({marks}) AND summarized_at IS NOT NULL", ids)
+        return {r["video_id"] for r in rows}
+
+    def filter_new(self, videos: list[dict]) -> list[dict]:
+        """
+        Garde uniquement les vidéos jamais résumées.
+        """
+        known = self.known_ids([video_key(v) for v in videos])
+        return [v for v in videos if video_key(v) and video_key(v) not in known]
+
+    def record(self, channel_id: str, video: dict, summary: str, day: str):
+        """
+        Enregistre (ou met à jour) une vidéo et son résumé pour le jour `day`.
+        """
+        published = video["published_dt"].isoformat() if video.get("published_dt") else None
+        self.conn.execute(
+            """INSERT INTO videos (video_id, channel_id, title, url, published, first_seen, summary, summarized_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(video_id) DO UPDATE SET
+                   title = excluded.title, url = excluded.url, published = excluded.published,
+                   summary = excluded.summary, summarized_at = excluded.summarized_at""",
+            (video_key(video), channel_id, video.get("title"), video.get("url"), published,
+             day, summary, datetime.now(UTC).isoformat(timespec="seconds")))
+        self.conn.commit()
+
+    def videos_since(self, channel_id: str | None = None, since: str | None = None) -> list[dict]:
+        """
+        Vidéos (les plus récentes d'abord), filtrées par chaîne et/ou date de publication >= since.
+        """
+        sql = "SELECT * FROM videos WHERE 1=1"
+        params = []
+        if channel_id:
+            sql += " AND channel_id = ?"
+            params.append(channel_id)
+        if since:
+            sql += " AND published >= ?"
+            params.append(since)
+        sql += " ORDER BY published DESC"
+        return [dict(r) for r in self.conn.execute(sql, params)]
+
+def main():
+    p = argparse.ArgumentParser(description="Interroge l'index des vidéos déjà traitées.")
+    p.add_argument("--channel", "-c", help="Filtrer sur un channel_id (UC....)")
+    p.add_argument("--since", "-s", help="Date de publication minimale (YYYY-MM-DD)")
+    p.add_argument("--index", default=INDEX_PATH, help="Chemin de la base SQLite")
+    args = p.parse_args()
+
+    if not os.path.isfile(args.index):
+        print(f"❌ Index introuvable : {args.index}")
+        return
+    with VideoIndex(args.index) as index:
+        rows = index.videos_since(args.channel, args.since)
+    for r in rows:
+        print(f"[{(r['published'] or '')[:10]}] {r['channel_id']} — {r['title']}")
+        print(f"🔗 {r['url']}")
+    print(f"{len(rows)} vidéo(s).")
+
+if __name__ == "__main__":
+    main()
@@ -3,21 +3,32 @@ import os
 import re
 import time
 import argparse
-import feedparser
+import threading
 import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
 
-# Optionnelle si tu utilises --voiceover
-try:
-    import pyttsx3
-except ImportError:
-    pyttsx3 = None
+from feed_cache import FeedCache
+from fpl_tags import extract_tags, normalize_title
+from trends import TrendStore
+import tracing
+
+# feedparser, pyttsx3 (optionnel, --voiceover), l'index SQLite (video_index), l'archive et les
+# transcriptions sont importés à la première utilisation : "--help" ne paie pas leur chargement.
 
 # --------- Paramètres par défaut ---------
-USE_TRANSCRIPTS = False
+USE_TRANSCRIPTS = os.getenv("USE_TRANSCRIPTS", "0") != "0"   # défaut de --transcripts
 DEFAULT_CHANNEL = "UCVPb_jLxwaoYd-Dm7aSWQKQ"
 DEFAULT_LIMIT = 5
 PAUSE_S = 0.5
 CHANNELS_FILE = "channels.txt"
+# Modèle d'URL du flux Atom (surchargeable pour pointer vers un serveur local de test)
+FEED_URL_TEMPLATE = os.getenv("YOUTUBE_FEED_URL", "https://www.youtube.com/feeds/videos.xml?channel_id={ucid}")
+DEFAULT_WORKERS = 1      # 1 = téléchargement séquentiel (comportement historique)
+PER_HOST_LIMIT = 2       # requêtes simultanées max vers un même hôte
+FEED_TIMEOUT_S = 30      # délai max d'un téléchargement de flux via session (mode démon)
+DEFAULT_TREND_LINE = "Tendances du jour : Watchlist, Free Hit, et des choix offensifs à surveiller."
+ARCHIVE_MAX_BLOCKS = 64  # au-delà, l'archive est compactée en fin d'exécution
 
 # --------- Utilitaires ---------
 
@@ -43,7 +54,109 @@ def slugify_filename(text: str, max_len: int = 40) -> str:
 
 # --------- Flux YouTube ---------
 
+_host_semaphores = {}
+_host_semaphores_lock = threading.Lock()
+
+def feed_url_for(ucid: str) -> str:
+    return FEED_URL_TEMPLATE.format(ucid=ucid)
+
+def _host_semaphore(url: str, limit: int) -> threading.BoundedSemaphore:
+    host = urlparse(url).netloc or "local"
+    with _host_semaphores_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.BoundedSemaphore(max(1, limit))
+        return _host_semaphores[host]
+
+def fetch_feed(ucid: str, per_host: int = PER_HOST_LIMIT, etag: str | None = None, modified: str | None = None,
+               session=None):
+    """
+    Télécharge et parse le flux Atom d'une chaîne, en respectant la limite par hôte.
+    etag / modified : requête conditionnelle (réponse 304 si rien n'a changé).
+    session : requests.Session gardée ouverte (mode démon) ; connexions réutilisées d'un passage à l'autre.
+    """
+    import feedparser
+    url = feed_url_for(ucid)
+    if session is None:
+        with _host_semaphore(url, per_host):
+            return feedparser.parse(url, etag=etag, modified=modified)
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if modified:
+        headers["If-Modified-Since"] = modified
+    import requests
+    try:
+        with _host_semaphore(url, per_host):
+            r = session.get(url, headers=headers, timeout=FEED_TIMEOUT_S)
+    except requests.RequestException as e:
+        # Comme feedparser.parse(url) : flux vide marqué bozo, sans statut ; les autres chaînes continuent
+        print(f"⚠️ Flux injoignable pour {ucid} : {type(e).__name__}: {e}")
+        return feedparser.FeedParserDict(entries=[], status=None, bozo=1, bozo_exception=e)
+    # Même forme que feedparser.parse(url) : status / etag / modified + entrées
+    feed = feedparser.FeedParserDict(entries=[]) if r.status_code == 304 else feedparser.parse(r.content)
+    feed["status"] = r.status_code
+    feed["etag"] = r.headers.get("ETag")
+    feed["modified"] = r.headers.get("Last-Modified")
+    return feed
+
+def feed_failed(feed) -> bool:
+    # Sans statut (erreur réseau), statut d'erreur HTTP, ou flux illisible sans aucune entrée
+    status = getattr(feed, "status", None)
+    return status is None or status >= 400 or bool(feed.get("bozo") and not feed.get("entries"))
+
+def fetch_videos(ucid: str, per_host: int = PER_HOST_LIMIT, cache: FeedCache | None = None,
+                 session=None) -> list:
+    """
+    Renvoie les vidéos d'une chaîne. Avec un cache, envoie une requête conditionnelle
+    et réutilise les vidéos déjà parsées sur un 304 ou si le téléchargement échoue.
+    """
+    with tracing.span("fetch_feed", ucid=ucid):
+        cached = cache.lookup(ucid) if cache else None
+        feed = fetch_feed(ucid, per_host,
+                          etag=cached.get("etag") if cached else None,
+                          modified=cached.get("modified") if cached else None,
+                          session=session)
+        tracing.count("feeds.fetched")
+        status = getattr(feed, "status", None)
+        if cached and status == 304:
+            cache.mark_not_modified(ucid)
+            tracing.count("feeds.not_modified")
+            return cached["videos"]
+        if cached and feed_failed(feed):
+            # Panne réseau ou serveur : les dernières vidéos connues plutôt qu'une chaîne vide
+            cache.mark_stale(ucid)
+            tracing.count("feeds.stale")
+            return cached["videos"]
+        if cached:
+            cache.mark_modified(ucid)
+        videos = collect_videos(feed)
+        tracing.count("videos.parsed", len(videos))
+        if cache and status == 200:
+            cache.store(ucid, feed.get("etag"), feed.get("modified"), videos)
+        return videos
+
+def fetch_all_videos(ucids: list[str], workers: int = DEFAULT_WORKERS, per_host: int = PER_HOST_LIMIT,
+                     cache: FeedCache | None = None, session=None) -> list:
+    """
+    Télécharge plusieurs flux en parallèle (pool de threads).
+    Les résultats sont renvoyés dans l'ordre de `ucids`, quel que soit l'ordre d'arrivée.
+    """
+    if workers <= 1 or len(ucids) <= 1:
+        return [fetch_videos(u, per_host, cache, session) for u in ucids]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda u: fetch_videos(u, per_host, cache, session), ucids))
+
+def read_channels(path: str) -> list[str]:
+    ucids = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            ucid = line.strip()
+            if ucid and not ucid.startswith("#"):
+                ucids.append(ucid)
+    return ucids
+
 def collect_videos(feed):
+    import feedparser
     videos = []
     for entry in getattr(feed, 'entries', []):
         published_dt = None
@@ -76,27 +189,21 @@ def collect_videos(feed):
 def summarize_from_title(title: str) -> str:
     if not title:
         return "Résumé indisponible."
-    t = title.strip()
-    t = re.sub(r"\s+", " ", t)
-    words = [w for w in re.split(r"[^\w']+", t) if w]
-    tags = []
-    for w in words:
-        if w.upper().startswith("GW"):
-            tags.append(w.upper())
-        elif w.lower() in {"wildcard","free","hit","draft","watchlist","team","selection","tips","picks"}:
-            tags.append(w.capitalize())
-    tags = list(dict.fromkeys(tags))
+    t = normalize_title(title)
+    tags = extract_tags(t)
     hint = f" ({', '.join(tags)})" if tags else ""
     return f"Vidéo FPL : {t}{hint}"
 
-def generate_summary(title: str, transcript: str | None) -> str:
-    if USE_TRANSCRIPTS and transcript:
-        text = transcript.strip().replace("\n", " ")
-        text = re.sub(r"\s+", " ", text)
-        text = text[:2000]
-        sentences = re.split(r"(?<=[.!?])\s+", text)
-        summary = " ".join(sentences[:3]).strip()
-        return summary + (" ..." if len(sentences) > 3 else "")
+def generate_summary(title: str, transcript=None) -> str:
+    """
+    transcript : texte ou itérable de segments (lu en flux, seules les premières phrases
+    sont consommées) ; résumé depuis le titre à défaut.
+    """
+    if transcript is not None:
+        from transcripts import summarize_segments
+        summary = summarize_segments([transcript] if isinstance(transcript, str) else transcript)
+        if summary:
+            return summary
     return summarize_from_title(title or "")
 
 # --------- Génération d'images ---------
@@ -130,72 +237,54 @@ def generate_images_from_prompts(prompts: list[str], output_dir: str):
 
 # --------- Voix off ---------
 
-def read_social_text(script_path: str) -> str:
-    """
-    Lit le Markdown social et retourne un texte lisible pour TTS.
-    """
-    if not os.path.isfile(script_path):
-        return ""
-    lines = []
-    with open(script_path, encoding="utf-8") as f:
-        for line in f:
-            # Supprime les markdown headers / puces
-            line = re.sub(r"^#{1,6}\\s*", "", line)
-            line = re.sub(r"^[-*]\\s*", "", line)
-            lines.append(line.strip())
-    # Joint, retire les lignes vides multiples
-    text = " ".join([l for l in lines if l])
-    text = re.sub(r"\\s+", " ", text).strip()
-    return text
-
 def generate_voiceover_from_script(script_path: str, out_dir: str, filename: str = "voice.wav", rate: int = 175):
     """
     Génère un fichier audio WAV avec pyttsx3 à partir du script social.
+    Même chemin que tts_pyttsx3.py (nettoyage, choix de la voix, clé du cache audio) :
+    un script déjà rendu par l'un est réutilisé par l'autre.
     """
-    if pyttsx3 is None:
+    import tts_pyttsx3
+    try:
+        tts_pyttsx3.generate_tts(script_path, os.path.join(out_dir, filename), None, rate, 1.0, gentle=False)
+    except ImportError:
         print("⚠️ pyttsx3 non installé. Installe avec: pip install pyttsx3")
-        return
-    text = read_social_text(script_path)
-    if not text:
-        print("⚠️ Script social introuvable ou vide.")
-        return
-
-    os.makedirs(out_dir, exist_ok=True)
-    out_path = os.path.join(out_dir, filename)
-
-    engine = pyttsx3.init()
-    # Réglages voix (tu peux ajuster selon tes préférences)
-    engine.setProperty('rate', rate)         # vitesse
-    # engine.setProperty('volume', 1.0)      # volume 0.0 - 1.0
-    # Pour changer de voix (si disponible):
-    # voices = engine.getProperty('voices')
-    # if voices:
-    #     engine.setProperty('voice', voices[0].id)  # 0: voix par défaut
-
-    engine.save_to_file(text, out_path)
-    engine.runAndWait()
-    print(f"🎙️ Voix off générée : {out_path}")
 
 # --------- CLI ---------
 
 def parse_args():
-    p = argparse.ArgumentParser(description="FPL Radar — résumés YouTube (sans transcription).")
+    p = argparse.ArgumentParser(description="FPL Radar — résumés YouTube.")
     p.add_argument("--channel", "-c", help="YouTube channel_id (UC....)")
     p.add_argument("--limit", "-n", type=int, default=DEFAULT_LIMIT, help="Nombre de vidéos à traiter par chaîne")
     p.add_argument("--multi", action="store_true", help="Activer le mode multi-chaînes via channels.txt")
     p.add_argument("--generate-social", action="store_true", help="Générer le script social illustré")
     p.add_argument("--generate-images", action="store_true", help="Générer des images depuis script social")
     p.add_argument("--voiceover", action="store_true", help="Générer une voix off depuis le script social")
+    p.add_argument("--workers", "-w", type=int, default=DEFAULT_WORKERS,
+                   help="Nombre de flux téléchargés en parallèle en mode --multi (1 = séquentiel)")
+    p.add_argument("--per-host", type=int, default=PER_HOST_LIMIT,
+                   help="Requêtes simultanées max vers un même hôte")
+    p.add_argument("--reprocess", action="store_true",
+                   help="Réécrire aussi les vidéos déjà présentes dans l'index")
+    p.add_argument("--no-feed-cache", action="store_true",
+                   help="Ignorer le cache des flux (ETag/Last-Modified) et tout re-télécharger")
+    p.add_argument("--transcripts", action=argparse.BooleanOptionalAction, default=USE_TRANSCRIPTS,
+                   help="Résumer depuis les transcriptions (cache data/transcripts/, env USE_TRANSCRIPTS=1)")
+    tracing.add_argument(p)
     return p.parse_args()
 
 # --------- Traitement ---------
 
-def process_channel(ucid: str, limit: int, date_str: str, output_dir: str, collected: list):
-    feed_url = f"https://www.youtube.com/feeds/videos.xml?channel_id={ucid}"
+@tracing.traced()
+def process_channel(ucid: str, limit: int, date_str: str, output_dir: str, collected: list,
+                    videos: list | None = None, pause: float = PAUSE_S, cache: FeedCache | None = None,
+                    index: "VideoIndex | None" = None, only_new: bool = True,
+                    archive: "ArchiveStore | None" = None, trends: TrendStore | None = None,
+                    transcripts: "TranscriptStore | None" = None):
+    feed_url = feed_url_for(ucid)
     print(f"Flux utilisé : {feed_url}")
 
-    feed = feedparser.parse(feed_url)
-    videos = collect_videos(feed)
+    if videos is None:
+        videos = fetch_videos(ucid, cache=cache)
     print(f"{len(videos)} vidéos trouvées (avant filtre Shorts).")
 
     videos = [v for v in videos if '/shorts/' not in (v.get('url') or '')]
@@ -203,53 +292,133 @@ def process_channel(ucid: str, limit: int, date_str: str, output_dir: str, colle
 
     collected.extend(videos[:limit])
 
-    with open(os.path.join(output_dir, f"{date_str}.md"), "a", encoding="utf-8") as f:
-        f.write(f"# Chaîne {ucid}\n\n")
-        for video in videos[:limit]:
-            print(f"[{video['published_dt'].strftime('%Y-%m-%d')}] {video['title']}")
-            print(f"🔗 {video['url']}")
-            summary = generate_summary(video['title'], None)
-            print("Résumé :")
-            print(summary)
-            print("\n" + "-" * 40 + "\n")
-            f.write(f"## {video['published_dt'].strftime('%Y-%m-%d')} — {video['title']}\n")
-            f.write(f"🔗 {video['url']}\n\n")
-            f.write(f"Résumé :\n{summary}\n\n---\n\n")
-            time.sleep(PAUSE_S)
+    # Seules les vidéos jamais résumées sont écrites (ré-exécution idempotente)
+    todo = index.filter_new(videos[:limit]) if index and only_new else videos[:limit]
+    if not todo:
+        print("Aucune nouvelle vidéo pour cette chaîne.")
+        return 0
+    print(f"{len(todo)} nouvelle(s) vidéo(s) à résumer.")
+
+    # Archive = source de vérité : une section (bloc) par chaîne, le .md du jour en est rendu.
+    # Sans archive : ajout direct au Markdown (ancien comportement).
+    entries = []
+    for video in todo:
+        published = video['published_dt'].strftime('%Y-%m-%d')
+        print(f"[{published}] {video['title']}")
+        print(f"🔗 {video['url']}")
+        with tracing.span("summary"):
+            segments = transcripts.segments(video['id']) if transcripts else None
+            summary = generate_summary(video['title'], segments)
+        tracing.count("videos.summarized")
+        print("Résumé :")
+        print(summary)
+        print("\n" + "-" * 40 + "\n")
+        entries.append({"published": published, "title": video['title'], "url": video['url'], "summary": summary})
+        if pause:
+            time.sleep(pause)
+
+    if archive:
+        archive.append_section(date_str, ucid, entries)
+    else:
+        from archive_store import render_entry, video_record
+        with open(os.path.join(output_dir, f"{date_str}.md"), "a", encoding="utf-8") as f:
+            f.write(f"# Chaîne {ucid}\n\n")
+            for e in entries:
+                f.write(render_entry(video_record(ucid, e["published"], e["title"], e["url"], e["summary"])))
+    if index:
+        for video, e in zip(todo, entries):
+            index.record(ucid, video, e["summary"], date_str)
+    if trends:
+        for e in entries:
+            trends.add_video(e["url"] or e["title"], e["published"], e["title"])
+    return len(entries)   # nombre de vidéos nouvellement résumées
+
+def write_social_script(date_str: str, output_dir: str, trends: TrendStore) -> str:
+    """
+    Écrit fpl_summaries/social_<date>.md et renvoie son chemin.
+    """
+    social_path = os.path.join(output_dir, f"social_{date_str}.md")
+    with open(social_path, "w", encoding="utf-8") as f:
+        f.write(f"# Script social — {date_str}\n\n")
+        f.write("Aujourd’hui dans FPL, voici ce qu’il faut retenir en 30 secondes :\n\n")
+        f.write("Watchlist Gameweek : des noms ressortent, comme Sarr contre Villa.\n")
+        f.write("Free Hit ? Mateta et un premium en attaque, c’est dans toutes les drafts.\n")
+        # Termes réellement en hausse (trends.py), phrase historique à défaut de données
+        trend_line = trends.social_line(date_str) or DEFAULT_TREND_LINE
+        f.write(trend_line + "\n")
+        f.write("Tu veux ce genre de résumé chaque jour ? Pense à t’abonner.\n")
+    tracing.count_file("bytes_written", social_path)
+    print(f"📱 Script social généré dans {social_path}")
+    return social_path
 
 # --------- Main ---------
 
-if __name__ == "__main__":
+def main():
     args = parse_args()
+    tracing.start("youtube_fpl_agent", args.profile)
     date_str = datetime.now(UTC).strftime("%Y-%m-%d")
     output_dir = "fpl_summaries"
     os.makedirs(output_dir, exist_ok=True)
     collected_videos = []
+    from archive_store import ArchiveStore, markdown_sections
+    from transcripts import TranscriptStore
+    from video_index import VideoIndex
+
+    feed_cache = None if args.no_feed_cache else FeedCache()
+    video_index = VideoIndex()
+    archive = ArchiveStore()
+    if not os.path.isfile(archive.path):
+        # Premier passage : l'historique Markdown est importé pour ne rien perdre au rendu
+        archive.compact(markdown_sections(output_dir))
+    trends = TrendStore()
+    if not trends.exists():
+        trends.rebuild_from_archive(archive)
+    transcripts = TranscriptStore() if args.transcripts else None
 
     if args.multi:
         if not os.path.isfile(CHANNELS_FILE):
             print(f"Fichier {CHANNELS_FILE} introuvable.")
             exit(1)
-        with open(CHANNELS_FILE, encoding="utf-8") as f:
-            for line in f:
-                ucid = line.strip()
-                if ucid and not ucid.startswith("#"):
-                    process_channel(ucid, args.limit, date_str, output_dir, collected_videos)
+        ucids = read_channels(CHANNELS_FILE)
+        if args.workers > 1:
+            # Téléchargement concurrent, puis écriture dans l'ordre de channels.txt
+            with tracing.span("fetch_all", channels=len(ucids), workers=args.workers):
+                all_videos = fetch_all_videos(ucids, workers=args.workers, per_host=args.per_host, cache=feed_cache)
+            for ucid, videos in zip(ucids, all_videos):
+                process_channel(ucid, args.limit, date_str, output_dir, collected_videos,
+                                videos=videos, pause=0, index=video_index, only_new=not args.reprocess,
+                                archive=archive, trends=trends, transcripts=transcripts)
+        else:
+            for ucid in ucids:
+                process_channel(ucid, args.limit, date_str, output_dir, collected_videos,
+                                cache=feed_cache, index=video_index, only_new=not args.reprocess,
+                                archive=archive, trends=trends, transcripts=transcripts)
     else:
         ucid = args.channel.strip() if args.channel else DEFAULT_CHANNEL
-        process_channel(ucid, args.limit, date_str, output_dir, collected_videos)
+        process_channel(ucid, args.limit, date_str, output_dir, collected_videos,
+                        cache=feed_cache, index=video_index, only_new=not args.reprocess,
+                        archive=archive, trends=trends, transcripts=transcripts)
+
+    video_index.close()
+    with tracing.span("archive.write_day"):
+        archive.write_day(date_str, output_dir)
+    tracing.count_file("bytes_written", os.path.join(output_dir, f"{date_str}.md"))
+    with tracing.span("trends.save"):
+        trends.save()
+    if transcripts:
+        transcripts.save()
+        print(transcripts.stats_line())
+    if archive.stats()["blocks"] > ARCHIVE_MAX_BLOCKS:
+        with tracing.span("archive.compact"):
+            st = archive.compact()
+        print(f"🗜️ Archive compactée : {st['videos']} vidéo(s), {st['after'] / 1024:.1f} Ko")
+    if feed_cache:
+        feed_cache.evict()
+        print(feed_cache.stats_line())
 
     # Génération du script social (markdown)
     if args.generate_social:
-        social_path = os.path.join(output_dir, f"social_{date_str}.md")
-        with open(social_path, "w", encoding="utf-8") as f:
-            f.write(f"# Script social — {date_str}\n\n")
-            f.write("Aujourd’hui dans FPL, voici ce qu’il faut retenir en 30 secondes :\n\n")
-            f.write("Watchlist Gameweek : des noms ressortent, comme Sarr contre Villa.\n")
-            f.write("Free Hit ? Mateta et un premium en attaque, c’est dans toutes les drafts.\n")
-            f.write("Tendances du jour : Watchlist, Free Hit, et des choix offensifs à surveiller.\n")
-            f.write("Tu veux ce genre de résumé chaque jour ? Pense à t’abonner.\n")
-        print(f"📱 Script social généré dans {social_path}")
+        social_path = write_social_script(date_str, output_dir, trends)
     else:
         social_path = os.path.join(output_dir, f"social_{date_str}.md")
 
@@ -257,11 +426,16 @@ if __name__ == "__main__":
     if args.generate_images:
         prompts = extract_prompts_from_script(social_path)
         image_output_dir = os.path.join("social_images", date_str)
-        generate_images_from_prompts(prompts, image_output_dir)
+        with tracing.span("image_prompts"):
+            generate_images_from_prompts(prompts, image_output_dir)
 
     # Voix off TTS -> WAV
     if args.voiceover:
         audio_dir = os.path.join("social_audio", date_str)
-        generate_voiceover_from_script(social_path, audio_dir, filename="voice.wav", rate=175)
+        with tracing.span("voiceover"):
+            generate_voiceover_from_script(social_path, audio_dir, filename="voice.wav", rate=175)
 
     print(f"📁 Résumés écrits dans {output_dir}/{date_str}.md")
+
+if __name__ == "__main__":
+    main()